@@ -1,18 +1,231 @@
 import math
+import numpy as np
+
+from frozen import Frozen
+
+class Airfoil(Frozen):
+    # immutable value object (see frozen.Frozen)
+    __slots__ = ("a0", "Cd0", "e", "alpha_stall_deg", "alpha_stall", "k")
+    _ARGS = ("a0", "Cd0", "e", "alpha_stall_deg")
 
-class Airfoil:
     def __init__(self, a0=2*math.pi, Cd0=0.008, e=0.9, alpha_stall_deg=15.0):
         self.a0 = a0
         self.Cd0 = Cd0
         self.e = e
+        self.alpha_stall_deg = alpha_stall_deg
         self.alpha_stall = math.radians(alpha_stall_deg)
+        self.k = 1.0/(math.pi*6.0*e)  # drag-due-to-lift factor, AR~6 surrogate
+        self._freeze()
+
+    def signature(self):
+        # polar parameters, used to detect geometry changes
+        return (type(self).__name__, self.a0, self.Cd0, self.e, self.alpha_stall)
 
     def lookup(self, alpha_rad: float):
         # soft stall clamp
         alpha_eff = max(-self.alpha_stall, min(self.alpha_stall, alpha_rad))
         Cl = self.a0 * alpha_eff
         # simple drag polar: Cd = Cd0 + k*Cl^2
-        k = 1.0/(math.pi*6.0*self.e)  # AR~6 surrogate
-        Cd = self.Cd0 + k*Cl*Cl
+        Cd = self.Cd0 + self.k*Cl*Cl
         Cm = 0.0
         return Cl, Cd, Cm
+
+    def lookup_array(self, alpha_rad):
+        # vectorized lookup: same polar as lookup(), evaluated over a whole array of angles
+        alpha_eff = np.clip(alpha_rad, -self.alpha_stall, self.alpha_stall)
+        Cl = self.a0 * alpha_eff
+        Cd = self.Cd0 + self.k*Cl*Cl
+        Cm = np.zeros_like(Cl)
+        return Cl, Cd, Cm
+
+    def lookup_array_slope(self, alpha_rad):
+        # analytic dCl/dalpha and dCd/dalpha of lookup_array (zero on the stall clamp)
+        alpha_rad = np.asarray(alpha_rad, dtype=np.result_type(np.asarray(alpha_rad).dtype, np.float32))
+        dCl = np.where(np.abs(alpha_rad) < self.alpha_stall, self.a0, 0.0).astype(alpha_rad.dtype, copy=False)
+        Cl = self.a0 * np.clip(alpha_rad, -self.alpha_stall, self.alpha_stall)
+        dCd = 2.0*self.k*Cl*dCl
+        return dCl, dCd
+
+class TabulatedAirfoil(Frozen):
+    """
+    Table-driven (C81-style) section polar.
+    Cl, Cd and Cm are given on an (alpha, Mach) grid - arrays of shape
+    (n_alpha, n_mach), alpha in degrees - and interpolated bilinearly. Angles
+    and Mach numbers outside the table are held at the table edge. The BEMT
+    solvers pass the section Mach number when they are given the speed of
+    sound (a= of the integrators); without a Mach number the lowest
+    tabulated Mach column is used, so the class is a drop-in replacement
+    for Airfoil. Immutable like Airfoil; the tables are read-only arrays.
+    """
+    __slots__ = ("name", "alpha_deg", "alpha", "mach", "table", "_base", "_delta", "_cm_zero", "_uniform",
+                 "_inv_d_alpha", "alpha_stall")
+    _ARGS = ("alpha_deg", "mach", "Cl", "Cd", "Cm", "name")
+
+    def __init__(self, alpha_deg, mach, Cl, Cd, Cm=None, name="table"):
+        alpha_deg = np.asarray(alpha_deg, dtype=float).ravel()
+        mach = np.atleast_1d(np.asarray(mach, dtype=float)).ravel()
+        shape = (alpha_deg.size, mach.size)
+        Cl = np.asarray(Cl, dtype=float).reshape(shape)
+        Cd = np.asarray(Cd, dtype=float).reshape(shape)
+        Cm = np.zeros(shape) if Cm is None else np.asarray(Cm, dtype=float).reshape(shape)
+        if alpha_deg.size < 2 or np.any(np.diff(alpha_deg) <= 0):
+            raise ValueError("alpha_deg must hold at least two strictly increasing values")
+        if np.any(np.diff(mach) <= 0):
+            raise ValueError("mach must be strictly increasing")
+        self.name = name
+        self.alpha_deg = alpha_deg
+        self.alpha = np.radians(alpha_deg)
+        self.mach = mach
+        self.table = np.stack([Cl, Cd, Cm])
+        # per-interval start values and increments, (3, n_alpha - 1, n_mach) flattened per coefficient
+        self._base = np.ascontiguousarray(self.table[:, :-1, :]).reshape(3, -1)
+        self._delta = np.ascontiguousarray(np.diff(self.table, axis=1)).reshape(3, -1)
+        self._cm_zero = not np.any(Cm)
+        # uniform alpha grids are indexed arithmetically instead of by search
+        d_alpha = np.diff(self.alpha)
+        self._uniform = bool(np.allclose(d_alpha, d_alpha[0], rtol=1e-9, atol=0.0))
+        self._inv_d_alpha = 1.0 / d_alpha
+        # stall angle: edge of the positive-Cl rise, used by the solvers' heuristics
+        i_max = int(np.argmax(Cl[:, 0]))
+        self.alpha_stall = float(self.alpha[i_max])
+        for x in (self.alpha_deg, self.alpha, self.mach, self.table, self._base, self._delta, self._inv_d_alpha):
+            x.flags.writeable = False
+        self._freeze()
+
+    def _args(self):
+        Cl, Cd, Cm = self.table
+        return (self.alpha_deg, self.mach, Cl, Cd, Cm, self.name)
+
+    @classmethod
+    def from_airfoil(cls, airfoil, alpha_deg=np.arange(-20.0, 20.25, 0.25)):
+        # tabulate an analytic polar (single Mach column)
+        Cl, Cd, Cm = airfoil.lookup_array(np.radians(alpha_deg))
+        return cls(alpha_deg, [0.0], Cl[:, None], Cd[:, None], Cm[:, None], name=type(airfoil).__name__)
+
+    @classmethod
+    def from_npz(cls, path):
+        # arrays alpha_deg, mach, Cl, Cd and optionally Cm, as written by save_npz
+        with np.load(path) as data:
+            Cm = data["Cm"] if "Cm" in data else None
+            name = str(data["name"]) if "name" in data else "table"
+            return cls(data["alpha_deg"], data["mach"], data["Cl"], data["Cd"], Cm, name=name)
+
+    def save_npz(self, path):
+        Cl, Cd, Cm = self.table
+        np.savez_compressed(path, alpha_deg=self.alpha_deg, mach=self.mach, Cl=Cl, Cd=Cd, Cm=Cm,
+                            name=np.array(self.name))
+
+    @classmethod
+    def from_csv(cls, path, name=None):
+        """
+        Long-format CSV with a header row: alpha_deg, mach, Cl, Cd[, Cm]
+        (one row per grid point, any order; the Mach column may be omitted
+        for a single-Mach table).
+        """
+        data = np.genfromtxt(path, delimiter=",", names=True, dtype=float)
+        cols = {c.lower(): c for c in data.dtype.names}
+        for c in ("alpha_deg", "cl", "cd"):
+            if c not in cols:
+                raise ValueError(f"{path}: missing column '{c}'")
+        alpha = data[cols["alpha_deg"]]
+        mach = data[cols["mach"]] if "mach" in cols else np.zeros_like(alpha)
+        alpha_grid, ia = np.unique(alpha, return_inverse=True)
+        mach_grid, im = np.unique(mach, return_inverse=True)
+        if alpha.size != alpha_grid.size * mach_grid.size:
+            raise ValueError(f"{path}: rows do not form a complete alpha x Mach grid")
+        tables = []
+        for c in ("cl", "cd", "cm"):
+            t = np.full((alpha_grid.size, mach_grid.size), np.nan)
+            if c in cols:
+                t[ia, im] = data[cols[c]]
+            else:
+                t[:] = 0.0
+            tables.append(t)
+        if np.isnan(tables[0]).any():
+            raise ValueError(f"{path}: duplicate alpha/Mach rows")
+        return cls(alpha_grid, mach_grid, *tables, name=name or str(path))
+
+    def signature(self):
+        return (type(self).__name__, self.alpha.tobytes(), self.mach.tobytes(), self.table.tobytes())
+
+    def _alpha_index(self, a):
+        # interval index and fractional position of each angle, held at the table edges
+        A = self.alpha
+        a = np.clip(a, A[0], A[-1])
+        if self._uniform:
+            t = (a - A[0]) * self._inv_d_alpha[0]
+            i = np.minimum(t.astype(np.intp), A.size - 2)
+            t = t - i
+        else:
+            i = np.minimum(np.searchsorted(A, a, side="right") - 1, A.size - 2)
+            t = (a - np.take(A, i)) * np.take(self._inv_d_alpha, i)
+        return i, t
+
+    def _interp(self, alpha_rad, mach, rows, slope=False):
+        # value (or d/dalpha with slope=True) of the coefficients in rows, in the precision of alpha_rad
+        dtype = np.result_type(np.asarray(alpha_rad).dtype, np.float32)
+        a = np.asarray(alpha_rad, dtype=float)
+        i, t = self._alpha_index(a)
+        n_m = self.mach.size
+        if n_m == 1 or mach is None:
+            flat = i * n_m
+            tm = None
+        else:
+            m = np.clip(np.broadcast_to(np.asarray(mach, dtype=float), a.shape), self.mach[0], self.mach[-1])
+            im = np.minimum(np.searchsorted(self.mach, m, side="right") - 1, n_m - 2)
+            tm = (m - np.take(self.mach, im)) / np.take(np.diff(self.mach), im)
+            flat = i * n_m + im
+        if slope:
+            scale = self._inv_d_alpha[0] if self._uniform else np.take(self._inv_d_alpha, i)
+        out = []
+        for k in rows:
+            base, delta = self._base[k], self._delta[k]
+            cols = [flat] if tm is None else [flat, flat + 1]
+            if slope:
+                vals = [np.take(delta, f) * scale for f in cols]
+            else:
+                vals = [np.take(base, f) + t * np.take(delta, f) for f in cols]
+            c = vals[0] if tm is None else vals[0] + tm * (vals[1] - vals[0])
+            out.append(c.astype(dtype, copy=False))
+        return out
+
+    def lookup(self, alpha_rad: float, mach=None):
+        Cl, Cd, Cm = self.lookup_array(alpha_rad, mach)
+        return float(Cl), float(Cd), float(Cm)
+
+    def lookup_array(self, alpha_rad, mach=None):
+        # mach: optional array broadcastable to alpha_rad
+        if self._cm_zero:
+            Cl, Cd = self._interp(alpha_rad, mach, (0, 1))
+            return Cl, Cd, np.zeros_like(Cl)
+        return tuple(self._interp(alpha_rad, mach, (0, 1, 2)))
+
+    def lookup_array_slope(self, alpha_rad, mach=None):
+        # dCl/dalpha and dCd/dalpha of the interpolant (zero beyond the table)
+        alpha_rad = np.asarray(alpha_rad, dtype=np.result_type(np.asarray(alpha_rad).dtype, np.float32))
+        dCl, dCd = self._interp(alpha_rad, mach, (0, 1), slope=True)
+        inside = (alpha_rad > self.alpha[0]) & (alpha_rad < self.alpha[-1])
+        return np.where(inside, dCl, 0.0), np.where(inside, dCd, 0.0)
+
+    def lookup_array_mach_slope(self, alpha_rad, mach):
+        # dCl/dMach and dCd/dMach of the interpolant (zero beyond the table's Mach range)
+        dtype = np.result_type(np.asarray(alpha_rad).dtype, np.float32)
+        a = np.asarray(alpha_rad, dtype=float)
+        m = np.broadcast_to(np.asarray(mach, dtype=float), a.shape)
+        n_m = self.mach.size
+        if n_m == 1:
+            zero = np.zeros(a.shape, dtype=dtype)
+            return zero, zero
+        i, t = self._alpha_index(a)
+        mc = np.clip(m, self.mach[0], self.mach[-1])
+        im = np.minimum(np.searchsorted(self.mach, mc, side="right") - 1, n_m - 2)
+        flat = i * n_m + im
+        scale = 1.0 / np.take(np.diff(self.mach), im)
+        inside = (m > self.mach[0]) & (m < self.mach[-1])
+        out = []
+        for k in (0, 1):
+            base, delta = self._base[k], self._delta[k]
+            lo = np.take(base, flat) + t * np.take(delta, flat)
+            hi = np.take(base, flat + 1) + t * np.take(delta, flat + 1)
+            out.append(np.where(inside, (hi - lo) * scale, 0.0).astype(dtype, copy=False))
+        return tuple(out)
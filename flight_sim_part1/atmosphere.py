@@ -1,24 +1,47 @@
 import math
+import numpy as np
 
-def isa_properties(alt_m: float):
-    # Sea-level
-    T0 = 288.15
-    p0 = 101325.0
-    rho0 = 1.225
-    g = 9.80665
-    L = -0.0065   # K/m
-    R = 287.05287
-    gamma = 1.4
+# Sea-level
+T0 = 288.15
+p0 = 101325.0
+rho0 = 1.225
+g = 9.80665
+L = -0.0065   # K/m
+R = 287.05287
+gamma = 1.4
+H_TROPOPAUSE = 11000.0  # m
 
+def isa_properties(alt_m: float, dT=0.0):
+    # dT: ISA deviation [K] (non-standard day); pressure follows the standard day
     if alt_m <= 11000.0:
         T = T0 + L*alt_m
         p = p0 * (T/T0) ** (-g/(L*R))
-        rho = p / (R*T)
     else:
         # very simple extension (isothermal above 11 km)
         T = T0 + L*11000.0
         p = p0 * (T/T0) ** (-g/(L*R)) * math.exp(-g*(alt_m-11000.0)/(R*T))
-        rho = p / (R*T)
+    T = T + dT
+    rho = p / (R*T)
 
     a = math.sqrt(gamma*R*T)
     return rho, a
+
+def isa(alt_m, dT=0.0):
+    """
+    Array version of isa_properties: altitude [m] and ISA deviation dT [K]
+    broadcast against each other. Returns (rho, a, T, p) - density, speed of
+    sound, temperature [K] and pressure [Pa] - as arrays, or floats for
+    scalar input. On a non-standard day the pressure is that of the standard
+    day at the same (pressure) altitude and T is offset by dT.
+    """
+    alt, dT = np.broadcast_arrays(np.asarray(alt_m, dtype=float), np.asarray(dT, dtype=float))
+    T_std = T0 + L*np.minimum(alt, H_TROPOPAUSE)
+    p = p0 * (T_std/T0) ** (-g/(L*R))
+    above = alt > H_TROPOPAUSE
+    if np.any(above):
+        p = p * np.exp(np.where(above, -g*(alt - H_TROPOPAUSE)/(R*T_std), 0.0))
+    T = T_std + dT
+    out = (p / (R*T), np.sqrt(gamma*R*T), T, p)
+    if T.ndim == 0:
+        return tuple(float(x) for x in out)
+    return out
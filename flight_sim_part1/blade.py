@@ -1,6 +1,76 @@
 import math
+import numpy as np
+
+from frozen import Frozen
+
+class BladeGrid:
+    """
+    Radial discretization of a blade, built once per section count and reused.
+    Contiguous read-only arrays over the sections with positive chord:
+    r [m], dr [m] (integration weights), chord [m], twist [rad] and the local
+    solidity B*c/(2*pi*r).
+    rule="cosine" places n_sections cosine-spaced nodes with np.gradient
+    weights (the original discretization); rule="gauss" uses n_sections
+    Gauss-Legendre nodes and weights on [R_root, R_tip].
+    """
+    RULES = ("cosine", "gauss")
+
+    def __init__(self, blade, n_sections, B, rule="cosine"):
+        if rule not in self.RULES:
+            raise ValueError(f"Unknown radial rule '{rule}' (expected one of {self.RULES})")
+        if rule == "gauss":
+            x, w = np.polynomial.legendre.leggauss(n_sections)
+            half = 0.5 * (blade.R_tip - blade.R_root)
+            r = blade.R_root + half * (x + 1.0)
+            dr = half * w
+        else:
+            mu = np.linspace(0, 1, n_sections)
+            r_nodes = 0.5*(1 - np.cos(np.pi*mu))  # cosine spacing
+            r = blade.R_root + (blade.R_tip - blade.R_root) * r_nodes
+            dr = np.gradient(r)
+        self.n_sections = n_sections
+        self.rule = rule
+        self._set(blade, r, dr, B)
+
+    @classmethod
+    def from_nodes(cls, blade, r, dr, B):
+        # grid on explicit nodes and weights (not cached), e.g. for adaptive quadrature
+        grid = cls.__new__(cls)
+        grid.n_sections = np.size(r)
+        grid.rule = "nodes"
+        grid._set(blade, np.asarray(r, dtype=float), np.asarray(dr, dtype=float), B)
+        return grid
+
+    def _set(self, blade, r, dr, B):
+        chord = np.asarray(blade.c(r), dtype=float)
+        keep = chord > 0
+        self.B = B
+        self.index = np.flatnonzero(keep)  # positions of the kept sections among the nodes
+        self.r = np.ascontiguousarray(r[keep])
+        self.dr = np.ascontiguousarray(dr[keep])
+        self.chord = np.ascontiguousarray(chord[keep])
+        self.twist = np.ascontiguousarray(np.asarray(blade.theta(self.r), dtype=float))
+        self.solidity = B * self.chord / (2 * math.pi * self.r)
+        for x in (self.r, self.dr, self.chord, self.twist, self.solidity, self.index):
+            x.flags.writeable = False
+
+    def astype(self, dtype):
+        # the same grid with its float arrays cast to dtype (e.g. float32 for the single-precision kernels)
+        grid = type(self).__new__(type(self))
+        grid.__dict__.update(self.__dict__)
+        for name in ("r", "dr", "chord", "twist", "solidity"):
+            x = getattr(self, name).astype(dtype)
+            x.flags.writeable = False
+            setattr(grid, name, x)
+        return grid
+
+class Blade(Frozen):
+    # immutable value object (see frozen.Frozen); grid() caches derived discretizations
+    __slots__ = ("R_root", "R_tip", "c_root", "c_tip", "theta_root", "theta_tip", "airfoil", "_grids", "_planform")
+    _ARGS = ("R_root", "R_tip", "c_root", "c_tip", "theta_root_rad", "theta_tip_rad", "airfoil")
+    # planform variables with analytic sensitivities (see design_tangent)
+    DESIGN_VARIABLES = ("c_root", "c_tip", "theta_root", "theta_tip", "taper", "twist")
 
-class Blade:
     def __init__(self, R_root, R_tip, c_root, c_tip, theta_root_rad, theta_tip_rad, airfoil=None):
         self.R_root = R_root
         self.R_tip = R_tip
@@ -9,6 +79,12 @@ class Blade:
         self.theta_root = theta_root_rad
         self.theta_tip = theta_tip_rad
         self.airfoil = airfoil
+        self._grids = {}
+        self._planform = self._planform_signature()
+        self._freeze()
+
+    def _args(self):
+        return (self.R_root, self.R_tip, self.c_root, self.c_tip, self.theta_root, self.theta_tip, self.airfoil)
 
     def c(self, r):
         # linear taper
@@ -19,3 +95,134 @@ class Blade:
         # linear twist
         mu = (r - self.R_root) / max(1e-9, (self.R_tip - self.R_root))
         return self.theta_root + mu*(self.theta_tip - self.theta_root)
+
+    def design_tangent(self, name, r):
+        """
+        (dc/dx, dtheta/dx) at r for the design variable x in DESIGN_VARIABLES:
+        the root/tip chords and pitches, taper = c_tip/c_root (c_root held) and
+        twist = theta_tip - theta_root (mean pitch held).
+        """
+        mu = (np.asarray(r, dtype=float) - self.R_root) / max(1e-9, (self.R_tip - self.R_root))
+        zero = np.zeros_like(mu)
+        tangents = {"c_root": (1.0 - mu, zero), "c_tip": (mu, zero), "theta_root": (zero, 1.0 - mu),
+                    "theta_tip": (zero, mu), "taper": (self.c_root * mu, zero), "twist": (zero, mu - 0.5)}
+        if name not in tangents:
+            raise ValueError(f"Unknown design variable '{name}' (expected one of {self.DESIGN_VARIABLES})")
+        return tangents[name]
+
+    def planform_signature(self):
+        # everything that shapes chord and twist along the span
+        return self._planform
+
+    def _planform_signature(self):
+        return (type(self).__name__, self.R_root, self.R_tip, self.c_root, self.c_tip, self.theta_root, self.theta_tip)
+
+    def pitched(self, delta_rad):
+        # the same blade with delta_rad added to the pitch at every station (collective)
+        return self.replace(theta_root_rad=self.theta_root + delta_rad, theta_tip_rad=self.theta_tip + delta_rad)
+
+    def grid(self, n_sections, B=1, rule="cosine", dtype=None):
+        # cached BladeGrid (the blade is immutable, so it never goes stale); dtype=np.float32 for a
+        # single-precision copy
+        key = (n_sections, B, rule) if dtype is None else (n_sections, B, rule, np.dtype(dtype).str)
+        grid = self._grids.get(key)
+        if grid is None:
+            if dtype is None:
+                grid = BladeGrid(self, n_sections, B, rule)
+            else:
+                grid = self.grid(n_sections, B, rule).astype(dtype)
+            self._grids[key] = grid
+        return grid
+
+class _SpanwiseInterpolant:
+    """
+    Piecewise-cubic interpolant y(r) stored as per-interval polynomial
+    coefficients, evaluated over whole arrays at once. kind="linear" is the
+    piecewise-linear special case, kind="cubic" a natural cubic spline.
+    Values are held constant outside the tabulated span.
+    """
+    def __init__(self, x, y, kind="linear"):
+        h = np.diff(x)
+        slope = np.diff(y) / h
+        if kind == "linear" or x.size < 3:
+            m = np.zeros(x.size)
+        else:
+            # natural spline: second derivatives m from the tridiagonal continuity system
+            n = x.size
+            A = np.zeros((n, n))
+            rhs = np.zeros(n)
+            A[0, 0] = A[-1, -1] = 1.0
+            i = np.arange(1, n - 1)
+            A[i, i - 1] = h[:-1]
+            A[i, i] = 2.0 * (h[:-1] + h[1:])
+            A[i, i + 1] = h[1:]
+            rhs[i] = 6.0 * (slope[1:] - slope[:-1])
+            m = np.linalg.solve(A, rhs)
+        self.x = x
+        # y = c0 + c1*t + c2*t^2 + c3*t^3 with t = r - x[i]
+        self.coef = np.stack([y[:-1], slope - h * (2.0*m[:-1] + m[1:]) / 6.0, 0.5*m[:-1], (m[1:] - m[:-1]) / (6.0*h)])
+
+    def __call__(self, r):
+        x = self.x
+        r = np.clip(r, x[0], x[-1])
+        i = np.minimum(np.searchsorted(x, r, side="right") - 1, x.size - 2)
+        t = r - np.take(x, i)
+        c0, c1, c2, c3 = (np.take(c, i) for c in self.coef)
+        return c0 + t*(c1 + t*(c2 + t*c3))
+
+class TabulatedBlade(Blade):
+    """
+    Blade with chord and twist tabulated at spanwise stations r_stations [m]
+    (root to tip). kind="linear" interpolates piecewise-linearly, kind="cubic"
+    with a natural cubic spline; c(r) and theta(r) accept whole arrays of
+    radii. A two-station linear table reproduces the linear Blade.
+    """
+    __slots__ = ("kind", "r_stations", "chord_stations", "twist_stations", "_chord", "_twist")
+    _ARGS = ("r_stations", "chord", "twist_rad", "airfoil", "kind")
+    KINDS = ("linear", "cubic")
+    DESIGN_VARIABLES = ()
+
+    def __init__(self, r_stations, chord, twist_rad, airfoil=None, kind="linear"):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown interpolation kind '{kind}' (expected one of {self.KINDS})")
+        r = np.asarray(r_stations, dtype=float).ravel()
+        chord = np.broadcast_to(np.asarray(chord, dtype=float), r.shape).copy()
+        twist = np.broadcast_to(np.asarray(twist_rad, dtype=float), r.shape).copy()
+        if r.size < 2 or np.any(np.diff(r) <= 0):
+            raise ValueError("r_stations must hold at least two strictly increasing radii")
+        self.kind = kind
+        self.r_stations = r
+        self.chord_stations = chord
+        self.twist_stations = twist
+        for x in (r, chord, twist):
+            x.flags.writeable = False
+        self._chord = _SpanwiseInterpolant(r, chord, kind)
+        self._twist = _SpanwiseInterpolant(r, twist, kind)
+        super().__init__(r[0], r[-1], chord[0], chord[-1], twist[0], twist[-1], airfoil)
+
+    def _args(self):
+        return (self.r_stations, self.chord_stations, self.twist_stations, self.airfoil, self.kind)
+
+    @classmethod
+    def from_blade(cls, blade, r_stations=None, kind="linear"):
+        # tabulate any blade at the given stations (default: root and tip)
+        if r_stations is None:
+            r_stations = [blade.R_root, blade.R_tip]
+        r = np.asarray(r_stations, dtype=float)
+        return cls(r, blade.c(r), blade.theta(r), blade.airfoil, kind)
+
+    def pitched(self, delta_rad):
+        return self.replace(twist_rad=self.twist_stations + delta_rad)
+
+    def design_tangent(self, name, r):
+        raise ValueError(f"TabulatedBlade has no planform design variables (got '{name}')")
+
+    def c(self, r):
+        return self._chord(r)
+
+    def theta(self, r):
+        return self._twist(r)
+
+    def _planform_signature(self):
+        return (type(self).__name__, self.kind, self.r_stations.tobytes(), self.chord_stations.tobytes(),
+                self.twist_stations.tobytes())
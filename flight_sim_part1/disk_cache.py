@@ -0,0 +1,162 @@
+import argparse
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from frozen import canonical
+from integrators import SOLVER_STAMP
+
+ENV_VAR = "ROTOR_DISK_CACHE"  # cache file path, or "off" to disable the default cache
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "rotor_bemt", "evaluations.sqlite")
+
+class DiskCache:
+    """
+    Persistent store of rotor evaluations shared across runs and processes
+    (SQLite in WAL mode: concurrent readers, one writer at a time, waiting up
+    to timeout seconds for the lock).
+
+    Entries are keyed on a sha256 of the evaluation kind, the rotor's
+    content_hash(), the conditions and solver settings, and
+    integrators.SOLVER_STAMP (SOLVER_VERSION plus a digest of the solver
+    code), so results of an older or edited solver are never returned. When
+    more than max_entries are stored the least recently used are evicted;
+    a hit refreshes an entry's access time only when it is older than
+    touch_interval seconds, so reads do not take the write lock.
+
+    Normally used as the backing store of a RotorCache
+    (RotorCache(backing=DiskCache(...))); inspect or clear it with
+    `python disk_cache.py stats|clear|prune|vacuum [--path ...]`.
+    """
+
+    def __init__(self, path=None, max_entries=200_000, timeout=30.0, touch_interval=3600.0):
+        self.path = path or os.environ.get(ENV_VAR) or DEFAULT_PATH
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _connection(self):
+        # one connection per process (connections must not cross a fork)
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, kind TEXT, version TEXT, "
+                         "value BLOB, created REAL, accessed REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def digest(kind, rotor, key):
+        text = repr((SOLVER_STAMP, kind, rotor.content_hash(), canonical(key)))
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def get(self, kind, rotor, key):
+        """(True, value) if stored, else (False, None)."""
+        k = self.digest(kind, rotor, key)
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, accessed FROM entries WHERE key = ?", (k,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return False, None
+            now = time.time()
+            if now - row[1] > self.touch_interval:
+                # reads stay lock-free: the access time is refreshed at most once per touch_interval
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, k))
+        self.hits += 1
+        return True, pickle.loads(row[0])
+
+    def put(self, kind, rotor, key, value):
+        k = self.digest(kind, rotor, key)
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                         (k, kind, SOLVER_STAMP, blob, now, now))
+            self._writes += 1
+            if self._writes % 256 == 0:
+                self._evict(conn)
+
+    def _evict(self, conn):
+        n = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        if n > self.max_entries:
+            conn.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                         (n - self.max_entries,))
+
+    def prune(self, max_entries=None):
+        """Drop entries of other solver stamps and evict down to max_entries (default self.max_entries)."""
+        if max_entries is not None:
+            self.max_entries = max_entries
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM entries WHERE version != ?", (SOLVER_STAMP,))
+            self._evict(conn)
+
+    def clear(self):
+        with self._lock:
+            self._connection().execute("DELETE FROM entries")
+
+    def vacuum(self):
+        with self._lock:
+            self._connection().execute("VACUUM")
+
+    def stats(self):
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute("SELECT kind, version, COUNT(*), SUM(LENGTH(value)) FROM entries "
+                                "GROUP BY kind, version").fetchall()
+        size = sum(os.path.getsize(p) for p in (self.path, self.path + "-wal") if os.path.exists(p))
+        return {"path": self.path, "solver_stamp": SOLVER_STAMP, "file_bytes": size,
+                "entries": {f"{kind} ({version})": {"count": n, "bytes": b} for kind, version, n, b in rows},
+                "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None and self._pid == os.getpid():
+                self._conn.close()
+            self._conn = None
+
+def default_cache():
+    """Shared DiskCache at $ROTOR_DISK_CACHE (or DEFAULT_PATH); None if that is set to "off"."""
+    global _default
+    if os.environ.get(ENV_VAR, "").lower() in ("off", "0", "none"):
+        return None
+    if _default is None:
+        _default = DiskCache()
+    return _default
+
+_default = None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or clear the persistent rotor evaluation cache.")
+    parser.add_argument("command", choices=("stats", "clear", "prune", "vacuum"))
+    parser.add_argument("--path", help=f"cache file (default: ${ENV_VAR} or {DEFAULT_PATH})")
+    parser.add_argument("--max-entries", type=int, help="prune: number of entries to keep")
+    args = parser.parse_args(argv)
+    cache = DiskCache(args.path)
+    if args.command == "clear":
+        cache.clear()
+    elif args.command == "prune":
+        cache.prune(args.max_entries)
+    elif args.command == "vacuum":
+        cache.vacuum()
+    st = cache.stats()
+    print(f"{st['path']}  solver {st['solver_stamp']}  {st['file_bytes']/1e6:.2f} MB")
+    for name, e in sorted(st["entries"].items()):
+        print(f"  {name:24s} {e['count']:8d} entries  {e['bytes']/1e6:8.2f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import hashlib
+import threading
+import weakref
+from numbers import Real
+
+import numpy as np
+
+class Frozen:
+    """
+    Base of the immutable geometry value objects (Airfoil, Blade, Rotor and
+    their tabulated variants). Subclasses declare __slots__, list their
+    constructor arguments in _ARGS (returned by _args()) and call _freeze()
+    at the end of __init__; attributes cannot be set after that.
+
+    Equality and hashing are by content: key() is a canonical tuple of the
+    constructor arguments (arrays by dtype, shape and bytes, nested geometry
+    by its own key), content_hash() a sha256 of it that is stable across
+    processes. Pickles carry only the constructor arguments and unpickle
+    through intern(), so identical geometries sent to a worker share one
+    instance there. Derived state (grids, interpolants) is rebuilt, never
+    pickled.
+    """
+    __slots__ = ("_frozen", "_key", "_hash", "__weakref__")
+    _ARGS = ()
+
+    def _args(self):
+        return tuple(getattr(self, n) for n in self._ARGS)
+
+    def _freeze(self):
+        object.__setattr__(self, "_frozen", True)
+
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"{type(self).__name__} is immutable; use replace({name}=...) for a modified copy")
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def key(self):
+        try:
+            return self._key
+        except AttributeError:
+            key = (type(self).__qualname__, tuple(canonical(a) for a in self._args()))
+            object.__setattr__(self, "_key", key)
+            return key
+
+    def content_hash(self):
+        # hex sha256 of the canonical key; the same in every process and session
+        try:
+            return self._hash
+        except AttributeError:
+            h = hashlib.sha256(repr(self.key()).encode()).hexdigest()
+            object.__setattr__(self, "_hash", h)
+            return h
+
+    def __hash__(self):
+        return int(self.content_hash()[:16], 16)
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.content_hash() == other.content_hash() and self.key() == other.key()
+
+    def __reduce__(self):
+        return _restore, (type(self), self._args())
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def replace(self, **changes):
+        """Copy with some constructor arguments changed, e.g. blade.replace(theta_root_rad=0.1)."""
+        kwargs = dict(zip(self._ARGS, self._args()))
+        unknown = set(changes) - set(kwargs)
+        if unknown:
+            raise TypeError(f"{type(self).__name__}.replace() got unknown arguments {sorted(unknown)}")
+        kwargs.update(changes)
+        return type(self)(**kwargs)
+
+    def __repr__(self):
+        args = ", ".join(f"{n}={_short(v)}" for n, v in zip(self._ARGS, self._args()))
+        return f"{type(self).__name__}({args})"
+
+def _short(v):
+    return f"<array {v.shape}>" if isinstance(v, np.ndarray) else repr(v)
+
+def canonical(v):
+    # hashable, repr-stable form of a constructor argument
+    if isinstance(v, Frozen):
+        return v.key()
+    if isinstance(v, np.ndarray):
+        v = np.ascontiguousarray(v)
+        return ("ndarray", v.dtype.str, v.shape, v.tobytes())
+    if isinstance(v, (list, tuple)):
+        return tuple(canonical(x) for x in v)
+    if isinstance(v, Real) and not isinstance(v, bool):
+        return float(v)
+    return v
+
+_interned = weakref.WeakValueDictionary()
+_intern_lock = threading.Lock()
+
+def intern(obj):
+    """
+    The canonical instance for obj's content: the first equal object still
+    alive, else obj itself. Nested geometry (a rotor's blade and airfoil) is
+    shared too when it was interned before.
+    """
+    if obj is None:
+        return None
+    key = (type(obj), obj.content_hash())
+    with _intern_lock:
+        existing = _interned.get(key)
+        if existing is not None and existing.key() == obj.key():
+            return existing
+        _interned[key] = obj
+        return obj
+
+def _restore(cls, args):
+    return intern(cls(*args))
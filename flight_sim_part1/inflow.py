@@ -1,4 +1,5 @@
 import math
+import numpy as np
 
 def prandtl_tip_loss(B, r, R, lambda_):
     lambda_safe = max(abs(lambda_), 1e-8)
@@ -9,8 +10,13 @@ def prandtl_tip_loss(B, r, R, lambda_):
     return max(F, 1e-6)
 
 
-def induced_velocity_annulus(rotor, r, V, omega, rho, max_iter=200, tol=1e-6, damp=0.6):
+def induced_velocity_annulus(rotor, r, V, omega, rho, max_iter=200, tol=1e-6, damp=0.6, diagnostics=None,
+                             newton_fallback=False, a=None):
+    # diagnostics: optional solver_state.SolverDiagnostics, records this section's iteration count and residual
+    # newton_fallback: a section Newton leaves unconverged is finished by the safeguarded solver
+    # a: speed of sound [m/s]; polars tabulated over Mach are read at the section Mach number U/a
     b = rotor.blade
+    a = mach_speed(b.airfoil, a)
     B = rotor.B
     Ut = omega * r
     c = b.c(r)
@@ -19,7 +25,10 @@ def induced_velocity_annulus(rotor, r, V, omega, rho, max_iter=200, tol=1e-6, da
     # initial guess for vi
     vi = 0.05 * max(1.0, Ut)
 
+    n_iter = 0
+    converged = False
     for _ in range(max_iter):
+        n_iter += 1
         Uax = V + vi
         phi = math.atan2(Uax, Ut)
 
@@ -29,13 +38,14 @@ def induced_velocity_annulus(rotor, r, V, omega, rho, max_iter=200, tol=1e-6, da
         U = math.hypot(Ut, Uax)
         q = 0.5 * rho * U * U
         alpha = th - phi
-        Cl, Cd, _ = b.airfoil.lookup(alpha)   # ✅ lookup
+        Cl, Cd, _ = b.airfoil.lookup(alpha) if a is None else b.airfoil.lookup(alpha, U / a)
 
         dT_BE_dr = B * q * c * (Cl * math.cos(phi) - Cd * math.sin(phi))
         dT_MT_dr = 4.0 * math.pi * rho * F * r * Uax * vi
 
         Rres = dT_BE_dr - dT_MT_dr
         if abs(Rres) < tol * (1.0 + abs(dT_BE_dr)):
+            converged = True
             break
 
         # finite-difference slope
@@ -48,7 +58,7 @@ def induced_velocity_annulus(rotor, r, V, omega, rho, max_iter=200, tol=1e-6, da
         U_p = math.hypot(Ut, Uax_p)
         q_p = 0.5 * rho * U_p * U_p
         alpha_p = th - phi_p
-        Cl_p, Cd_p, _ = b.airfoil.lookup(alpha_p)  # ✅ lookup
+        Cl_p, Cd_p, _ = b.airfoil.lookup(alpha_p) if a is None else b.airfoil.lookup(alpha_p, U_p / a)
         dT_BE_dr_p = B * q_p * c * (Cl_p * math.cos(phi_p) - Cd_p * math.sin(phi_p))
         dT_MT_dr_p = 4.0 * math.pi * rho * F_p * r * Uax_p * vi_p
         Rres_p = dT_BE_dr_p - dT_MT_dr_p
@@ -57,11 +67,466 @@ def induced_velocity_annulus(rotor, r, V, omega, rho, max_iter=200, tol=1e-6, da
         step = -Rres / dR_dvi
         vi = max(0.0, vi + damp * step)
 
+    if not converged and newton_fallback:
+        vi, n_iter, converged = _finish_safeguarded(b, B, r, V, Ut, c, th, rho, max_iter, tol, n_iter, a)
+
     # final local quantities
     Uax = V + vi
     phi = math.atan2(Uax, Ut)
     U = math.hypot(Ut, Uax)
     q = 0.5 * rho * U * U
     alpha = th - phi
-    Cl, Cd, _ = b.airfoil.lookup(alpha)   # ✅ lookup
+    Cl, Cd, _ = b.airfoil.lookup(alpha) if a is None else b.airfoil.lookup(alpha, U / a)
+    if diagnostics is not None:
+        F = prandtl_tip_loss(B, r, b.R_tip, Uax / Ut if Ut != 0.0 else 1e-8)
+        dT_BE_dr = B * q * c * (Cl * math.cos(phi) - Cd * math.sin(phi))
+        Rres = dT_BE_dr - 4.0 * math.pi * rho * F * r * Uax * vi
+        residual = abs(Rres) / (1.0 + abs(dT_BE_dr))
+        diagnostics.record("newton", r=np.array(r), alpha=np.array(alpha), iterations=np.array(n_iter),
+                           residual=np.array(residual), unconverged=np.array(not residual < tol),
+                           max_iter=np.array(not converged), clamped=np.array(vi == 0.0 and not residual < tol),
+                           refined=np.array(False))
     return vi, phi, q, Cl, Cd, U
+
+
+# ---------------------------------------------------------------------------
+# Vectorized (batched) kernel: every radial station is solved at the same time
+# ---------------------------------------------------------------------------
+
+def prandtl_tip_loss_array(B, r, R, lambda_):
+    # array version of prandtl_tip_loss (same clamps)
+    lambda_safe = np.maximum(np.abs(lambda_), 1e-8)
+    f = 0.5 * B * (1.0 - r / R) / lambda_safe
+    f = np.clip(f, 1e-8, 50.0)
+    exp_arg = np.exp(-f)
+    F = (2.0 / np.pi) * np.arccos(np.clip(exp_arg, -1.0, 1.0))
+    return np.maximum(F, 1e-6)
+
+
+def mach_speed(airfoil, a):
+    # the speed of sound the polar is read with: a for airfoils tabulated over more than one
+    # Mach number, None (Mach-independent lookup) otherwise
+    mach = getattr(airfoil, "mach", None)
+    return a if a is not None and mach is not None and np.size(mach) > 1 else None
+
+
+def _polar(airfoil, alpha, U, a):
+    # Cl, Cd at the angle of attack, and at the section Mach number U/a unless a is None (see mach_speed)
+    if a is None:
+        Cl, Cd, _ = airfoil.lookup_array(alpha)
+    else:
+        Cl, Cd, _ = airfoil.lookup_array(alpha, U / a)
+    return Cl, Cd
+
+
+def _polar_slopes(airfoil, alpha, U, a):
+    # dCl/dalpha, dCd/dalpha and, with a Mach-dependent polar, dCl/dMach, dCd/dMach (else 0.0)
+    if a is None:
+        dCl, dCd = airfoil.lookup_array_slope(alpha)
+        return dCl, dCd, 0.0, 0.0
+    M = U / a
+    dCl, dCd = airfoil.lookup_array_slope(alpha, M)
+    return (dCl, dCd) + airfoil.lookup_array_mach_slope(alpha, M)
+
+
+def _annulus_residual(b, B, r, V, Ut, c, th, vi, rho, a=None):
+    # BE thrust minus momentum thrust per unit span, for arrays of sections
+    Uax = V + vi
+    phi = np.arctan2(Uax, Ut)
+    lambda_local = np.where(Ut != 0.0, Uax / np.where(Ut != 0.0, Ut, 1.0), 1e-8)
+    F = prandtl_tip_loss_array(B, r, b.R_tip, lambda_local)
+    U = np.hypot(Ut, Uax)
+    q = 0.5 * rho * U * U
+    Cl, Cd = _polar(b.airfoil, th - phi, U, a)
+    dT_BE_dr = B * q * c * (Cl * np.cos(phi) - Cd * np.sin(phi))
+    dT_MT_dr = 4.0 * np.pi * rho * F * r * Uax * vi
+    return dT_BE_dr - dT_MT_dr, dT_BE_dr
+
+
+def tip_loss_slope_array(B, r, R, lambda_):
+    # dF/dlambda of prandtl_tip_loss_array (zero wherever a clamp is active)
+    lambda_safe = np.maximum(np.abs(lambda_), 1e-8)
+    f_raw = 0.5 * B * (1.0 - r / R) / lambda_safe
+    f = np.clip(f_raw, 1e-8, 50.0)
+    e = np.exp(-f)
+    floor = max(1e-300, float(np.finfo(e.dtype).tiny))  # 1e-300 underflows in float32
+    dF_df = (2.0 / np.pi) * e / np.sqrt(np.maximum(1.0 - e * e, floor))
+    live = (np.abs(lambda_) > 1e-8) & (f_raw > 1e-8) & (f_raw < 50.0)
+    live &= (2.0 / np.pi) * np.arccos(e) > 1e-6
+    return np.where(live, dF_df * (-f / np.where(lambda_ != 0.0, lambda_, 1.0)), 0.0)
+
+
+def _annulus_residual_slope(b, B, r, V, Ut, c, th, vi, rho, a=None):
+    # residual, analytic d(residual)/d(vi) and BE thrust per unit span
+    Uax = V + vi
+    phi = np.arctan2(Uax, Ut)
+    U2 = Ut * Ut + Uax * Uax
+    q = 0.5 * rho * U2
+    alpha = th - phi
+    U = np.sqrt(U2) if a is not None else None
+    Cl, Cd = _polar(b.airfoil, alpha, U, a)
+    dCl, dCd, dCl_M, dCd_M = _polar_slopes(b.airfoil, alpha, U, a)
+    cph, sph = np.cos(phi), np.sin(phi)
+    g = Cl * cph - Cd * sph
+    h = Cl * sph + Cd * cph
+    U2_safe = np.where(U2 > 0.0, U2, 1.0)
+    dphi = Ut / U2_safe
+    dg = -dphi * ((dCl * cph - dCd * sph) + h)
+    if a is not None:
+        # the section Mach number U/a rises with the inflow: dM/dvi = Uax/(U a)
+        dg = dg + (dCl_M * cph - dCd_M * sph) * Uax / (np.sqrt(U2_safe) * a)
+    dT_BE_dr = B * q * c * g
+    ddT_BE = B * c * (rho * Uax * g + q * dg)
+
+    nz = Ut != 0.0
+    Ut_safe = np.where(nz, Ut, 1.0)
+    lambda_local = np.where(nz, Uax / Ut_safe, 1e-8)
+    F = prandtl_tip_loss_array(B, r, b.R_tip, lambda_local)
+    dF = np.where(nz, tip_loss_slope_array(B, r, b.R_tip, lambda_local) / Ut_safe, 0.0)
+    k = 4.0 * np.pi * rho * r
+    dT_MT_dr = k * F * Uax * vi
+    ddT_MT = k * (dF * Uax * vi + F * (Uax + vi))
+    return dT_BE_dr - dT_MT_dr, ddT_BE - ddT_MT, dT_BE_dr
+
+
+def annulus_partials(b, B, r, V, Ut, c, th, vi, rho, a=None):
+    """
+    Partial derivatives of the annulus residual R (BE minus momentum thrust
+    per unit span) at vi, for implicit differentiation of the converged
+    inflow: returns (R, dR/dvi, dR/dV, dR/dUt, dR/dtheta, dR/dc) and the
+    polar (Cl, Cd, dCl/dalpha, dCd/dalpha, dCl/dMach, dCd/dMach) at the
+    section's angle of attack and Mach number (the Mach slopes are 0.0 when
+    the polar does not depend on Mach, see mach_speed).
+    R is proportional to rho, so dR/drho = R/rho (at fixed speed of sound).
+    """
+    Uax = V + vi
+    phi = np.arctan2(Uax, Ut)
+    U2 = Ut * Ut + Uax * Uax
+    q = 0.5 * rho * U2
+    alpha = th - phi
+    U = np.sqrt(U2) if a is not None else None
+    Cl, Cd = _polar(b.airfoil, alpha, U, a)
+    dCl, dCd, dCl_M, dCd_M = _polar_slopes(b.airfoil, alpha, U, a)
+    cph, sph = np.cos(phi), np.sin(phi)
+    g = Cl * cph - Cd * sph
+    g_alpha = dCl * cph - dCd * sph
+    g_phi = -(g_alpha + Cl * sph + Cd * cph)
+    U2_safe = np.where(U2 > 0.0, U2, 1.0)
+    BE = B * q * c * g
+    BE_Uax = B * c * (rho * Uax * g + q * g_phi * Ut / U2_safe)
+    BE_Ut = B * c * (rho * Ut * g - q * g_phi * Uax / U2_safe)
+    if a is not None:
+        # dM/dUax = Uax/(U a), dM/dUt = Ut/(U a)
+        g_M = (dCl_M * cph - dCd_M * sph) / (np.sqrt(U2_safe) * a)
+        BE_Uax = BE_Uax + B * q * c * g_M * Uax
+        BE_Ut = BE_Ut + B * q * c * g_M * Ut
+
+    nz = Ut != 0.0
+    Ut_safe = np.where(nz, Ut, 1.0)
+    lambda_local = np.where(nz, Uax / Ut_safe, 1e-8)
+    F = prandtl_tip_loss_array(B, r, b.R_tip, lambda_local)
+    dF = np.where(nz, tip_loss_slope_array(B, r, b.R_tip, lambda_local) / Ut_safe, 0.0)  # dF/dUax
+    k = 4.0 * np.pi * rho * r
+    MT_Uax = k * vi * (dF * Uax + F)
+    R = BE - k * F * Uax * vi
+    R_vi = BE_Uax - MT_Uax - k * F * Uax
+    R_V = BE_Uax - MT_Uax
+    R_Ut = BE_Ut + k * vi * Uax * dF * lambda_local
+    return R, R_vi, R_V, R_Ut, B * q * c * g_alpha, B * q * g, Cl, Cd, dCl, dCd, dCl_M, dCd_M
+
+
+def momentum_inflow_guess(b, B, r, V, Ut, c, th, F=1.0):
+    """
+    Small-angle BEMT inflow for a linear lift curve (Cl = a0*alpha, no drag):
+        0.5*B*c*a0*Ut*(th*Ut - Uax) = 4*pi*F*r*Uax*(Uax - V)
+    solved as a quadratic in Uax. Returns vi >= 0. Airfoils without a lift
+    slope attribute a0 fall back to 2*pi.
+    """
+    a0 = getattr(b.airfoil, "a0", 2.0 * np.pi)
+    A = 4.0 * np.pi * F * r
+    Bq = 0.5 * B * c * a0 * Ut - A * V
+    C = 0.5 * B * c * a0 * Ut * Ut * th
+    disc = np.sqrt(np.maximum(Bq * Bq + 4.0 * A * C, 0.0))
+    Uax = (disc - Bq) / (2.0 * A)
+    return np.maximum(0.0, Uax - V)
+
+
+def _sel(x, idx):
+    # per-section array (rho of a multi-condition batch) restricted to idx; scalars pass through
+    return x if np.ndim(x) == 0 else x[idx]
+
+
+def _solve_damped_newton(b, B, r, V, Ut, c, th, vi, rho, max_iter, tol, damp, trace=None, a=None):
+    # original scheme: damped Newton with a finite-difference slope
+    # trace: optional (iterations, unconverged) arrays filled in place
+    # a: speed of sound for Mach-dependent polars (see mach_speed), scalar or per section
+    active = np.arange(r.size)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        if trace is not None:
+            trace[0][active] += 1
+        ra, Va, Uta, ca, tha, via = r[active], V[active], Ut[active], c[active], th[active], vi[active]
+        rhoa, aa = _sel(rho, active), _sel(a, active)
+        Rres, dT_BE_dr = _annulus_residual(b, B, ra, Va, Uta, ca, tha, via, rhoa, aa)
+
+        # converged sections leave the active set
+        keep = ~(np.abs(Rres) < tol * (1.0 + np.abs(dT_BE_dr)))
+        active = active[keep]
+        if active.size == 0:
+            break
+        ra, Va, Uta, ca, tha, via, Rres = ra[keep], Va[keep], Uta[keep], ca[keep], tha[keep], via[keep], Rres[keep]
+        rhoa, aa = _sel(rhoa, keep), _sel(aa, keep)
+
+        # finite-difference slope
+        dvi = np.maximum(1e-4, 0.01 * (via + 1.0))
+        vi_p = np.maximum(0.0, via + dvi)
+        Rres_p, _ = _annulus_residual(b, B, ra, Va, Uta, ca, tha, vi_p, rhoa, aa)
+
+        dR = Rres_p - Rres
+        dR_dvi = np.where(np.abs(dR) > 1e-16, dR / dvi, 1.0)
+        step = -Rres / dR_dvi
+        vi[active] = np.maximum(0.0, via + damp * step)
+    if trace is not None:
+        trace[1][active] = True
+    return vi
+
+
+def _solve_safeguarded(b, B, r, V, Ut, c, th, vi, rho, max_iter, tol, trace=None, a=None):
+    """
+    Newton with the analytic slope, safeguarded by a bracket [lo, hi] on vi.
+    The residual is positive below the root and negative above it, so every
+    evaluation tightens the bracket; Newton steps that leave it (or make too
+    little progress) are replaced by bisection, which bounds the iteration
+    count. vi = 0 is tried once when Newton points below zero; a non-positive
+    residual there means the clamped solution vi = 0, as in the original solver.
+    trace: optional (iterations, unconverged) arrays filled in place.
+    a: speed of sound for Mach-dependent polars (see mach_speed).
+    """
+    n = r.size
+    lo = np.zeros(n, dtype=r.dtype)
+    hi = np.full(n, np.inf, dtype=r.dtype)
+    zero_tried = np.zeros(n, dtype=bool)
+    step_prev = np.full(n, np.inf, dtype=r.dtype)
+    # bracket width treated as collapsed (a few ulps in single precision)
+    gap = max(1e-12, 4.0 * float(np.finfo(r.dtype).eps))
+    active = np.arange(n)
+    for _ in range(max_iter):
+        if active.size == 0:
+            break
+        if trace is not None:
+            trace[0][active] += 1
+        ra, Va, Uta, ca, tha, x = r[active], V[active], Ut[active], c[active], th[active], vi[active]
+        Rres, dR, dT_BE_dr = _annulus_residual_slope(b, B, ra, Va, Uta, ca, tha, x, _sel(rho, active),
+                                                     _sel(a, active))
+
+        # bracket update
+        lo_a = np.where(Rres > 0.0, x, lo[active])
+        hi_a = np.where(Rres > 0.0, hi[active], x)
+        done = np.abs(Rres) < tol * (1.0 + np.abs(dT_BE_dr))
+        done |= (x == 0.0) & (Rres <= 0.0)
+        done |= np.isfinite(hi_a) & ((hi_a - lo_a) <= gap * (1.0 + hi_a))
+        lo[active], hi[active] = lo_a, hi_a
+
+        keep = ~done
+        active = active[keep]
+        if active.size == 0:
+            break
+        x, Rres, dR, lo_a, hi_a = x[keep], Rres[keep], dR[keep], lo_a[keep], hi_a[keep]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_new = x - Rres / dR
+        # Newton is kept while it stays inside the bracket and the residual
+        # falls faster than the previous step would by bisection
+        ok = np.isfinite(x_new) & (x_new > lo_a) & (x_new < hi_a)
+        ok &= np.abs(2.0 * Rres) <= np.abs(step_prev[active] * dR)
+        try_zero = ~ok & (lo_a == 0.0) & ~zero_tried[active] & np.isfinite(x_new) & (x_new <= 0.0)
+        fallback = np.where(np.isfinite(hi_a), 0.5 * (lo_a + hi_a), 2.0 * x + 1.0)
+        x_new = np.where(ok, x_new, np.where(try_zero, 0.0, fallback))
+        zero_tried[active] |= try_zero
+        step_prev[active] = np.abs(x_new - x)
+        vi[active] = x_new
+    if trace is not None:
+        trace[1][active] = True
+    return vi
+
+
+def _finish_safeguarded(b, B, r, V, Ut, c, th, rho, max_iter, tol, n_iter, a=None):
+    # one section the damped Newton left unconverged, re-solved by the safeguarded
+    # solver from the momentum guess; returns (vi, iterations, converged)
+    arrays = [np.array([x], dtype=float) for x in (r, V, Ut, c, th)]
+    sub = (np.zeros(1, dtype=int), np.zeros(1, dtype=bool))
+    vi = _solve_safeguarded(b, B, *arrays, momentum_inflow_guess(b, B, *arrays), rho, max_iter, tol, sub, a)
+    return float(vi[0]), n_iter + int(sub[0][0]), not sub[1][0]
+
+
+def _solve_closed_form(b, B, r, V, Ut, c, th, rho, max_iter, tol, small_angle_max,
+                       closed_form_tol, tip_loss_iter=2, polish_steps=2, trace=None, a=None):
+    """
+    Closed-form inflow for the linear-lift regime: momentum_inflow_guess with
+    a short fixed-point loop on the Prandtl factor F, then polish_steps
+    analytic Newton steps on the full BEMT residual (the quadratic leaves out
+    drag and the large-angle terms: a relative residual of 1e-3 to 3e-2 in
+    hover, which two steps take below 1e-6 at the tip, the worst section).
+    Sections whose solution is stalled, outside the
+    small-angle bound (phi > small_angle_max), or whose full BEMT residual
+    exceeds closed_form_tol (relative, same measure as the iterative solvers;
+    None skips the check) are finished by the safeguarded solver, starting
+    from the closed-form value - except sections clamped at vi = 0 with a
+    non-positive residual there, which that solver would return unchanged.
+    """
+    af = b.airfoil
+    if getattr(af, "a0", None) is None or not hasattr(af, "alpha_stall"):
+        # no linear lift curve to build the closed form on
+        vi = momentum_inflow_guess(b, B, r, V, Ut, c, th)
+        return _solve_safeguarded(b, B, r, V, Ut, c, th, vi, rho, max_iter, tol, trace, a)
+
+    nz = Ut != 0.0
+    Ut_safe = np.where(nz, Ut, 1.0)
+    F = np.ones_like(r)
+    for _ in range(tip_loss_iter):
+        vi = momentum_inflow_guess(b, B, r, V, Ut, c, th, F)
+        lambda_local = np.where(nz, (V + vi) / Ut_safe, 1e-8)
+        F_new = prandtl_tip_loss_array(B, r, b.R_tip, lambda_local)
+        if np.max(np.abs(F_new - F), initial=0.0) < 1e-6:
+            F = F_new
+            break
+        F = F_new
+    vi = momentum_inflow_guess(b, B, r, V, Ut, c, th, F)
+    for _ in range(polish_steps):
+        Rres, dR, _ = _annulus_residual_slope(b, B, r, V, Ut, c, th, vi, rho, a)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = Rres / dR
+        vi = np.where(np.isfinite(step) & (dR < 0.0), np.maximum(0.0, vi - step), vi)
+
+    phi = np.arctan2(V + vi, Ut)
+    refine = (np.abs(th - phi) >= af.alpha_stall) | (np.abs(phi) > small_angle_max) | ~nz
+    Rres, dT_BE_dr = _annulus_residual(b, B, r, V, Ut, c, th, vi, rho, a)
+    if closed_form_tol is not None:
+        refine |= ~(np.abs(Rres) < closed_form_tol * (1.0 + np.abs(dT_BE_dr)))
+    # a non-positive residual at vi = 0 is the clamped solution (reversed flow), where the
+    # safeguarded solver would stop at its first evaluation
+    refine &= ~((vi == 0.0) & (Rres <= 0.0))
+    idx = np.flatnonzero(refine)
+    if idx.size:
+        sub = (np.zeros(idx.size, dtype=int), np.zeros(idx.size, dtype=bool)) if trace is not None else None
+        vi[idx] = _solve_safeguarded(b, B, r[idx], V[idx], Ut[idx], c[idx], th[idx], vi[idx].copy(),
+                                     _sel(rho, idx), max_iter, tol, sub, _sel(a, idx))
+        if trace is not None:
+            trace[0][idx], trace[1][idx] = sub
+    return vi
+
+
+SOLVERS = ("newton", "safeguarded", "closed_form")
+
+
+def induced_velocity_sections(rotor, r, V, omega, rho, max_iter=200, tol=1e-6, damp=0.6, solver="newton",
+                              small_angle_max=math.radians(20.0), closed_form_tol=1e-3, vi0=None,
+                              chord=None, twist=None, diagnostics=None, newton_fallback=False, a=None):
+    """
+    Batched counterpart of induced_velocity_annulus.
+    r, V, omega and rho may be arrays of any (broadcastable) shape; each
+    element is an independent annulus (several operating conditions can be
+    solved in one call). All sections are iterated together and a section
+    drops out of the iteration as soon as its own residual has converged.
+    solver="newton" is the original damped finite-difference Newton, so the
+    per-section iteration history matches the scalar solver; sections it
+    leaves unconverged after max_iter (typically reversed flow in forward
+    flight, where it stalls at the vi = 0 clamp) are kept as they are, or
+    finished by the safeguarded solver with newton_fallback=True;
+    solver="safeguarded" uses the analytic slope with a bisection safeguard,
+    starting from the momentum-theory guess (damp is unused there);
+    solver="closed_form" uses the small-angle quadratic solution where it is
+    valid (see _solve_closed_form for small_angle_max/closed_form_tol).
+    vi0 optionally replaces the iterative solvers' initial guess (warm start,
+    broadcast to the section shape; nan entries and sections with V < 0 keep
+    the cold guess); the closed form does not need one.
+    chord/twist optionally supply the blade chord and pitch at r (e.g. from a
+    BladeGrid, broadcast like vi0) instead of evaluating the blade at r.
+    diagnostics (solver_state.SolverDiagnostics) optionally records per-section
+    iteration counts, final residuals and the non-convergence mask of this solve.
+    a is the speed of sound [m/s], scalar or broadcast to the section shape
+    like vi0: airfoils tabulated over Mach are then read at the section Mach
+    number U/a in the residual, its slope and the returned Cl, Cd; without
+    it (or for Mach-independent polars) the polar is read without Mach.
+    The solve runs in the precision of r: float32 radii give a float32 solve
+    (all other inputs are cast to it), anything else float64.
+    Returns arrays (vi, phi, q, Cl, Cd, U) with the broadcast shape.
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Unknown inflow solver '{solver}' (expected one of {SOLVERS})")
+    b = rotor.blade
+    B = rotor.B
+    dtype = np.result_type(np.asarray(r).dtype, np.float32)
+    r, V, omega_b = np.broadcast_arrays(np.asarray(r, dtype=dtype), np.asarray(V, dtype=dtype),
+                                        np.asarray(omega, dtype=dtype))
+    if np.ndim(rho) != 0:
+        r, V, omega_b, rho = np.broadcast_arrays(r, V, omega_b, np.asarray(rho, dtype=dtype))
+        rho = rho.ravel()
+    shape = r.shape
+    a = mach_speed(b.airfoil, a)
+    if np.ndim(a) != 0:
+        a = np.broadcast_to(np.asarray(a, dtype=dtype), shape).ravel()
+    r = r.ravel()
+    V = V.ravel()
+    Ut = (omega * r) if np.ndim(omega) == 0 else omega_b.ravel() * r
+    if chord is None:
+        c = np.asarray(b.c(r), dtype=dtype)
+    else:
+        c = np.broadcast_to(np.asarray(chord, dtype=dtype), shape).ravel()
+    if twist is None:
+        th = np.asarray(b.theta(r), dtype=dtype)
+    else:
+        th = np.broadcast_to(np.asarray(twist, dtype=dtype), shape).ravel()
+
+    trace = (np.zeros(r.size, dtype=int), np.zeros(r.size, dtype=bool)) if diagnostics is not None else None
+    if solver == "closed_form":
+        vi = _solve_closed_form(b, B, r, V, Ut, c, th, rho, max_iter, tol, small_angle_max, closed_form_tol,
+                                trace=trace, a=a)
+    elif solver == "safeguarded":
+        vi = momentum_inflow_guess(b, B, r, V, Ut, c, th)
+    else:
+        # initial guess for vi
+        vi = 0.05 * np.maximum(1.0, Ut)
+    if vi0 is not None and solver != "closed_form":
+        vi0 = np.broadcast_to(np.asarray(vi0, dtype=dtype), shape).ravel()
+        # descending sections (V < 0) can have several momentum roots; they keep
+        # the cold guess so the root found does not depend on the seed
+        vi = np.where(np.isfinite(vi0) & (V >= 0.0), np.maximum(0.0, vi0), vi)
+
+    if solver == "safeguarded":
+        vi = _solve_safeguarded(b, B, r, V, Ut, c, th, vi, rho, max_iter, tol, trace, a)
+    elif solver == "newton":
+        nt = trace if trace is not None else (np.zeros(r.size, dtype=int), np.zeros(r.size, dtype=bool))
+        vi = _solve_damped_newton(b, B, r, V, Ut, c, th, vi, rho, max_iter, tol, damp, nt, a)
+        idx = np.flatnonzero(nt[1]) if newton_fallback else ()
+        if len(idx):
+            args = (r[idx], V[idx], Ut[idx], c[idx], th[idx])
+            sub = (np.zeros(idx.size, dtype=int), np.zeros(idx.size, dtype=bool))
+            vi[idx] = _solve_safeguarded(b, B, *args, momentum_inflow_guess(b, B, *args), _sel(rho, idx),
+                                         max_iter, tol, sub, _sel(a, idx))
+            nt[0][idx] += sub[0]
+            nt[1][idx] = sub[1]
+
+    # final local quantities
+    Uax = V + vi
+    phi = np.arctan2(Uax, Ut)
+    U = np.hypot(Ut, Uax)
+    q = 0.5 * rho * U * U
+    Cl, Cd = _polar(b.airfoil, th - phi, U, a)
+    if diagnostics is not None:
+        Rres, dT_BE_dr = _annulus_residual(b, B, r, V, Ut, c, th, vi, rho, a)
+        residual = np.abs(Rres) / (1.0 + np.abs(dT_BE_dr))
+        # converged: the residual meets the tolerance the section was solved to
+        # (closed-form sections without refinement: closed_form_tol)
+        accept = np.full(r.size, tol, dtype=float)
+        if solver == "closed_form":
+            accept[trace[0] == 0] = np.inf if closed_form_tol is None else closed_form_tol
+        within = residual < accept
+        diagnostics.record(solver, r=r.reshape(shape), alpha=(th - phi).reshape(shape),
+                           iterations=trace[0].reshape(shape), residual=residual.reshape(shape),
+                           unconverged=(~within).reshape(shape), max_iter=trace[1].reshape(shape),
+                           clamped=((vi == 0.0) & ~within).reshape(shape),
+                           refined=((trace[0] > 0) if solver == "closed_form" else np.zeros(r.size, dtype=bool)
+                                    ).reshape(shape))
+    return tuple(x.reshape(shape) for x in (vi, phi, q, Cl, Cd, U))
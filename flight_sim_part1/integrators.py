@@ -1,25 +1,233 @@
-import math, numpy as np
-from inflow import induced_velocity_annulus
+import ast, hashlib, importlib, math, warnings, numpy as np
+from inflow import induced_velocity_annulus, induced_velocity_sections
+from blade import BladeGrid
+from fidelity import get_profile
+from solver_state import SolverDiagnostics
 
-def instantaneous_integrator(rotor, V_forward, omega, rho, n_sections=48, n_azimuth=36):
+ENGINES = ("disk", "vector", "scalar")
+RADIAL_RULES = ("cosine", "gauss", "gauss_kronrod")
+# version of the numerical results: every commit that alters them (inflow solvers, quadrature,
+# profiles, warm start) must bump it; persistent caches and performance decks are keyed on it
+SOLVER_VERSION = 3
+
+def _source_digest(modules):
+    # sha256 of the parsed code of this file and the solver modules (docstrings dropped), so an
+    # edit that misses the SOLVER_VERSION bump still changes SOLVER_STAMP while comments,
+    # formatting, line endings and docstrings do not
+    digest = hashlib.sha256()
+    for path in [__file__] + [importlib.import_module(name).__file__ for name in modules]:
+        with open(path, "rb") as f:
+            tree = ast.parse(f.read())
+        for node in ast.walk(tree):
+            body = getattr(node, "body", None)
+            if (isinstance(body, list) and body and isinstance(body[0], ast.Expr)
+                    and isinstance(body[0].value, ast.Constant) and isinstance(body[0].value.value, str)):
+                node.body = body[1:] or [ast.Pass()]
+        digest.update(ast.dump(tree).encode())
+    return digest.hexdigest()[:16]
+
+# stamp of persistent results: the version and a digest of the code computing them
+SOLVER_STAMP = f"{SOLVER_VERSION}-{_source_digest(('inflow', 'blade', 'airfoil', 'rotor', 'fidelity', 'solver_state'))}"
+
+# Richardson order of the fixed rules on the BEMT integrand (the tip-loss
+# factor behaves like sqrt(R - r) at the tip)
+_RICHARDSON_ORDER = {"cosine": 2, "gauss": 3}
+
+# 15-point Kronrod extension of the 7-point Gauss rule on [-1, 1] (QUADPACK qk15)
+_XGK = np.array([0.991455371120812639206854697526329, 0.949107912342758524526189684047851,
+                 0.864864423359769072789712788640926, 0.741531185599394439863864773280788,
+                 0.586087235467691130294144845693013, 0.405845151377397166906606412076961,
+                 0.207784955007898467600689403773245, 0.0])
+_WGK = np.array([0.022935322010529224963732008058970, 0.063092092629978553290700663189204,
+                 0.104790010322250183839876322541518, 0.140653259715525918745189590510238,
+                 0.169004726639267902826583426598550, 0.190350578064785409913256402421014,
+                 0.204432940075298892414161999234649, 0.209482141084727828012999174891714])
+_WG = np.array([0.129484966168869693270611432679082, 0.279705391489276667901467771423780,
+                0.381830050505118944950369775488975, 0.417959183673469387755102040816327])
+_GK_X = np.concatenate([-_XGK[:-1], _XGK[::-1]])
+_GK_WK = np.concatenate([_WGK[:-1], _WGK[::-1]])
+_GK_WG = np.zeros(15)
+_GK_WG[1:7:2] = _WG[:-1]
+_GK_WG[7] = _WG[-1]
+_GK_WG[9:14:2] = _WG[-2::-1]
+
+def _section_loads(rotor, grid, psi, V_forward, omega, rho, solver="newton", solver_options=None, state=None,
+                   V_climb=None, diagnostics=None, collective=None, a=None):
+    # inflow and sectional loads dT/dr, dQ/dr on the (psi, r) grid at once;
+    # with arrays of conditions (V_forward, omega, rho of shape (K,)) on a (K, psi, r) grid.
+    # V_climb: optional axial (climb) velocity added to every section, scalar or (K,)
+    # collective: optional pitch [rad] added to every section, scalar or (K,)
+    # a: optional speed of sound [m/s] for Mach-dependent polars, scalar or (K,)
+    # the arrays of conditions are cast to the grid's precision (see BladeGrid.astype)
+    r, c = grid.r, grid.chord
+    if np.ndim(V_forward) == 0:
+        Vax_psi  = (V_forward * np.cos(psi))[:, None]
+        Vtan_psi = (V_forward * np.sin(psi))[:, None]
+    else:
+        dtype = r.dtype
+        V = np.asarray(V_forward, dtype=dtype)[:, None, None]
+        Vax_psi  = V * np.cos(psi)[None, :, None]
+        Vtan_psi = V * np.sin(psi)[None, :, None]
+        omega = np.asarray(omega, dtype=dtype)[:, None, None]
+        rho = np.asarray(rho, dtype=dtype)[:, None, None]
+        if V_climb is not None:
+            V_climb = np.asarray(V_climb, dtype=dtype)[:, None, None]
+        if collective is not None:
+            collective = np.asarray(collective, dtype=dtype)[:, None, None]
+        if a is not None:
+            a = np.asarray(a, dtype=dtype)[:, None, None]
+    if V_climb is not None:
+        Vax_psi = Vax_psi + V_climb
+    twist = grid.twist if collective is None else grid.twist + collective
+    key = ("disk", r.tobytes(), psi.tobytes())
+    vi0 = state.initial_guess(rotor, key, omega) if state is not None else None
+    if state is not None and diagnostics is None:
+        # the warm-start store keeps converged sections only, which the diagnostics tell
+        diagnostics = SolverDiagnostics()
+    vi, _, _, Cl, Cd, _ = induced_velocity_sections(rotor, r, Vax_psi, omega, rho, solver=solver, vi0=vi0,
+                                                    chord=c, twist=twist, diagnostics=diagnostics, a=a,
+                                                    **(solver_options or {}))
+    if state is not None:
+        state.store(rotor, key, omega, vi, converged=~diagnostics.records[-1]["unconverged"])
+
+    Ut  = omega*r + Vtan_psi
+    Uax = Vax_psi + vi
+    phi = np.arctan2(Uax, Ut)
+    U = np.hypot(Ut, Uax)
+    q  = 0.5*rho*U*U
+
+    Lp = q*c*Cl
+    Dp = q*c*Cd
+    dT = rotor.B * (Lp*np.cos(phi) - Dp*np.sin(phi))
+    dQ = rotor.B * (Lp*np.sin(phi) + Dp*np.cos(phi)) * r
+    return dT, dQ
+
+def _node_loads(rotor, grid, psi, V_forward, omega, rho, engine, solver, solver_options, state, V_climb=None,
+                diagnostics=None, collective=None, a=None):
+    # sectional loads on (psi, r); the disk engine solves all azimuths together,
+    # the vector engine one azimuth at a time
+    if engine == "disk":
+        return _section_loads(rotor, grid, psi, V_forward, omega, rho, solver, solver_options, state, V_climb,
+                              diagnostics, collective, a)
+    parts = [_section_loads(rotor, grid, psi[j:j+1], V_forward, omega, rho, solver, solver_options, state, V_climb,
+                            diagnostics, collective, a)
+             for j in range(psi.size)]
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts])
+
+def _grid_loads(rotor, grid, psi, V_forward, omega, rho, engine, solver, solver_options, state, V_climb=None,
+                diagnostics=None, collective=None, a=None):
+    # T(psi), Q(psi) on a fixed radial grid
+    dT, dQ = _node_loads(rotor, grid, psi, V_forward, omega, rho, engine, solver, solver_options, state, V_climb,
+                         diagnostics, collective, a)
+    return np.sum(dT * grid.dr, axis=-1), np.sum(dQ * grid.dr, axis=-1)
+
+def _converged(err_T, err_Q, T_psi, Q_psi, tol):
+    # per-azimuth error estimates against the load level
+    scale_T = max(float(np.max(np.abs(T_psi))), 1e-12)
+    scale_Q = max(float(np.max(np.abs(Q_psi))), 1e-12)
+    return np.max(err_T) <= tol*scale_T and np.max(err_Q) <= tol*scale_Q
+
+def _richardson_loads(rotor, psi, V_forward, omega, rho, rule, tol, n_max, engine, solver, solver_options, state,
+                      diagnostics=None, a=None):
+    """
+    Fixed rule refined by doubling the section count until the Richardson
+    error estimate |T_n - T_n/2| / (2^p - 1) is below tol relative to the
+    load level (or the next count would exceed n_max). Returns the
+    extrapolated loads, the final count and the estimates.
+    """
+    b = rotor.blade
+    p = _RICHARDSON_ORDER[rule]
+    refine = (lambda n: 2*n - 1) if rule == "cosine" else (lambda n: 2*n)  # cosine nodes stay nested
+    n = 9 if rule == "cosine" else 8
+    T_c, Q_c = _grid_loads(rotor, b.grid(n, rotor.B, rule), psi, V_forward, omega, rho, engine, solver,
+                           solver_options, state, diagnostics=diagnostics, a=a)
+    while True:
+        n = refine(n)
+        T_f, Q_f = _grid_loads(rotor, b.grid(n, rotor.B, rule), psi, V_forward, omega, rho, engine, solver,
+                               solver_options, state, diagnostics=diagnostics, a=a)
+        d_T = (T_f - T_c) / (2**p - 1)
+        d_Q = (Q_f - Q_c) / (2**p - 1)
+        if _converged(np.abs(d_T), np.abs(d_Q), T_f, Q_f, tol) or refine(n) > n_max:
+            break
+        T_c, Q_c = T_f, Q_f
+    return T_f + d_T, Q_f + d_Q, n, np.abs(d_T), np.abs(d_Q)
+
+def _gauss_kronrod_loads(rotor, psi, V_forward, omega, rho, tol, n_max, engine, solver, solver_options, state,
+                         diagnostics=None, a=None):
+    """
+    Adaptive 7/15-point Gauss-Kronrod quadrature over the span. Each interval
+    is estimated by |K15 - G7|; intervals carrying more than their share of
+    the tolerance are bisected (all new nodes solved in one batch) until the
+    summed estimate is below tol relative to the load level, or the node
+    count would exceed n_max.
+    """
+    b = rotor.blade
+    span = b.R_tip - b.R_root
+    lo = np.array([b.R_root])
+    hi = np.array([b.R_tip])
+    new_lo, new_hi = lo, hi
+    K_T = E_T = K_Q = E_Q = np.zeros((0, psi.size))
+    while True:
+        half = 0.5 * (new_hi - new_lo)
+        mid = 0.5 * (new_hi + new_lo)
+        r = (mid[:, None] + half[:, None] * _GK_X[None, :]).ravel()
+        grid = BladeGrid.from_nodes(b, r, np.ones_like(r), rotor.B)
+        f_T = np.zeros((psi.size, r.size))
+        f_Q = np.zeros((psi.size, r.size))
+        if grid.r.size:
+            f_T[:, grid.index], f_Q[:, grid.index] = _node_loads(rotor, grid, psi, V_forward, omega, rho, engine,
+                                                                 solver, solver_options, state,
+                                                                 diagnostics=diagnostics, a=a)
+        f_T = f_T.reshape(psi.size, -1, 15)
+        f_Q = f_Q.reshape(psi.size, -1, 15)
+        k_T, g_T = (f_T @ _GK_WK) * half, (f_T @ _GK_WG) * half
+        k_Q, g_Q = (f_Q @ _GK_WK) * half, (f_Q @ _GK_WG) * half
+        K_T = np.concatenate([K_T, k_T.T]); E_T = np.concatenate([E_T, np.abs(k_T - g_T).T])
+        K_Q = np.concatenate([K_Q, k_Q.T]); E_Q = np.concatenate([E_Q, np.abs(k_Q - g_Q).T])
+
+        T_psi, Q_psi = K_T.sum(axis=0), K_Q.sum(axis=0)
+        err_T, err_Q = E_T.sum(axis=0), E_Q.sum(axis=0)
+        n = 15 * lo.size
+        if _converged(err_T, err_Q, T_psi, Q_psi, tol):
+            break
+        # bisect the intervals whose error exceeds their share of the budget (at least the worst one)
+        share = (hi - lo) / span
+        scale_T = max(float(np.max(np.abs(T_psi))), 1e-12)
+        scale_Q = max(float(np.max(np.abs(Q_psi))), 1e-12)
+        split = (E_T.max(axis=1) > tol*scale_T*share) | (E_Q.max(axis=1) > tol*scale_Q*share)
+        if not split.any():
+            split[np.argmax(E_T.max(axis=1) / scale_T + E_Q.max(axis=1) / scale_Q)] = True
+        if n + 15 * int(split.sum()) > n_max:
+            break
+        m = 0.5 * (lo[split] + hi[split])
+        new_lo = np.concatenate([lo[split], m])
+        new_hi = np.concatenate([m, hi[split]])
+        keep = ~split
+        lo = np.concatenate([lo[keep], new_lo])
+        hi = np.concatenate([hi[keep], new_hi])
+        K_T, E_T, K_Q, E_Q = K_T[keep], E_T[keep], K_Q[keep], E_Q[keep]
+    return T_psi, Q_psi, n, err_T, err_Q
+
+def _scalar_loads(rotor, psi, V_forward, omega, rho, n_sections, solver_options, diagnostics=None, a=None):
+    # original per-section loop (reference path)
     b = rotor.blade
     mu = np.linspace(0, 1, n_sections)
     r_nodes = 0.5*(1 - np.cos(np.pi*mu))  # cosine spacing
     r = b.R_root + (b.R_tip - b.R_root) * r_nodes
     dr = np.gradient(r)
+    T_psi = np.zeros(psi.size)
+    Q_psi = np.zeros(psi.size)
 
-    T_psi = np.zeros(n_azimuth)
-    Q_psi = np.zeros(n_azimuth)
+    for j, psi_j in enumerate(psi):
+        Vax_psi  = V_forward * math.cos(psi_j)
+        Vtan_psi = V_forward * math.sin(psi_j)
 
-    for j, psi in enumerate(np.linspace(0.0, 2*np.pi, n_azimuth, endpoint=False)):
-        Vax_psi  = V_forward * math.cos(psi)
-        Vtan_psi = V_forward * math.sin(psi)
         T = Q = 0.0
-
         for ri, dri in zip(r, dr):
-            if b.c(ri) <= 0: 
+            if b.c(ri) <= 0:
                 continue
-            vi, phi, q, Cl, Cd, U0 = induced_velocity_annulus(rotor, ri, Vax_psi, omega, rho)
+            vi, phi, q, Cl, Cd, U0 = induced_velocity_annulus(rotor, ri, Vax_psi, omega, rho, diagnostics=diagnostics,
+                                                              a=a, **solver_options)
 
             Ut  = omega*ri + Vtan_psi
             Uax = Vax_psi + vi
@@ -38,9 +246,335 @@ def instantaneous_integrator(rotor, V_forward, omega, rho, n_sections=48, n_azim
 
     return T_psi, Q_psi
 
-def cycle_integrator(rotor, V_forward, omega, rho):
-    T_psi, Q_psi = instantaneous_integrator(rotor, V_forward, omega, rho)
-    T = float(np.mean(T_psi))
-    Q = float(np.mean(Q_psi))
+def instantaneous_integrator(rotor, V_forward, omega, rho, n_sections=48, n_azimuth=36, engine="disk", psi=None,
+                             solver="newton", solver_options=None, state=None, radial="cosine", radial_tol=None,
+                             return_info=False, diagnostics=None, a=None):
+    # psi: optional explicit azimuth stations [rad]; default is n_azimuth uniform stations
+    # solver_options: extra keyword arguments for the inflow solver (max_iter, tol, ...)
+    # state: optional solver_state.InflowState used to warm-start the inflow solve
+    # radial: spanwise quadrature (RADIAL_RULES); with radial_tol the section count is chosen to
+    #   meet the tolerance and n_sections is the upper bound ("gauss_kronrod" is always adaptive,
+    #   radial_tol defaults to 1e-3 there)
+    # return_info: also return a dict with the section count and per-azimuth radial error estimates
+    # diagnostics: optional solver_state.SolverDiagnostics collecting every inflow solve
+    # a: optional speed of sound [m/s]; airfoils tabulated over Mach are read at the section Mach number
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown integrator engine '{engine}' (expected one of {ENGINES})")
+    if radial not in RADIAL_RULES:
+        raise ValueError(f"Unknown radial rule '{radial}' (expected one of {RADIAL_RULES})")
+    if engine == "scalar" and solver != "newton":
+        raise ValueError("the scalar engine only supports solver='newton'")
+    if engine == "scalar" and state is not None:
+        raise ValueError("the scalar engine does not support warm-start state")
+    if engine == "scalar" and (radial != "cosine" or radial_tol is not None):
+        raise ValueError("the scalar engine only supports the fixed cosine radial rule")
+    solver_options = solver_options or {}
+
+    if psi is None:
+        psi = np.linspace(0.0, 2*np.pi, n_azimuth, endpoint=False)
+    psi = np.atleast_1d(np.asarray(psi, dtype=float))
+
+    err_T = err_Q = None
+    n_evaluated = n_sections
+    if engine == "scalar":
+        T_psi, Q_psi = _scalar_loads(rotor, psi, V_forward, omega, rho, n_sections, solver_options, diagnostics, a)
+    elif radial == "gauss_kronrod":
+        T_psi, Q_psi, n_evaluated, err_T, err_Q = _gauss_kronrod_loads(
+            rotor, psi, V_forward, omega, rho, 1e-3 if radial_tol is None else radial_tol, n_sections, engine,
+            solver, solver_options, state, diagnostics, a)
+    elif radial_tol is not None:
+        T_psi, Q_psi, n_evaluated, err_T, err_Q = _richardson_loads(
+            rotor, psi, V_forward, omega, rho, radial, radial_tol, n_sections, engine, solver, solver_options, state,
+            diagnostics, a)
+    else:
+        # cached discretization (sections with positive chord only)
+        grid = rotor.blade.grid(n_sections, rotor.B, radial)
+        T_psi, Q_psi = _grid_loads(rotor, grid, psi, V_forward, omega, rho, engine, solver, solver_options, state,
+                                   diagnostics=diagnostics, a=a)
+
+    if return_info:
+        info = {"radial": radial, "n_sections_evaluated": n_evaluated,
+                "radial_error_T": err_T, "radial_error_Q": err_Q}
+        return T_psi, Q_psi, info
+    return T_psi, Q_psi
+
+def _radial_summary(infos):
+    # radial info of one or more instantaneous_integrator calls, as bounds on the azimuth average
+    out = {"radial": infos[0]["radial"],
+           "n_sections_evaluated": max(i["n_sections_evaluated"] for i in infos),
+           "radial_error_T": None, "radial_error_Q": None}
+    if infos[0]["radial_error_T"] is not None:
+        for k in ("radial_error_T", "radial_error_Q"):
+            out[k] = float(np.mean(np.concatenate([i[k] for i in infos])))
+    return out
+
+def adaptive_azimuth_average(rotor, V_forward, omega, rho, n_sections=48, engine="disk",
+                             tol=1e-3, n_azimuth_max=64, solver="newton", solver_options=None, state=None,
+                             radial="cosine", radial_tol=None, return_info=False, diagnostics=None, a=None):
+    """
+    Azimuth average of T and Q using the 2*pi/B periodicity of the rotor loads.
+    Stations come in multiples of B, so the station set is invariant under a
+    blade-passage shift and the uniform average equals the average of the
+    blade-summed load, which only carries harmonics at multiples of B/rev.
+    The uniform average is exact for every harmonic below the station count;
+    the count is doubled (re-using the stations already solved) until the
+    change in the average - the harmonic aliased at the previous count - is
+    below tol relative to the mean load |T|, |Q| (floored at 1e-12) for two
+    doublings in a row. err_T, err_Q are the larger of those two changes, a
+    conservative bound: a single change can be small by a chance
+    cancellation of the aliased harmonics.
+    Returns (T, Q, n_evaluated, err_T, err_Q), plus the radial quadrature info
+    dict with return_info=True.
+    """
+    B = rotor.B
+    n = B * int(math.ceil(4.0 / B))
+    psi = np.linspace(0.0, 2*np.pi, n, endpoint=False)
+    kw = dict(engine=engine, solver=solver, solver_options=solver_options, state=state, radial=radial,
+              radial_tol=radial_tol, return_info=True, diagnostics=diagnostics, a=a)
+    T_psi, Q_psi, info = instantaneous_integrator(rotor, V_forward, omega, rho, n_sections, psi=psi, **kw)
+    infos = [info]
+    T, Q = float(np.mean(T_psi)), float(np.mean(Q_psi))
+    err_T = err_Q = float("inf")
+    d_T = d_Q = float("inf")  # change at the previous doubling
+
+    while 2*n <= n_azimuth_max:
+        # new stations sit half-way between the existing ones
+        psi_new = psi[:n] + np.pi/n
+        T_new, Q_new, info = instantaneous_integrator(rotor, V_forward, omega, rho, n_sections, psi=psi_new, **kw)
+        infos.append(info)
+        T_psi = np.concatenate([T_psi, T_new])
+        Q_psi = np.concatenate([Q_psi, Q_new])
+        psi = np.concatenate([psi[:n], psi_new])
+        n *= 2
+
+        T_ref, Q_ref = T, Q
+        T, Q = float(np.mean(T_psi)), float(np.mean(Q_psi))
+        err_T, err_Q = max(abs(T - T_ref), d_T), max(abs(Q - Q_ref), d_Q)
+        d_T, d_Q = abs(T - T_ref), abs(Q - Q_ref)
+        if err_T <= tol*max(abs(T), 1e-12) and err_Q <= tol*max(abs(Q), 1e-12):
+            break
+
+    if return_info:
+        return T, Q, n, err_T, err_Q, _radial_summary(infos)
+    return T, Q, n, err_T, err_Q
+
+AZIMUTH_MODES = ("uniform", "adaptive")
+# floating-point precision of the batched kernels (cycle_integrator_batch)
+PRECISIONS = {"double": float, "single": np.float32}
+
+def _settings(fidelity, **given):
+    # fidelity profile plus its settings, overridden by every argument that is not None
+    profile = get_profile(fidelity)
+    kw = profile.cycle_kwargs()
+    for k, v in given.items():
+        if v is not None and k != "solver_options":
+            kw[k] = v
+    kw["solver_options"] = {**kw["solver_options"], **(given.get("solver_options") or {})}
+    return profile, kw
+
+def cycle_integrator(rotor, V_forward, omega, rho, engine="disk", n_sections=None, n_azimuth=None,
+                     axisymmetric=None, return_info=False, azimuth=None, azimuth_tol=None, solver=None,
+                     solver_options=None, state=None, radial=None, radial_tol=None, fidelity=None,
+                     diagnostics=None, a=None):
+    """
+    Azimuth-averaged thrust, torque and power.
+    With no forward speed every azimuth station sees the same flow, so only one
+    station is evaluated and replicated before averaging (bit-identical to the
+    full sweep). axisymmetric=None detects this automatically, False forces the
+    full sweep. solver selects the inflow solver (see inflow.SOLVERS) and
+    solver_options passes extra settings to it (max_iter, tol, ...).
+    state (solver_state.InflowState) carries the converged inflow from one
+    call to the next so nearby operating points start from it.
+    radial selects the spanwise quadrature (see RADIAL_RULES): "cosine" is the
+    original rule, "gauss" Gauss-Legendre and "gauss_kronrod" adaptive
+    Gauss-Kronrod. With radial_tol the section count is chosen to meet that
+    relative tolerance (Richardson-extrapolated for the fixed rules), using at
+    most n_sections nodes.
+    azimuth="adaptive" replaces the fixed n_azimuth stations with
+    adaptive_azimuth_average (n_azimuth is then ignored). With return_info=True
+    a dict describing the evaluation is returned as a fourth element, e.g.
+    info["axisymmetric"], info["azimuth_error_T"], info["radial_error_T"]
+    (None when the radial error is not estimated).
+    fidelity (name or fidelity.FidelityProfile, default: the process default
+    profile) supplies every setting left as None, including the inflow
+    max_iter/tol unless solver_options sets them; the "standard" profile is
+    n_sections=48, n_azimuth=36 and the original Newton solver settings.
+    diagnostics=True (or a solver_state.SolverDiagnostics to accumulate over
+    several calls) records every inflow solve: per-section iteration counts,
+    final residuals and the non-convergence mask. With return_info=True the
+    collector is info["diagnostics"] and its totals for this call are
+    info["solver_totals"]. Without it the solvers do no extra work.
+    a is the speed of sound [m/s]: airfoils tabulated over Mach
+    (airfoil.TabulatedAirfoil) are then read at the section Mach number U/a;
+    without it they use their lowest Mach column. Other polars ignore it.
+    """
+    profile, kw = _settings(fidelity, n_sections=n_sections, n_azimuth=n_azimuth, azimuth=azimuth,
+                            azimuth_tol=azimuth_tol, solver=solver, solver_options=solver_options, radial=radial,
+                            radial_tol=radial_tol)
+    n_sections, n_azimuth, azimuth, azimuth_tol = kw["n_sections"], kw["n_azimuth"], kw["azimuth"], kw["azimuth_tol"]
+    solver, solver_options, radial, radial_tol = kw["solver"], kw["solver_options"], kw["radial"], kw["radial_tol"]
+    if azimuth not in AZIMUTH_MODES:
+        raise ValueError(f"Unknown azimuth mode '{azimuth}' (expected one of {AZIMUTH_MODES})")
+    if axisymmetric is None:
+        axisymmetric = (V_forward == 0)
+    elif axisymmetric and V_forward != 0:
+        raise ValueError("axisymmetric fast path requires V_forward == 0")
+
+    if diagnostics is True:
+        diagnostics = SolverDiagnostics()
+    elif diagnostics is False:
+        diagnostics = None
+    mark = len(diagnostics.records) if diagnostics is not None else 0
+
+    kw = dict(solver=solver, solver_options=solver_options, state=state, radial=radial, radial_tol=radial_tol,
+              diagnostics=diagnostics, a=a)
+    err_T = err_Q = 0.0
+    if axisymmetric:
+        T1, Q1, info_r = instantaneous_integrator(rotor, V_forward, omega, rho, n_sections, 1, engine,
+                                                  return_info=True, **kw)
+        T_psi = np.full(n_azimuth, T1[0])
+        Q_psi = np.full(n_azimuth, Q1[0])
+        T = float(np.mean(T_psi))
+        Q = float(np.mean(Q_psi))
+        n_evaluated = 1
+        info_r = _radial_summary([info_r])
+    elif azimuth == "adaptive":
+        T, Q, n_evaluated, err_T, err_Q, info_r = adaptive_azimuth_average(
+            rotor, V_forward, omega, rho, n_sections, engine, tol=azimuth_tol, return_info=True, **kw)
+    else:
+        T_psi, Q_psi, info_r = instantaneous_integrator(rotor, V_forward, omega, rho, n_sections, n_azimuth, engine,
+                                                        return_info=True, **kw)
+        T = float(np.mean(T_psi))
+        Q = float(np.mean(Q_psi))
+        n_evaluated = n_azimuth
+        info_r = _radial_summary([info_r])
     P = Q*omega
+    if return_info:
+        info = {
+            "fidelity": profile.name,
+            "engine": engine,
+            "solver": solver,
+            "azimuth": azimuth,
+            "axisymmetric": bool(axisymmetric),
+            "n_sections": n_sections,
+            "n_azimuth": n_azimuth,
+            "n_azimuth_evaluated": n_evaluated,
+            "azimuth_error_T": err_T,
+            "azimuth_error_Q": err_Q,
+        }
+        info.update(info_r)
+        if diagnostics is not None:
+            info["diagnostics"] = diagnostics
+            info["solver_totals"] = diagnostics.totals(mark)
+        return T, Q, P, info
     return T, Q, P
+
+def cycle_integrator_batch(rotor, V_forward, omega, rho, n_sections=None, n_azimuth=None, solver=None,
+                           solver_options=None, radial=None, azimuth=None, radial_tol=None, fidelity=None,
+                           max_sections=400_000, V_climb=0.0, diagnostics=None, precision="double",
+                           check_fraction=0.01, check_tol=1e-4, seed=0, return_info=False, collective=0.0, a=None):
+    """
+    cycle_integrator over arrays of operating conditions. V_forward, omega and
+    rho broadcast against each other; the conditions are solved together with
+    the disk engine, in one (K conditions x azimuth x radius) pass per chunk of
+    at most max_sections annuli. Hover conditions (V_forward == 0) use a single
+    azimuth station as in cycle_integrator, and each element equals the
+    corresponding scalar cycle_integrator call. Settings that pick a different
+    discretization per condition (azimuth="adaptive", radial_tol,
+    radial="gauss_kronrod") are evaluated condition by condition.
+    V_climb [m/s] is an axial (climb) velocity through the disk, broadcast
+    like the other conditions; it keeps hover conditions axisymmetric and is
+    only supported with the uniform azimuth and fixed radial grid settings.
+    collective [rad] is a pitch change added to every blade section, broadcast
+    like the conditions (e.g. one rotor trimmed to many collectives in one
+    pass); same restriction as V_climb.
+    a is the speed of sound [m/s], broadcast like rho (see cycle_integrator).
+    diagnostics: optional solver_state.SolverDiagnostics; each chunk's solve is
+    one record over (conditions x azimuth x radius).
+    precision="single" runs the inflow and load kernels in float32, halving
+    their memory traffic (relative error typically 1e-5, see check_tol), for
+    the fixed-grid settings only. A random sample of check_fraction of the
+    conditions (at least one, drawn with seed) is then re-evaluated in
+    float64; conditions whose T or Q differs by more than check_tol relative
+    to the load level of the sample (its largest |T| and |Q|) are flagged
+    with a RuntimeWarning.
+    Returns arrays (T, Q, P) with the broadcast shape (float64), plus with
+    return_info=True a dict with "precision" and, for single precision,
+    "checked" (flat indices of the sampled conditions), "max_error" and
+    "flagged" (flat indices beyond check_tol).
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}' (expected one of {tuple(PRECISIONS)})")
+    profile, kw = _settings(fidelity, n_sections=n_sections, n_azimuth=n_azimuth, solver=solver,
+                            solver_options=solver_options, radial=radial, azimuth=azimuth, radial_tol=radial_tol)
+    V, om, rh, Vc, th, sa = np.broadcast_arrays(np.asarray(V_forward, dtype=float), np.asarray(omega, dtype=float),
+                                                np.asarray(rho, dtype=float), np.asarray(V_climb, dtype=float),
+                                                np.asarray(collective, dtype=float),
+                                                np.asarray(np.nan if a is None else a, dtype=float))
+    shape = V.shape
+    V, om, rh, Vc, th = V.ravel(), om.ravel(), rh.ravel(), Vc.ravel(), th.ravel()
+    a = None if a is None else sa.ravel()
+    T = np.empty(V.size)
+    Q = np.empty(V.size)
+
+    adaptive = kw["azimuth"] == "adaptive" or kw["radial_tol"] is not None or kw["radial"] == "gauss_kronrod"
+    if adaptive and precision != "double":
+        raise ValueError("single precision requires azimuth='uniform' and a fixed radial grid (no radial_tol)")
+    if adaptive:
+        if np.any(Vc) or np.any(th):
+            raise ValueError("V_climb and collective require azimuth='uniform' and a fixed radial grid (no radial_tol)")
+        for k in range(V.size):
+            T[k], Q[k], _ = cycle_integrator(rotor, float(V[k]), float(om[k]), float(rh[k]), fidelity=profile,
+                                             diagnostics=diagnostics, a=None if a is None else float(a[k]), **kw)
+    else:
+        dtype = PRECISIONS[precision]
+        grid = rotor.blade.grid(kw["n_sections"], rotor.B, kw["radial"], dtype=None if dtype is float else dtype)
+        n_azimuth = kw["n_azimuth"]
+        psi = np.linspace(0.0, 2*np.pi, n_azimuth, endpoint=False).astype(dtype, copy=False)
+        hover = V == 0
+        for mask, psi_set in ((hover, psi[:1]), (~hover, psi)):
+            idx = np.flatnonzero(mask)
+            step = max(1, max_sections // max(1, psi_set.size * grid.r.size))
+            for start in range(0, idx.size, step):
+                sel = idx[start:start + step]
+                climb = Vc[sel] if np.any(Vc[sel]) else None
+                pitch = th[sel] if np.any(th[sel]) else None
+                T_psi, Q_psi = _grid_loads(rotor, grid, psi_set, V[sel], om[sel], rh[sel], "disk", kw["solver"],
+                                           kw["solver_options"], None, climb, diagnostics, pitch,
+                                           None if a is None else a[sel])
+                if psi_set.size == 1:
+                    # replicated like the axisymmetric path of cycle_integrator
+                    T_psi = np.repeat(T_psi, n_azimuth, axis=1)
+                    Q_psi = np.repeat(Q_psi, n_azimuth, axis=1)
+                T[sel] = np.mean(T_psi, axis=1)
+                Q[sel] = np.mean(Q_psi, axis=1)
+
+    info = {"precision": precision}
+    if precision != "double":
+        info.update(_precision_check(rotor, V, om, rh, Vc, th, T, Q, profile, kw, check_fraction, check_tol, seed,
+                                     max_sections, a))
+    T, Q = T.reshape(shape), Q.reshape(shape)
+    if return_info:
+        return T, Q, Q * om.reshape(shape), info
+    return T, Q, Q * om.reshape(shape)
+
+def _precision_check(rotor, V, om, rh, Vc, th, T, Q, profile, kw, fraction, tol, seed, max_sections, a=None):
+    # re-evaluate a random sample of the (flat) conditions in float64 and flag large deviations
+    n = max(1, int(math.ceil(fraction * V.size))) if V.size else 0
+    idx = np.sort(np.random.default_rng(seed).choice(V.size, size=min(n, V.size), replace=False))
+    T_ref, Q_ref, _ = cycle_integrator_batch(rotor, V[idx], om[idx], rh[idx], kw["n_sections"], kw["n_azimuth"],
+                                             kw["solver"], kw["solver_options"], kw["radial"], fidelity=profile,
+                                             max_sections=max_sections, V_climb=Vc[idx], collective=th[idx],
+                                             a=None if a is None else a[idx])
+    # errors against the load level of the sample (as in _converged): the net load of a
+    # single condition can be a small difference of large advancing/retreating contributions
+    err = np.zeros(idx.size)
+    for x, ref in ((T[idx], T_ref), (Q[idx], Q_ref)):
+        scale = max(float(np.max(np.abs(ref), initial=0.0)), 1e-12)
+        err = np.maximum(err, np.abs(x - ref) / scale)
+    flagged = idx[err > tol]
+    if flagged.size:
+        warnings.warn(f"single-precision rotor evaluation differs from float64 by up to {err.max():.2e} "
+                      f"(> {tol:g}) at {flagged.size} of {idx.size} checked conditions", RuntimeWarning,
+                      stacklevel=3)
+    return {"checked": idx, "max_error": float(err.max(initial=0.0)), "flagged": flagged}
@@ -18,7 +18,7 @@ def run():
     if M_tip > rotor.tip_mach_limit:
         print(f"Warning: Tip Mach {M_tip:.3f} exceeds limit {rotor.tip_mach_limit:.2f}. Consider lowering RPM or enlarging rotor.")
 
-    T, Q, P = cycle_integrator(rotor, V, omega, rho)
+    T, Q, P = cycle_integrator(rotor, V, omega, rho, a=a)
     print(f"Cycle-averaged: Thrust={T:.1f} N, Torque={Q:.1f} N·m, Power={P/1000:.1f} kW")
 
     stab = Stabilizers(**inputs["stabilizers"])
@@ -0,0 +1,117 @@
+import math
+import numpy as np
+
+from fidelity import get_profile
+from integrators import cycle_integrator_batch
+
+class PerformanceMap:
+    """
+    Nondimensional performance of one rotor,
+        CT = T / (rho A (Omega R)^2),   CQ = Q / (rho A (Omega R)^2 R),
+    tabulated over collective (pitch added to the rotor's own rigging, rad),
+    advance ratio mu = V_forward/(Omega R) and climb inflow ratio
+    lambda_c = V_climb/(Omega R), and interpolated (multi-)linearly.
+
+    The map leaves out Mach effects (airfoils tabulated over Mach are read
+    at their lowest Mach number) and the BEMT has no Reynolds effects, so
+    at fixed (collective, mu, lambda_c) CT and CQ do not depend on Omega or
+    rho: the whole map is built in one batched evaluation at
+    omega_ref/rho_ref, and thrust(), torque() and omega_for_thrust() follow
+    for any Omega and rho. The RPM trim confirms its seeds from the map with
+    rotor evaluations at the actual speed of sound.
+    Axes given as a single value are not interpolated.
+    """
+
+    def __init__(self, rotor, collective=(0.0,), mu=(0.0,), lambda_c=(0.0,), fidelity=None, omega_ref=None,
+                 rho_ref=1.225):
+        self.rotor = rotor
+        self.profile = get_profile(fidelity)
+        self.R = rotor.blade.R_tip
+        self.area = math.pi * self.R**2
+        self.axes = tuple(np.atleast_1d(np.asarray(x, dtype=float)) for x in (collective, mu, lambda_c))
+        for name, x in zip(("collective", "mu", "lambda_c"), self.axes):
+            if np.any(np.diff(x) <= 0):
+                raise ValueError(f"{name} values must be strictly increasing")
+        # reference tip speed: half the tip-Mach limit at sea level (any value gives the same coefficients)
+        self.omega_ref = omega_ref if omega_ref is not None else 0.5 * rotor.tip_mach_limit * 340.3 / self.R
+        self.rho_ref = rho_ref
+
+        th, mu_g, lc_g = np.meshgrid(*self.axes, indexing="ij")
+        V_tip = self.omega_ref * self.R
+        scale = rho_ref * self.area * V_tip**2
+        self.CT = np.empty(th.shape)
+        self.CQ = np.empty(th.shape)
+        for i, delta in enumerate(self.axes[0]):
+            pitched = rotor.replace(blade=rotor.blade.pitched(delta)) if delta != 0.0 else rotor
+            T, Q, _ = cycle_integrator_batch(pitched, mu_g[i] * V_tip, self.omega_ref, rho_ref,
+                                             V_climb=lc_g[i] * V_tip, fidelity=self.profile)
+            self.CT[i] = T / scale
+            self.CQ[i] = Q / (scale * self.R)
+        for x in (self.CT, self.CQ):
+            x.flags.writeable = False
+
+    def in_range(self, collective=0.0, mu=0.0, lambda_c=0.0):
+        # True where the point lies inside the tabulated box (single-valued axes must match)
+        ok = True
+        for x, v in zip(self.axes, (collective, mu, lambda_c)):
+            if x.size == 1:
+                ok = ok & np.isclose(v, x[0], rtol=0.0, atol=1e-12)
+            else:
+                ok = ok & (v >= x[0]) & (v <= x[-1])
+        return ok
+
+    def coefficients(self, collective=0.0, mu=0.0, lambda_c=0.0):
+        """(CT, CQ) at the given points (arrays broadcast); held at the table edges."""
+        pts = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (collective, mu, lambda_c)))
+        lo, hi, w = [], [], []
+        for x, v in zip(self.axes, pts):
+            if x.size == 1:
+                i = np.zeros(v.shape, dtype=int)
+                lo.append(i); hi.append(i); w.append(np.zeros(v.shape))
+                continue
+            v = np.clip(v, x[0], x[-1])
+            i = np.clip(np.searchsorted(x, v, side="right") - 1, 0, x.size - 2)
+            lo.append(i); hi.append(i + 1); w.append((v - x[i]) / (x[i + 1] - x[i]))
+        CT = np.zeros(pts[0].shape)
+        CQ = np.zeros(pts[0].shape)
+        for corner in range(8):
+            bits = [(corner >> k) & 1 for k in range(3)]
+            idx = tuple(h if b else l for l, h, b in zip(lo, hi, bits))
+            weight = np.prod([wk if b else 1.0 - wk for wk, b in zip(w, bits)], axis=0)
+            CT = CT + weight * self.CT[idx]
+            CQ = CQ + weight * self.CQ[idx]
+        if CT.ndim == 0:
+            return float(CT), float(CQ)
+        return CT, CQ
+
+    def thrust(self, omega, rho, V_forward=0.0, V_climb=0.0, collective=0.0):
+        V_tip = omega * self.R
+        CT, _ = self.coefficients(collective, V_forward / V_tip, V_climb / V_tip)
+        return CT * rho * self.area * V_tip**2
+
+    def torque(self, omega, rho, V_forward=0.0, V_climb=0.0, collective=0.0):
+        V_tip = omega * self.R
+        _, CQ = self.coefficients(collective, V_forward / V_tip, V_climb / V_tip)
+        return CQ * rho * self.area * V_tip**2 * self.R
+
+    def omega_for_thrust(self, thrust, rho, V_forward=0.0, V_climb=0.0, collective=0.0, omega0=None, iters=20,
+                         rtol=1e-10):
+        """
+        Rotor speed giving thrust: Omega = sqrt(T / (rho A R^2 CT)). In hover
+        CT is a constant and this is closed-form; with forward or climb speed
+        mu and lambda_c depend on Omega and the relation is iterated to a
+        fixed point.
+        Returns nan where the map gives no positive thrust.
+        """
+        thrust, rho = np.asarray(thrust, dtype=float), np.asarray(rho, dtype=float)
+        omega = np.full(np.broadcast(thrust, rho).shape, self.omega_ref if omega0 is None else omega0, dtype=float)
+        for _ in range(iters):
+            V_tip = omega * self.R
+            CT, _ = self.coefficients(collective, V_forward / V_tip, V_climb / V_tip)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                new = np.sqrt(thrust / (rho * self.area * self.R**2 * CT))
+            done = np.all(np.abs(new - omega) <= rtol * np.abs(new)) or not (np.any(V_forward) or np.any(V_climb))
+            omega = new
+            if done or not np.all(np.isfinite(omega)):
+                break
+        return omega if omega.ndim else float(omega)
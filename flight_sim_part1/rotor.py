@@ -1,12 +1,24 @@
 import math
 from blade import Blade
+from frozen import Frozen
+
+class Rotor(Frozen):
+    # immutable value object (see frozen.Frozen): derive modified rotors with replace()
+    __slots__ = ("B", "blade", "tip_mach_limit", "_geometry")
+    _ARGS = ("B", "blade", "tip_mach_limit")
 
-class Rotor:
     def __init__(self, B: int, blade: Blade, tip_mach_limit=0.90):
         self.B = B
         self.blade = blade
         self.tip_mach_limit = tip_mach_limit  # for safety in the solver
+        af = blade.airfoil
+        self._geometry = (B, blade.planform_signature(), af.signature() if af is not None else None)
+        self._freeze()
         
     def solidity_local(self, r):
         # local solidity based on circumference annulus
-        return (self.B * self.blade.c(r)) / (2 * math.pi * r)
\ No newline at end of file
+        return (self.B * self.blade.c(r)) / (2 * math.pi * r)
+
+    def geometry_signature(self):
+        # everything that shapes the aerodynamic solution (tip_mach_limit does not)
+        return self._geometry
@@ -0,0 +1,114 @@
+from collections import OrderedDict
+
+from fidelity import get_profile
+from inflow import mach_speed
+from integrators import cycle_integrator
+
+class RotorCache:
+    """
+    In-process LRU memo of rotor evaluations.
+    Results are keyed on the rotor geometry (Rotor.geometry_signature()), the
+    operating conditions and the solver settings, so equal rotors share
+    entries; invalidate() drops the entries of a rotor that is retired.
+
+    quantize maps a condition name (V_forward, omega, rho, thrust, ...) to a
+    step: that condition is rounded to the step and the evaluation is done at
+    the rounded value, so nearby calls share one entry. Without quantization
+    only bit-identical conditions hit.
+
+    Use cache.cycle_integrator(...) in place of integrators.cycle_integrator;
+    other evaluations (e.g. the RPM trim) go through cache.lookup(). Not
+    thread-safe, use one per worker.
+
+    backing: optional persistent store (disk_cache.DiskCache) consulted on a
+    miss and filled with every new result, so repeated runs start warm.
+    """
+
+    def __init__(self, maxsize=1024, quantize=None, backing=None):
+        self.maxsize = maxsize
+        self.quantize = dict(quantize or {})
+        self.backing = backing
+        self.entries = OrderedDict()  # key -> (is_error, value)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def q(self, name, value):
+        # value rounded to the quantization step of this condition (unchanged if none is set)
+        step = self.quantize.get(name)
+        if step is None or value is None:
+            return value
+        return round(value / step) * step
+
+    def lookup(self, kind, rotor, key, compute):
+        """
+        Cached compute() for (kind, rotor geometry, key); key must be hashable.
+        A ValueError raised by compute() is cached and re-raised as well.
+        """
+        full_key = (kind, rotor.geometry_signature(), key)
+        entry = self.entries.get(full_key)
+        if entry is not None:
+            self.hits += 1
+            self.entries.move_to_end(full_key)
+        else:
+            self.misses += 1
+            found, entry = self.backing.get(kind, rotor, key) if self.backing is not None else (False, None)
+            if not found:
+                try:
+                    entry = (False, compute())
+                except ValueError as e:
+                    entry = (True, e)
+                if self.backing is not None:
+                    self.backing.put(kind, rotor, key, entry)
+            self.entries[full_key] = entry
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        is_error, value = entry
+        if is_error:
+            raise value
+        return value
+
+    def cycle_integrator(self, rotor, V_forward, omega, rho, fidelity=None, solver_options=None, **kwargs):
+        """
+        Memoized integrators.cycle_integrator (same arguments and results).
+        A warm-start state= only speeds up misses and is not part of the key,
+        nor is the speed of sound a= where the airfoil ignores Mach.
+        """
+        V_forward = self.q("V_forward", V_forward)
+        omega = self.q("omega", omega)
+        rho = self.q("rho", rho)
+        if "a" in kwargs:
+            kwargs["a"] = mach_speed(rotor.blade.airfoil, self.q("a", kwargs["a"]))
+        profile = get_profile(fidelity)
+        state = kwargs.pop("state", None)
+        options = tuple(sorted((solver_options or {}).items()))
+        key = (V_forward, omega, rho, profile, options, tuple(sorted(kwargs.items())))
+        result = self.lookup("cycle", rotor, key,
+                             lambda: cycle_integrator(rotor, V_forward, omega, rho, fidelity=profile, state=state,
+                                                      solver_options=solver_options, **kwargs))
+        if kwargs.get("return_info"):
+            return result[:-1] + (dict(result[-1]),)
+        return result
+
+    def invalidate(self, rotor=None):
+        """Drop the entries of rotor's geometry, or everything."""
+        if rotor is None:
+            self.entries.clear()
+            return
+        sig = rotor.geometry_signature()
+        for k in [k for k in self.entries if k[1] == sig]:
+            del self.entries[k]
+
+    def clear(self):
+        self.invalidate()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        calls = self.hits + self.misses
+        out = {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries),
+               "maxsize": self.maxsize, "hit_rate": self.hits / calls if calls else 0.0}
+        if self.backing is not None:
+            out["disk_hits"] = self.backing.hits
+            out["disk_misses"] = self.backing.misses
+        return out
@@ -0,0 +1,171 @@
+import numpy as np
+
+from inflow import annulus_partials, induced_velocity_sections, mach_speed
+from integrators import _settings
+
+# operating-point variables; planform variables come from the blade (Blade.DESIGN_VARIABLES)
+CONTROL_VARIABLES = ("collective", "omega", "V_forward", "rho")
+
+def cycle_sensitivities(rotor, V_forward, omega, rho, wrt=("collective", "omega", "V_forward"), n_sections=None,
+                        n_azimuth=None, solver=None, solver_options=None, radial=None, fidelity=None,
+                        max_sections=400_000, collective=0.0, a=None):
+    """
+    Cycle-averaged thrust, torque and power with their derivatives, in one
+    solve per operating condition (arrays of conditions broadcast as in
+    integrators.cycle_integrator_batch).
+    wrt lists the variables: CONTROL_VARIABLES (collective is a uniform pitch
+    change [rad]) and the blade's DESIGN_VARIABLES (e.g. "taper", "twist").
+    collective [rad] is a pitch change applied to the blade, broadcast like
+    the conditions (as in cycle_integrator_batch).
+    a is the speed of sound [m/s], broadcast like rho: airfoils tabulated
+    over Mach are read at the section Mach number, whose change with the
+    flow enters the derivatives (rho is varied at fixed a).
+    The inflow derivative follows from the converged annulus residual,
+    dvi/dx = -(dR/dx) / (dR/dvi) (implicit differentiation; sections clamped
+    at vi = 0 have dvi/dx = 0), and is propagated through the sectional loads
+    in forward mode. The derivatives are those of the converged BEMT
+    solution, so a solver stopped at max_iter (Newton in forward flight,
+    unless newton_fallback is set) makes them approximate.
+    Only the uniform azimuth and fixed radial grid settings are supported.
+    Returns (T, Q, P, jac) with jac[output][variable] arrays of the broadcast
+    shape, output one of "T", "Q", "P"; T, Q and P equal cycle_integrator_batch.
+    """
+    profile, kw = _settings(fidelity, n_sections=n_sections, n_azimuth=n_azimuth, solver=solver,
+                            solver_options=solver_options, radial=radial)
+    if kw["azimuth"] == "adaptive" or kw["radial_tol"] is not None or kw["radial"] == "gauss_kronrod":
+        raise ValueError("sensitivities require azimuth='uniform' and a fixed radial grid (no radial_tol)")
+    blade = rotor.blade
+    wrt = tuple(wrt)
+    for name in wrt:
+        if name not in CONTROL_VARIABLES and name not in blade.DESIGN_VARIABLES:
+            raise ValueError(f"Unknown sensitivity variable '{name}' "
+                             f"(expected one of {CONTROL_VARIABLES + tuple(blade.DESIGN_VARIABLES)})")
+
+    V, om, rh, th, sa = np.broadcast_arrays(np.asarray(V_forward, dtype=float), np.asarray(omega, dtype=float),
+                                            np.asarray(rho, dtype=float), np.asarray(collective, dtype=float),
+                                            np.asarray(np.nan if a is None else a, dtype=float))
+    shape = V.shape
+    V, om, rh, th = V.ravel(), om.ravel(), rh.ravel(), th.ravel()
+    a = None if mach_speed(blade.airfoil, a) is None else sa.ravel()
+    T = np.empty(V.size)
+    Q = np.empty(V.size)
+    dT = {name: np.empty(V.size) for name in wrt}
+    dQ = {name: np.empty(V.size) for name in wrt}
+
+    grid = blade.grid(kw["n_sections"], rotor.B, kw["radial"])
+    n_azimuth = kw["n_azimuth"]
+    psi = np.linspace(0.0, 2*np.pi, n_azimuth, endpoint=False)
+    hover = V == 0
+    for mask, psi_set in ((hover, psi[:1]), (~hover, psi)):
+        idx = np.flatnonzero(mask)
+        step = max(1, max_sections // max(1, psi_set.size * grid.r.size))
+        for start in range(0, idx.size, step):
+            sel = idx[start:start + step]
+            if psi_set.size == 1:
+                # hover: the loads do not vary with azimuth, but a forward-speed
+                # perturbation does, and averages with the full station set
+                trig = (np.full(1, np.mean(np.cos(psi))), np.full(1, np.mean(np.sin(psi))))
+            else:
+                trig = (np.cos(psi), np.sin(psi))
+            T_psi, Q_psi, dT_psi, dQ_psi = _section_sensitivities(rotor, grid, psi_set, V[sel], om[sel], rh[sel],
+                                                                  th[sel], kw["solver"], kw["solver_options"], wrt,
+                                                                  trig, None if a is None else a[sel])
+            if psi_set.size == 1:
+                # replicated like the axisymmetric path of cycle_integrator
+                T_psi = np.repeat(T_psi, n_azimuth, axis=1)
+                Q_psi = np.repeat(Q_psi, n_azimuth, axis=1)
+            T[sel] = np.mean(T_psi, axis=1)
+            Q[sel] = np.mean(Q_psi, axis=1)
+            for name in wrt:
+                dT[name][sel] = np.mean(dT_psi[name], axis=1)
+                dQ[name][sel] = np.mean(dQ_psi[name], axis=1)
+
+    P = Q * om
+    jac = {"T": {}, "Q": {}, "P": {}}
+    for name in wrt:
+        jac["T"][name] = dT[name].reshape(shape)
+        jac["Q"][name] = dQ[name].reshape(shape)
+        dP = dQ[name] * om + (Q if name == "omega" else 0.0)
+        jac["P"][name] = dP.reshape(shape)
+    return T.reshape(shape), Q.reshape(shape), P.reshape(shape), jac
+
+def _section_sensitivities(rotor, grid, psi, V, omega, rho, collective, solver, solver_options, wrt, trig, a=None):
+    # loads of integrators._section_loads on the (K, psi, r) grid, plus their
+    # forward-mode tangents for every variable in wrt; returns T(psi), Q(psi)
+    # and dicts of dT/dx(psi), dQ/dx(psi). trig = (cos, sin) of the stations
+    # seen by a forward-speed perturbation. a: speed of sound (K,) for
+    # Mach-dependent polars, else None.
+    b = rotor.blade
+    B = rotor.B
+    r, c, dr = grid.r, grid.chord, grid.dr
+    th = grid.twist + collective[:, None, None] if np.any(collective) else grid.twist
+    Vk = V[:, None, None]
+    Vax_psi = Vk * np.cos(psi)[None, :, None]
+    Vtan_psi = Vk * np.sin(psi)[None, :, None]
+    omega = omega[:, None, None]
+    rho = rho[:, None, None]
+    if a is not None:
+        a = a[:, None, None]
+    vi, _, _, Cl, Cd, _ = induced_velocity_sections(rotor, r, Vax_psi, omega, rho, solver=solver, chord=c,
+                                                    twist=th, a=a, **(solver_options or {}))
+
+    Ut = omega*r + Vtan_psi
+    Uax = Vax_psi + vi
+    phi = np.arctan2(Uax, Ut)
+    U = np.hypot(Ut, Uax)
+    q = 0.5*rho*U*U
+
+    Lp = q*c*Cl
+    Dp = q*c*Cd
+    dT = B * (Lp*np.cos(phi) - Dp*np.sin(phi))
+    dQ = B * (Lp*np.sin(phi) + Dp*np.cos(phi)) * r
+
+    # implicit differentiation of the inflow: dvi = -(dR/dx . dx) / (dR/dvi)
+    full = np.broadcast_to
+    Ut0 = full(omega*r, vi.shape)
+    R, R_vi, R_V, R_Ut, R_th, R_c, _, _, dCl, dCd, dCl_M, dCd_M = annulus_partials(
+        b, B, full(r, vi.shape), full(Vax_psi, vi.shape), Ut0, full(c, vi.shape), full(th, vi.shape), vi,
+        full(rho, vi.shape), None if a is None else full(a, vi.shape))
+    live = (vi > 0.0) & (R_vi != 0.0)
+    R_vi = np.where(live, R_vi, 1.0)
+    U0_2 = Ut0*Ut0 + Uax*Uax
+    U0_2 = np.where(U0_2 > 0.0, U0_2, 1.0)
+    U2 = np.where(U*U > 0.0, U*U, 1.0)
+    cph, sph = np.cos(phi), np.sin(phi)
+    g_T = Cl*cph - Cd*sph
+    g_Q = Cl*sph + Cd*cph
+
+    dT_psi, dQ_psi = {}, {}
+    for name in wrt:
+        dVax = dVtan = d_om = d_rho = d_th = d_c = 0.0
+        if name == "collective":
+            d_th = 1.0
+        elif name == "omega":
+            d_om = 1.0
+        elif name == "rho":
+            d_rho = 1.0
+        elif name == "V_forward":
+            dVax = trig[0][None, :, None]
+            dVtan = trig[1][None, :, None]
+        else:
+            d_c, d_th = b.design_tangent(name, r)
+        dUt0 = d_om * r
+        dR = R_V*dVax + R_Ut*dUt0 + R_th*d_th + R_c*d_c + (R/rho)*d_rho
+        dvi = np.where(live, -dR / R_vi, 0.0)
+
+        dUax = dVax + dvi
+        dUt = dUt0 + dVtan
+        dalpha = d_th - (Ut0*dUax - Uax*dUt0) / U0_2
+        dphi = (Ut*dUax - Uax*dUt) / U2
+        dq = 0.5*d_rho*U*U + rho*(Ut*dUt + Uax*dUax)
+        dqc = dq*c + q*d_c
+        dCl_x, dCd_x = dCl*dalpha, dCd*dalpha
+        if a is not None:
+            # section Mach number of the polar lookup, sqrt(Ut0^2 + Uax^2)/a
+            dM = (Ut0*dUt0 + Uax*dUax) / (np.sqrt(U0_2)*a)
+            dCl_x, dCd_x = dCl_x + dCl_M*dM, dCd_x + dCd_M*dM
+        ddT = B * (dqc*g_T + q*c*(dCl_x*cph - dCd_x*sph - g_Q*dphi))
+        ddQ = B * (dqc*g_Q + q*c*(dCl_x*sph + dCd_x*cph + g_T*dphi)) * r
+        dT_psi[name] = np.sum(ddT * dr, axis=-1)
+        dQ_psi[name] = np.sum(ddQ * dr, axis=-1)
+    return np.sum(dT * dr, axis=-1), np.sum(dQ * dr, axis=-1), dT_psi, dQ_psi
@@ -0,0 +1,118 @@
+from collections import OrderedDict
+import numpy as np
+
+class InflowState:
+    """
+    Warm-start store for the inflow solvers.
+    Keeps the converged induced-velocity field of recent rotor evaluations,
+    one per evaluation grid (radial stations x azimuth stations), so that the
+    next evaluation at a nearby operating point starts from the previous
+    solution instead of the generic initial guess. Hover inflow scales with
+    rotor speed, so stored fields are rescaled by omega/omega_prev.
+    Only converged sections are kept: the others are stored as nan and the
+    solver starts them from its cold guess, so a warm-started result agrees
+    with a cold one to the solver tolerance whatever the call history.
+    The store is cleared automatically when the rotor geometry changes.
+
+    Pass the same InflowState to consecutive cycle_integrator calls
+    (state=...); it is not thread-safe, use one per worker.
+    """
+
+    def __init__(self, max_fields=16):
+        self.max_fields = max_fields
+        self.geometry = None
+        self.fields = OrderedDict()  # grid key -> (omega, vi)
+        self.warm_starts = 0
+        self.cold_starts = 0
+
+    def _sync(self, rotor):
+        sig = rotor.geometry_signature()
+        if sig != self.geometry:
+            self.fields.clear()
+            self.geometry = sig
+
+    def initial_guess(self, rotor, key, omega):
+        """Stored field for this grid (rescaled to omega, nan where not converged) or None."""
+        self._sync(rotor)
+        entry = self.fields.get(key)
+        if entry is None:
+            self.cold_starts += 1
+            return None
+        self.fields.move_to_end(key)
+        omega_prev, vi = entry
+        self.warm_starts += 1
+        if omega_prev != 0.0 and omega != 0.0:
+            return vi * (omega / omega_prev)
+        return vi
+
+    def store(self, rotor, key, omega, vi, converged=None):
+        # converged: optional mask of the sections worth seeding from (e.g. ~SolverDiagnostics unconverged)
+        self._sync(rotor)
+        vi = np.array(vi, dtype=float)
+        if converged is not None:
+            vi[~np.broadcast_to(converged, vi.shape)] = np.nan
+        self.fields[key] = (omega, vi)
+        self.fields.move_to_end(key)
+        while len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+
+    def clear(self):
+        self.fields.clear()
+        self.geometry = None
+
+class SolverDiagnostics:
+    """
+    Collector of inflow-solver diagnostics. Pass one to cycle_integrator
+    (diagnostics=...) or induced_velocity_sections; every inflow solve then
+    appends a record with per-section arrays (solve shape, e.g. azimuth x
+    radius):
+        r           radial station [m]
+        alpha       final angle of attack [rad]
+        iterations  residual evaluations spent on the section (0: closed form)
+        residual    final |BE - momentum thrust| / (1 + |BE thrust|)
+        unconverged True where the residual is not within the solver's tol,
+                    whatever the reason the solver stopped
+        max_iter    True where the solver stopped at max_iter
+        clamped     unconverged sections held at vi = 0 (reversed flow, no
+                    non-negative momentum solution; a bracket exit of the
+                    safeguarded solver)
+        refined     closed-form sections the safeguarded solver had to finish
+                    (False for the iterative solvers)
+    Nothing is collected (and nothing is paid) when no collector is passed.
+    Reuse one collector over several calls to aggregate them; totals(start)
+    summarizes the records from index start on. Not thread-safe.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, solver, **arrays):
+        self.records.append(dict(solver=solver, **arrays))
+
+    def totals(self, start=0):
+        recs = self.records[start:]
+        if not recs:
+            return {"solves": 0, "sections": 0, "iterations": 0, "max_iterations": 0, "mean_iterations": 0.0,
+                    "unconverged": 0, "max_iter": 0, "clamped": 0, "refined": 0, "refined_fraction": 0.0,
+                    "max_residual": 0.0}
+        it = np.concatenate([np.ravel(x["iterations"]) for x in recs])
+        res = np.concatenate([np.ravel(x["residual"]) for x in recs])
+        count = {k: int(sum(np.count_nonzero(x[k]) for x in recs))
+                 for k in ("unconverged", "max_iter", "clamped", "refined")}
+        return {"solves": len(recs), "sections": int(it.size), "iterations": int(it.sum()),
+                "max_iterations": int(it.max(initial=0)), "mean_iterations": float(it.mean()) if it.size else 0.0,
+                **count, "refined_fraction": count["refined"] / it.size if it.size else 0.0,
+                "max_residual": float(res.max(initial=0.0))}
+
+    def unconverged(self, start=0):
+        """(r, alpha, residual) of every unconverged section, as flat arrays."""
+        recs = self.records[start:]
+        if not recs:
+            return np.zeros(0), np.zeros(0), np.zeros(0)
+        out = []
+        for k in ("r", "alpha", "residual"):
+            out.append(np.concatenate([np.ravel(x[k])[np.ravel(x["unconverged"])] for x in recs]))
+        return tuple(out)
+
+    def clear(self):
+        self.records.clear()
@@ -2,6 +2,7 @@ import math
 from airfoil import Airfoil
 from blade import Blade
 from rotor import Rotor
+from frozen import intern
 
 def get_user_inputs():
     # Original experimental configuration for comparison with CSV data
@@ -30,10 +31,11 @@ def get_user_inputs():
     }
 
 def build_rotor(params):
-    af = Airfoil(**params["airfoil"])
-    bl = Blade(params["R_root"], params["R_tip"],
-               params["c_root"], params["c_tip"],
-               math.radians(params["theta_root_deg"]),
-               math.radians(params["theta_tip_deg"]))
-    bl.airfoil = af
-    return Rotor(params["B"], bl, tip_mach_limit=params.get("tip_mach_limit", 0.9))
+    # interned: equal parameter sets give the same Rotor instance
+    af = intern(Airfoil(**params["airfoil"]))
+    bl = intern(Blade(params["R_root"], params["R_tip"],
+                      params["c_root"], params["c_tip"],
+                      math.radians(params["theta_root_deg"]),
+                      math.radians(params["theta_tip_deg"]),
+                      af))
+    return intern(Rotor(params["B"], bl, tip_mach_limit=params.get("tip_mach_limit", 0.9)))
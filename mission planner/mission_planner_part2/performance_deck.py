@@ -0,0 +1,346 @@
+"""
+performance_deck.py
+-------------------
+Precomputed rotor + engine performance deck (surrogate of the BEMT).
+
+Build once per rotor/engine pair, save as a versioned .npz artifact, load
+in milliseconds and answer trimmed-power queries by interpolation:
+
+    python performance_deck.py build deck.npz     # default rotor, engine and axes
+    python performance_deck.py info deck.npz
+"""
+import argparse
+import bisect
+import json
+import math
+import time
+
+import numpy as np
+
+from imports import add_flight_sim_path
+add_flight_sim_path()
+
+from atmosphere import isa
+from fidelity import get_profile
+from inflow import mach_speed
+from integrators import cycle_integrator_batch, SOLVER_STAMP
+
+FORMAT_VERSION = 2
+
+class PerformanceDeck:
+    """
+    Rotor + engine performance over altitude [m], forward speed [m/s] and
+    rotor speed [rpm] (T, Q), and trimmed over altitude, forward speed and
+    required thrust [N] (rpm and main-rotor power P_main [W] at the lowest
+    rpm that gives the thrust within the tip-Mach limit; nan where none
+    does). The engine's power available is tabulated over altitude.
+
+    All queries interpolate linearly. err_T / err_Q hold the relative
+    interpolation error of the fixed-rpm tables measured against the BEMT
+    at the (speed, rpm) cell midpoints of each forward-speed interval;
+    err_P holds, per (altitude, speed, thrust) cell of the trimmed tables,
+    the relative error of the interpolated power against a BEMT re-trim at
+    the cell centre, and is returned with trimmed queries. These are
+    midpoint estimates, not bounds. Queries outside the deck return None
+    (scalar) so callers can fall back to the BEMT.
+    """
+
+    def __init__(self, arrays, meta):
+        self.meta = meta
+        self.altitudes = arrays["altitudes"]
+        self.speeds = arrays["speeds"]
+        self.rpms = arrays["rpms"]
+        self.thrusts = arrays["thrusts"]
+        self.T = arrays["T"]                  # (alt, V, rpm)
+        self.Q = arrays["Q"]
+        self.trim_rpm = arrays["trim_rpm"]    # (alt, V, thrust)
+        self.trim_P = arrays["trim_P"]
+        self.P_avail_kW = arrays["P_avail_kW"]
+        self.err_T = arrays["err_T"]          # per forward-speed interval
+        self.err_Q = arrays["err_Q"]
+        self.err_P = arrays["err_P"]          # per (alt, V, thrust) trim cell
+        # plain lists for the scalar query path
+        self._axes = [a.tolist() for a in (self.altitudes, self.speeds, self.thrusts)]
+        self._trim_rpm = self.trim_rpm.tolist()
+        self._trim_P = self.trim_P.tolist()
+        self._err_P = self.err_P.tolist()
+
+    @classmethod
+    def build(cls, rotor, engine, altitudes, speeds, rpms, thrusts, fidelity=None):
+        """
+        Sample the BEMT on the (speed, rpm) grid in one batched evaluation.
+        Density only scales the BEMT loads (the inflow does not depend on
+        it), so the altitude axis follows exactly from rho(altitude); for
+        airfoils tabulated over Mach the grid is sampled at the speed of
+        sound of every altitude instead.
+        """
+        profile = get_profile(fidelity)
+        altitudes, speeds, rpms, thrusts = (np.atleast_1d(np.asarray(x, dtype=float))
+                                            for x in (altitudes, speeds, rpms, thrusts))
+        for name, x in (("altitudes", altitudes), ("speeds", speeds), ("rpms", rpms), ("thrusts", thrusts)):
+            if np.any(np.diff(x) <= 0):
+                raise ValueError(f"{name} must be strictly increasing")
+        rho, a, _, _ = isa(altitudes)
+        omega = 2*math.pi*rpms/60.0
+        # the speed of sound of the samples: one row at rho = 1 serves every altitude unless the polar
+        # depends on Mach (then one per altitude, and for the error samples one per altitude cell)
+        _, a_c, _, _ = isa(_centres(altitudes))
+        a_s, a_c = (None, None) if mach_speed(rotor.blade.airfoil, a) is None else (a[:, None, None],
+                                                                                     a_c[:, None, None])
+
+        T1, Q1, _ = cycle_integrator_batch(rotor, speeds[None, :, None], omega[None, None, :], 1.0, fidelity=profile,
+                                           a=a_s)
+        T = rho[:, None, None] * T1
+        Q = rho[:, None, None] * Q1
+
+        # trimmed tables: invert T(rpm) per (altitude, speed) below the tip-Mach rpm
+        R = rotor.blade.R_tip
+        trim_rpm = np.full((altitudes.size, speeds.size, thrusts.size), np.nan)
+        trim_P = np.full(trim_rpm.shape, np.nan)
+        for i in range(altitudes.size):
+            rpm_max = rotor.tip_mach_limit * a[i] / R * 60.0/(2*math.pi)
+            for j in range(speeds.size):
+                r_trim, Q_trim = _invert(rpms, T[i, j], Q[i, j], thrusts)
+                ok = r_trim <= rpm_max
+                trim_rpm[i, j, ok] = r_trim[ok]
+                trim_P[i, j, ok] = Q_trim[ok] * 2*math.pi*r_trim[ok]/60.0
+
+        # BEMT at the speed midpoints, on the rpm grid and its midpoints, for the error estimates
+        V_mid = _centres(speeds)
+        r_mid = 0.5*(rpms[1:] + rpms[:-1])
+        T_m, Q_m, _ = cycle_integrator_batch(rotor, V_mid[None, :, None], 2*math.pi*r_mid[None, None, :]/60.0, 1.0,
+                                             fidelity=profile, a=a_c)
+        if speeds.size > 1 or a_s is not None:
+            T_g, Q_g, _ = cycle_integrator_batch(rotor, V_mid[None, :, None], 2*math.pi*rpms[None, None, :]/60.0,
+                                                 1.0, fidelity=profile, a=a_c)
+        else:
+            T_g, Q_g = T1, Q1
+        err_T, err_Q = cls._midpoint_errors(speeds, T1, Q1, T_m, Q_m)
+        err_P = cls._trim_errors(rotor, altitudes, rpms, thrusts, trim_P, T_g, Q_g, T_m, Q_m)
+        P_avail = np.array([engine.power_available(r) for r in rho])
+        meta = {
+            "format_version": FORMAT_VERSION, "solver_stamp": SOLVER_STAMP,
+            "rotor_hash": rotor.content_hash(), "tip_mach_limit": rotor.tip_mach_limit, "R_tip": R,
+            "engine": {"P_sl_kW": engine.P_sl_kW, "sfc_kg_per_kWh": engine.sfc_kg_per_kWh,
+                       "derate_alpha": engine.derate_alpha},
+            "fidelity": profile.name, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        arrays = dict(altitudes=altitudes, speeds=speeds, rpms=rpms, thrusts=thrusts, T=T, Q=Q, trim_rpm=trim_rpm,
+                      trim_P=trim_P, P_avail_kW=P_avail, err_T=err_T, err_Q=err_Q, err_P=err_P)
+        return cls(arrays, meta)
+
+    @staticmethod
+    def _midpoint_errors(speeds, T1, Q1, T_m, Q_m):
+        # relative interpolation error of the fixed-rpm tables at the (speed, rpm) cell midpoints,
+        # per speed interval; samples are (altitude, speed, rpm) at rho = 1 with a single altitude
+        # row unless the polar depends on Mach (then the altitude cell midpoints count as well)
+        def interp(F):
+            F = _centres(0.5*(F[:, :, 1:] + F[:, :, :-1]))
+            return 0.5*(F[:, 1:] + F[:, :-1]) if speeds.size > 1 else F
+        def rel(F_true, F_lin, F_grid):
+            scale = np.maximum(np.max(np.abs(F_grid), axis=2), 1e-12)
+            scale = np.maximum(scale[:, 1:], scale[:, :-1]) if speeds.size > 1 else scale
+            return np.max(np.abs(F_true - F_lin), axis=2) / _centres(scale)
+        return (np.max(rel(T_m, interp(T1), T1), axis=0), np.max(rel(Q_m, interp(Q1), Q1), axis=0))
+
+    @staticmethod
+    def _trim_errors(rotor, altitudes, rpms, thrusts, trim_P, T_g, Q_g, T_m, Q_m):
+        """
+        Error of the interpolated trimmed power at every (altitude, speed,
+        thrust) cell centre, relative to the largest power at the cell's
+        corners (the torque changes sign at high speed and rpm); nan where
+        the cell is not trimmable.
+        The reference re-trims the centre on the BEMT sampled at the speed
+        midpoint at twice the rpm resolution (T_g, Q_g on the rpm grid, T_m,
+        Q_m on its midpoints); density scales the loads exactly, so one
+        sample set serves every altitude unless the polar depends on Mach
+        (then there is one per altitude cell).
+        """
+        P_lin, scale = trim_P, np.abs(trim_P)
+        for axis in range(3):
+            P_lin = _centres(P_lin, axis)  # trilinear value at the cell centre: the mean of the corners
+            if scale.shape[axis] > 1:
+                n = scale.shape[axis]
+                scale = np.maximum(np.take(scale, np.arange(n - 1), axis=axis), np.take(scale, np.arange(1, n), axis=axis))
+        r_f = np.empty(2*rpms.size - 1)
+        r_f[0::2], r_f[1::2] = rpms, 0.5*(rpms[1:] + rpms[:-1])
+        T_f, Q_f = np.empty(T_g.shape[:2] + (r_f.size,)), np.empty(T_g.shape[:2] + (r_f.size,))
+        T_f[..., 0::2], T_f[..., 1::2], Q_f[..., 0::2], Q_f[..., 1::2] = T_g, T_m, Q_g, Q_m
+        rho, a, _, _ = isa(_centres(altitudes))
+        W = _centres(thrusts)
+        err = np.full(P_lin.shape, np.nan)
+        for i in range(rho.size):
+            rpm_max = rotor.tip_mach_limit * a[i] / rotor.blade.R_tip * 60.0/(2*math.pi)
+            k = i if T_f.shape[0] > 1 else 0
+            for j in range(T_f.shape[1]):
+                r, Q1 = _invert(r_f, T_f[k, j], Q_f[k, j], W / rho[i])
+                P_ref = rho[i] * Q1 * 2*math.pi*r/60.0
+                ok = (r <= rpm_max) & np.isfinite(P_lin[i, j])
+                err[i, j, ok] = np.abs(P_lin[i, j, ok] - P_ref[ok]) / scale[i, j, ok]
+        return err
+
+    def save(self, path):
+        arrays = dict(altitudes=self.altitudes, speeds=self.speeds, rpms=self.rpms, thrusts=self.thrusts, T=self.T,
+                      Q=self.Q, trim_rpm=self.trim_rpm, trim_P=self.trim_P, P_avail_kW=self.P_avail_kW,
+                      err_T=self.err_T, err_Q=self.err_Q, err_P=self.err_P)
+        np.savez_compressed(path, meta=np.array(json.dumps(self.meta)), **arrays)
+
+    @classmethod
+    def load(cls, path, rotor=None):
+        """Load a saved deck; with rotor, check that the deck was built for that geometry."""
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"{path}: deck format {meta.get('format_version')}, expected {FORMAT_VERSION}")
+            if meta.get("solver_stamp") != SOLVER_STAMP:
+                raise ValueError(f"{path}: built with solver {meta.get('solver_stamp', meta.get('solver_version'))}, "
+                                 f"current is {SOLVER_STAMP}; rebuild the deck")
+            arrays = {k: data[k] for k in data.files if k != "meta"}
+        deck = cls(arrays, meta)
+        if rotor is not None:
+            deck.check(rotor)
+        return deck
+
+    def check(self, rotor, fidelity=None):
+        """
+        Raise ValueError unless the deck was built for this rotor geometry
+        and (when given) this fidelity profile.
+        """
+        if self.meta["rotor_hash"] != rotor.content_hash():
+            raise ValueError("performance deck was built for a different rotor")
+        if fidelity is not None and self.meta["fidelity"] != get_profile(fidelity).name:
+            raise ValueError(f"performance deck was built with the {self.meta['fidelity']!r} fidelity profile, "
+                             f"not {get_profile(fidelity).name!r}")
+
+    def power_available(self, altitude):
+        # engine power available [kW]
+        return np.interp(altitude, self.altitudes, self.P_avail_kW)
+
+    def evaluate(self, altitude, V_forward, rpm):
+        """(T, Q, P) at fixed rpm by interpolation (arrays broadcast; held at the deck edges)."""
+        idx = [_cell(x, v) for x, v in zip((self.altitudes, self.speeds, self.rpms),
+                                           np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                                 for v in (altitude, V_forward, rpm))))]
+        T = _trilinear(self.T, idx)
+        Q = _trilinear(self.Q, idx)
+        return T, Q, Q * 2*math.pi*np.asarray(rpm, dtype=float)/60.0
+
+    def in_range(self, altitude, V_forward, rpm=None):
+        ok = (self.altitudes[0] <= altitude <= self.altitudes[-1]) and (self.speeds[0] <= V_forward <= self.speeds[-1])
+        return ok and (rpm is None or self.rpms[0] <= rpm <= self.rpms[-1])
+
+    def trim(self, altitude, V_forward, thrust_N):
+        """
+        Trimmed (rpm, omega, P_main [W], err_P) for one condition, or None
+        outside the deck or where the thrust is not reachable. err_P is the
+        estimated relative error of the interpolated power in the trim cell
+        (see _trim_errors; nan where it could not be measured).
+        """
+        cells = []
+        for axis, v in zip(self._axes, (altitude, V_forward, thrust_N)):
+            if not axis[0] <= v <= axis[-1]:
+                return None
+            if len(axis) == 1:
+                cells.append((0, 0, 0.0))
+                continue
+            i = min(bisect.bisect_right(axis, v) - 1, len(axis) - 2)
+            cells.append((i, i + 1, (v - axis[i]) / (axis[i + 1] - axis[i])))
+        rpm = _corners(self._trim_rpm, cells)
+        P = _corners(self._trim_P, cells)
+        if rpm != rpm or P != P:  # nan: a corner is not trimmable
+            return None
+        i, j, k = (c[0] for c in cells)
+        return rpm, 2*math.pi*rpm/60.0, P, self._err_P[i][j][k]
+
+def _centres(x, axis=0):
+    # cell centres along an axis (a single-point axis is its own centre)
+    n = x.shape[axis]
+    if n == 1:
+        return x
+    return 0.5*(np.take(x, np.arange(n - 1), axis=axis) + np.take(x, np.arange(1, n), axis=axis))
+
+def _invert(r, T, Q, targets):
+    # lowest rpm at which the thrust column T(r) reaches each target, and the torque there, from the cubic
+    # through the four nearest samples (Newton inside the bracketing interval); nan outside the column
+    T = np.maximum.accumulate(T)
+    n = r.size
+    if n < 2:
+        return np.full(targets.shape, np.nan), np.full(targets.shape, np.nan)
+    k = np.clip(np.searchsorted(T, targets) - 1, 0, n - 2)
+    idx = np.clip(k - 1, 0, max(0, n - 4))[:, None] + np.arange(min(4, n))
+    lo, hi = r[k], r[k + 1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.clip(lo + (targets - T[k]) / (T[k + 1] - T[k]) * (hi - lo), lo, hi)
+        h = 1e-3*(hi - lo)
+        for _ in range(3):
+            dT = (_lagrange(r[idx], T[idx], x + h) - _lagrange(r[idx], T[idx], x - h)) / (2*h)
+            step = (_lagrange(r[idx], T[idx], x) - targets) / dT
+            x = np.where(np.isfinite(step) & (dT > 0.0), np.clip(x - step, lo, hi), x)
+    valid = (targets >= T[0]) & (targets <= T[-1])
+    return np.where(valid, x, np.nan), np.where(valid, _lagrange(r[idx], Q[idx], x), np.nan)
+
+def _lagrange(xs, ys, x):
+    # polynomial through the points (xs, ys) along the last axis, evaluated at x
+    out = 0.0
+    for k in range(xs.shape[-1]):
+        w = np.ones_like(x)
+        for m in range(xs.shape[-1]):
+            if m != k:
+                w = w * (x - xs[..., m]) / (xs[..., k] - xs[..., m])
+        out = out + w * ys[..., k]
+    return out
+
+def _cell(x, v):
+    # lower index and weight of v in the grid x (held at the edges); single-point axes map to index 0
+    if x.size == 1:
+        return np.zeros(v.shape, dtype=int), np.zeros(v.shape, dtype=int), np.zeros(v.shape)
+    v = np.clip(v, x[0], x[-1])
+    i = np.clip(np.searchsorted(x, v, side="right") - 1, 0, x.size - 2)
+    return i, i + 1, (v - x[i]) / (x[i + 1] - x[i])
+
+def _trilinear(table, idx):
+    out = 0.0
+    for corner in range(8):
+        bits = [(corner >> k) & 1 for k in range(3)]
+        sel = tuple(c[1] if b else c[0] for c, b in zip(idx, bits))
+        weight = np.prod([c[2] if b else 1.0 - c[2] for c, b in zip(idx, bits)], axis=0)
+        out = out + weight * table[sel]
+    return out
+
+def _corners(table, cells):
+    # trilinear interpolation on nested lists (scalar query path)
+    (i0, i1, wi), (j0, j1, wj), (k0, k1, wk) = cells
+    def line(i, j):
+        row = table[i][j]
+        return row[k0] + wk*(row[k1] - row[k0]) if wk else row[k0]
+    def plane(i):
+        a = line(i, j0)
+        return a + wj*(line(i, j1) - a) if wj else a
+    a = plane(i0)
+    return a + wi*(plane(i1) - a) if wi else a
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect a rotor performance deck.")
+    parser.add_argument("command", choices=("build", "info"))
+    parser.add_argument("path")
+    parser.add_argument("--fidelity", help="solver fidelity profile (default: $ROTOR_FIDELITY or standard)")
+    args = parser.parse_args(argv)
+    if args.command == "build":
+        from mp_inputs import get_helicopter_and_engine
+        heli, engine, rotor = get_helicopter_and_engine()
+        W = heli.weight_N()
+        t0 = time.time()
+        deck = PerformanceDeck.build(rotor, engine, altitudes=np.arange(0.0, 3001.0, 250.0),
+                                     speeds=np.arange(0.0, 61.0, 5.0), rpms=np.arange(200.0, 391.0, 5.0),
+                                     thrusts=np.linspace(0.5*W, 1.2*W, 29), fidelity=args.fidelity)
+        deck.save(args.path)
+        print(f"built in {time.time() - t0:.1f}s")
+    deck = PerformanceDeck.load(args.path)
+    print(json.dumps(deck.meta, indent=2))
+    print(f"grid: {deck.altitudes.size} altitudes x {deck.speeds.size} speeds x {deck.rpms.size} rpm "
+          f"({deck.thrusts.size} thrusts); trimmable: {np.mean(np.isfinite(deck.trim_rpm)):.0%}; "
+          f"max interpolation error T {np.max(deck.err_T):.1e}, Q {np.max(deck.err_Q):.1e}, "
+          f"trimmed P {np.nanmax(deck.err_P):.1e}")
+
+if __name__ == "__main__":
+    main()
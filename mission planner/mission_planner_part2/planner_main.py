@@ -1,10 +1,39 @@
 import json
+import math
+
+import numpy as np
+
+from imports import add_flight_sim_path
+add_flight_sim_path()
+
+from fidelity import get_profile
+from rotor_cache import RotorCache
+from disk_cache import default_cache
+from performance_map import PerformanceMap
 from mp_inputs import get_helicopter_and_engine, mission_definition
 from segments import run_hover, run_vertical_climb, run_forward_climb, run_cruise, run_loiter, run_payload_op
 
-def run_mission():
+def mission_performance_map(rotor, mission, profile, rpm_lo=200.0, n_mu=41):
+    # CT/CQ map of the rotor over the advance ratios the mission can reach (slowest rotor speed)
+    V_max = max([seg.get("V_forward_mps", seg.get("V_loiter_mps", 0.0)) for seg in mission] + [0.0])
+    mu_max = V_max / (2*math.pi*rpm_lo/60.0 * rotor.blade.R_tip)
+    mu = np.linspace(0.0, mu_max, n_mu) if mu_max > 0 else (0.0,)
+    return PerformanceMap(rotor, mu=mu, fidelity=profile)
+
+def run_mission(fidelity=None, cache=None, perf_map=None, deck=None, isa_dev_K=0.0):
+    # fidelity: solver profile name or FidelityProfile (default: process default, see fidelity.py)
+    # cache: RotorCache shared by all segments (default: a new one per mission, backed by the
+    # persistent disk cache unless $ROTOR_DISK_CACHE=off)
+    # perf_map: PerformanceMap used to trim RPM (default: built for the mission's speeds)
+    # deck: optional PerformanceDeck (performance_deck.py); trims it covers are interpolated instead of solved
+    # isa_dev_K: ISA temperature deviation of the day [K] (hot/cold day; the deck is then not used)
     heli, engine, rotor = get_helicopter_and_engine()
     mission = mission_definition()
+    profile = get_profile(fidelity)
+    if cache is None:
+        cache = RotorCache(backing=default_cache())
+    if perf_map is None:
+        perf_map = mission_performance_map(rotor, mission, profile)
 
     full_log = []
     current_alt = 0.0
@@ -12,22 +41,23 @@ def run_mission():
     for seg in mission:
         typ = seg["type"]
         if typ == "hover":
-            res = run_hover(heli, engine, rotor, seg["duration_s"], seg["altitude_m"])
+            res = run_hover(heli, engine, rotor, seg["duration_s"], seg["altitude_m"], fidelity=profile, cache=cache, perf_map=perf_map, deck=deck, isa_dev_K=isa_dev_K)
             current_alt = seg["altitude_m"]
         elif typ == "vclimb":
-            res = run_vertical_climb(heli, engine, rotor, seg["duration_s"], seg["start_alt_m"], seg["climb_rate_mps"])
+            res = run_vertical_climb(heli, engine, rotor, seg["duration_s"], seg["start_alt_m"], seg["climb_rate_mps"], fidelity=profile, cache=cache, perf_map=perf_map, deck=deck, isa_dev_K=isa_dev_K)
             current_alt = seg["start_alt_m"] + seg["climb_rate_mps"]*seg["duration_s"]
         elif typ == "fclimb":
-            res = run_forward_climb(heli, engine, rotor, seg["duration_s"], seg["start_alt_m"], seg["climb_rate_mps"], seg["V_forward_mps"])
+            res = run_forward_climb(heli, engine, rotor, seg["duration_s"], seg["start_alt_m"], seg["climb_rate_mps"], seg["V_forward_mps"], fidelity=profile, cache=cache, perf_map=perf_map, deck=deck, isa_dev_K=isa_dev_K)
             current_alt = seg["start_alt_m"] + seg["climb_rate_mps"]*seg["duration_s"]
         elif typ == "cruise":
-            res = run_cruise(heli, engine, rotor, seg["duration_s"], seg["altitude_m"], seg["V_forward_mps"])
+            res = run_cruise(heli, engine, rotor, seg["duration_s"], seg["altitude_m"], seg["V_forward_mps"], fidelity=profile, cache=cache, perf_map=perf_map, deck=deck, isa_dev_K=isa_dev_K)
             current_alt = seg["altitude_m"]
         elif typ == "loiter":
-            res = run_loiter(heli, engine, rotor, seg["duration_s"], seg["altitude_m"], seg["V_loiter_mps"])
+            res = run_loiter(heli, engine, rotor, seg["duration_s"], seg["altitude_m"], seg["V_loiter_mps"], fidelity=profile, cache=cache, perf_map=perf_map, deck=deck, isa_dev_K=isa_dev_K)
             current_alt = seg["altitude_m"]
         elif typ == "payload":
-            res = run_payload_op(heli, seg["kind"], seg["delta_mass_kg"], seg.get("duration_hover_s",0.0), seg.get("altitude_m", current_alt), engine, rotor)
+            res = run_payload_op(heli, seg["kind"], seg["delta_mass_kg"], seg.get("duration_hover_s",0.0), seg.get("altitude_m", current_alt), engine, rotor,
+                                 fidelity=profile, cache=cache, perf_map=perf_map, deck=deck, isa_dev_K=isa_dev_K)
         else:
             return False, f"Unknown segment type: {typ}", full_log
 
@@ -39,7 +69,8 @@ def run_mission():
 
 if __name__ == "__main__":
     ok, msg, log = run_mission()
-    out = {"success": ok, "message": msg, "n_records": len(log), "last_state": log[-1] if log else None}
+    out = {"success": ok, "message": msg, "fidelity": get_profile().name, "n_records": len(log),
+           "last_state": log[-1] if log else None}
     print(json.dumps(out, indent=2))
     with open("mission_log.json","w") as f:
         json.dump(log, f, indent=2)
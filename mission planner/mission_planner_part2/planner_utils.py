@@ -1,50 +1,346 @@
 import math
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
 
 from imports import add_flight_sim_path
 add_flight_sim_path()
 
 from atmosphere import isa_properties
 from user_inputs import build_rotor
-from integrators import cycle_integrator
+from inflow import mach_speed
+from integrators import cycle_integrator, cycle_integrator_batch
+from sensitivities import cycle_sensitivities
+from fidelity import get_profile
 from stabilizers import Stabilizers
 
 def tip_mach(omega, R_tip, a):
     return (omega*R_tip)/max(1e-9, a)
 
-def solve_rpm_for_thrust(rotor, rho, a, V_forward, thrust_req_N, rpm_lo=200.0, rpm_hi=390.0, tol=1e-3):
+def solve_rpm_for_thrust(rotor, rho, a, V_forward, thrust_req_N, rpm_lo=200.0, rpm_hi=390.0, tol=None, state=None,
+                         fidelity=None, cache=None, perf_map=None):
     """
-    Bisection on RPM to match required thrust, respecting rotor.tip_mach_limit.
-    Returns (rpm, omega, T, Q, P) or raises ValueError if infeasible.
+    RPM matching the required thrust, respecting rotor.tip_mach_limit.
+    The speed of sound a [m/s] sets that limit and the section Mach number
+    at which airfoils tabulated over Mach are read.
+    Returns (rpm, omega, T, Q, P) or raises ValueError if infeasible or not
+    matched within tol after the profile's trim_max_iter evaluations.
+    The thrust at the tip-Mach-limited RPM (the feasibility check) is
+    memoized per condition; the first guess scales it by T ~ Omega^2 and
+    a secant in RPM^2 through the latest evaluations follows, falling back
+    to bisection whenever it leaves the bracket, stops halving the thrust
+    error or stops halving the bracket. Typically 2-4 rotor evaluations per
+    trim.
+    state: optional InflowState; the converged inflow of each rotor evaluation
+    warm-starts the next one (pass the same state across repeated trims).
+    Without one every evaluation starts cold.
+    fidelity: profile name or FidelityProfile (default: process default); sets
+    the rotor evaluation, the trim tolerance (unless tol is given) and the
+    number of iterations.
+    cache: optional rotor_cache.RotorCache; repeated trims (with conditions
+    rounded to its quantization steps) and repeated rotor evaluations inside
+    the trim iteration are looked up instead of recomputed.
+    perf_map: optional performance_map.PerformanceMap of this rotor; the RPM
+    is then taken from its CT map and confirmed (and corrected with
+    T ~ Omega^2 steps) with one or two rotor evaluations instead of the
+    secant iteration, which remains the fallback outside the map.
     """
+    profile = get_profile(fidelity)
+    if tol is None:
+        tol = profile.trim_tol
+    if cache is not None:
+        rho, a, V_forward = cache.q("rho", rho), cache.q("a", a), cache.q("V_forward", V_forward)
+        thrust_req_N = cache.q("thrust", thrust_req_N)
+        key = (_TRIM_ALGORITHM, rho, a, V_forward, thrust_req_N, rpm_lo, rpm_hi, tol, profile, rotor.tip_mach_limit,
+               perf_map is not None)
+        return cache.lookup("rpm_trim", rotor, key,
+                            lambda: _solve_rpm_for_thrust(rotor, rho, a, V_forward, thrust_req_N, rpm_lo, rpm_hi, tol,
+                                                          state, profile, cache, perf_map))
+    return _solve_rpm_for_thrust(rotor, rho, a, V_forward, thrust_req_N, rpm_lo, rpm_hi, tol, state, profile, None,
+                                 perf_map)
+
+# part of the "rpm_trim" cache key: change it when the trim iteration changes its results
+_TRIM_ALGORITHM = "secant-rpm2/bisect-2"
+
+# thrust, torque and power at the tip-Mach-limited RPM, keyed on rotor geometry and condition
+_TIP_LIMIT = OrderedDict()
+_TIP_LIMIT_SIZE = 256
+
+def _tip_limit_loads(rotor, rho, a, V_forward, rpm_hi, profile):
+    a = mach_speed(rotor.blade.airfoil, a)
+    key = (rotor.geometry_signature(), rho, a, V_forward, rpm_hi, profile)
+    loads = _TIP_LIMIT.get(key)
+    if loads is None:
+        loads = cycle_integrator(rotor, V_forward, 2*math.pi*rpm_hi/60.0, rho, fidelity=profile, a=a)
+        _TIP_LIMIT[key] = loads
+        while len(_TIP_LIMIT) > _TIP_LIMIT_SIZE:
+            _TIP_LIMIT.popitem(last=False)
+    else:
+        _TIP_LIMIT.move_to_end(key)
+    return loads
+
+def _rpm_step(lo, hi, rpm_a, err_a, rpm_b, err_b, bisect):
+    # next RPM of the trim from the two latest evaluations (err = T - T_req, b the newer):
+    # secant in RPM^2, exact where T ~ Omega^2, else the midpoint of the bracket [lo, hi];
+    # elementwise, so the batched trim shares it. Callers pass bisect where the secant
+    # stopped halving the error, or the last three steps did not halve the bracket
+    # without cutting the error tenfold (converging one-sided onto a kink or jump in T)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        guess = np.sqrt(rpm_b*rpm_b - err_b*(rpm_b*rpm_b - rpm_a*rpm_a)/(err_b - err_a))
+    ok = ~np.asarray(bisect) & np.isfinite(guess) & (guess > lo) & (guess < hi)
+    return np.where(ok, guess, 0.5*(lo + hi))
+
+def _trim_from_map(perf_map, rho, V_forward, thrust_req_N, rpm_lo, rpm_hi, tol, thrust_at_rpm, max_iter=4):
+    # RPM from the CT map, checked against the rotor model; None when the map cannot settle it
+    omega = perf_map.omega_for_thrust(thrust_req_N, rho, V_forward=V_forward)
+    omega_lo, omega_hi = 2*math.pi*rpm_lo/60.0, 2*math.pi*rpm_hi/60.0
+    for _ in range(max_iter):
+        if not (math.isfinite(omega) and omega_lo <= omega <= omega_hi):
+            return None
+        if not perf_map.in_range(mu=V_forward/(omega*perf_map.R)):
+            return None
+        rpm = omega*60.0/(2*math.pi)
+        T, Q, P = thrust_at_rpm(rpm)
+        if abs(T - thrust_req_N) <= tol*max(1.0, thrust_req_N):
+            return rpm, omega, T, Q, P
+        if T <= 0.0:
+            return None
+        omega *= math.sqrt(thrust_req_N / T)
+    return None
+
+def _solve_rpm_for_thrust(rotor, rho, a, V_forward, thrust_req_N, rpm_lo, rpm_hi, tol, state, profile, cache,
+                          perf_map=None):
     R = rotor.blade.R_tip
     # Trim rpm_hi to tip Mach limit
     rpm_hi = min(rpm_hi, (rotor.tip_mach_limit * a / max(1e-9, R)) * 60.0/(2*math.pi))
 
     def thrust_at_rpm(rpm):
         omega = 2*math.pi*rpm/60.0
-        T, Q, P = cycle_integrator(rotor, V_forward, omega, rho)
+        if cache is not None:
+            return cache.cycle_integrator(rotor, V_forward, omega, rho, state=state, fidelity=profile, a=a)
+        T, Q, P = cycle_integrator(rotor, V_forward, omega, rho, state=state, fidelity=profile, a=a)
         return T, Q, P
 
-    T_lo, _, _ = thrust_at_rpm(rpm_lo)
-    T_hi, _, _ = thrust_at_rpm(rpm_hi)
+    if perf_map is not None:
+        trimmed = _trim_from_map(perf_map, rho, V_forward, thrust_req_N, rpm_lo, rpm_hi, tol, thrust_at_rpm)
+        if trimmed is not None:
+            return trimmed
+
+    # the upper end repeats from trim to trim (memoized; the cache holds it when given)
+    T_hi, Q_hi, P_hi = thrust_at_rpm(rpm_hi) if cache is not None else _tip_limit_loads(rotor, rho, a, V_forward,
+                                                                                           rpm_hi, profile)
     if T_hi < thrust_req_N:
         raise ValueError(f"Thrust requirement {thrust_req_N:.1f} N exceeds capability under tip-Mach limit (max T={T_hi:.1f} N).")
+    err_hi = T_hi - thrust_req_N
+    if abs(err_hi) <= tol*max(1.0, thrust_req_N):
+        return rpm_hi, 2*math.pi*rpm_hi/60.0, T_hi, Q_hi, P_hi
 
-    for _ in range(40):
-        rpm_mid = 0.5*(rpm_lo+rpm_hi)
-        T_mid, Q_mid, P_mid = thrust_at_rpm(rpm_mid)
-        if abs(T_mid - thrust_req_N) <= tol*max(1.0, thrust_req_N):
-            omega_mid = 2*math.pi*rpm_mid/60.0
-            return rpm_mid, omega_mid, T_mid, Q_mid, P_mid
-        if T_mid < thrust_req_N:
-            rpm_lo = rpm_mid
+    # first guess from T ~ Omega^2 through the upper end
+    rpm_a, err_a = rpm_hi, err_hi
+    rpm = min(rpm_hi, max(rpm_lo, rpm_hi*math.sqrt(max(0.0, thrust_req_N) / T_hi))) if T_hi > 0 else 0.5*(rpm_lo+rpm_hi)
+    rpm_floor = rpm_lo
+    widths = (math.inf, math.inf)   # bracket widths before the previous two steps
+    for _ in range(profile.trim_max_iter):
+        T, Q, P = thrust_at_rpm(rpm)
+        err = T - thrust_req_N
+        if abs(err) <= tol*max(1.0, thrust_req_N) or (rpm <= rpm_floor and err > 0.0):
+            # matched, or the requirement is below the thrust at rpm_lo
+            return rpm, 2*math.pi*rpm/60.0, T, Q, P
+        width, widths = widths[0], (widths[1], rpm_hi - rpm_lo)
+        if err < 0.0:
+            rpm_lo = rpm
         else:
-            rpm_hi = rpm_mid
+            rpm_hi = rpm
+        bisect = abs(err) > 0.5*abs(err_a) or (rpm_hi - rpm_lo > 0.5*width and abs(err) > 0.1*abs(err_a))
+        rpm, rpm_a, err_a = float(_rpm_step(rpm_lo, rpm_hi, rpm_a, err_a, rpm, err, bisect)), rpm, err
+
+    raise ValueError(f"RPM trim for thrust {thrust_req_N:.1f} N did not converge in {profile.trim_max_iter} "
+                     f"iterations (bracket {rpm_lo:.3f}-{rpm_hi:.3f} rpm, last T={T:.1f} N).")
+
+@dataclass
+class RpmTrim:
+    # result of solve_rpm_for_thrust_batch; arrays with the broadcast shape of the inputs
+    rpm: np.ndarray
+    omega: np.ndarray
+    T: np.ndarray               # thrust, torque and power at the trim [N, N·m, W] (nan where infeasible)
+    Q: np.ndarray
+    P: np.ndarray
+    converged: np.ndarray       # True where the thrust is matched within tol
+    feasible: np.ndarray        # False where the target exceeds T_max
+    T_max: np.ndarray           # thrust at the tip-Mach-limited upper RPM
+
+def solve_rpm_for_thrust_batch(rotor, rho, a, V_forward, thrust_req_N, rpm_lo=200.0, rpm_hi=390.0, tol=None,
+                               fidelity=None):
+    """
+    solve_rpm_for_thrust for arrays of conditions: rho, a, V_forward and
+    thrust_req_N broadcast and all cases iterate in lock step (the scalar
+    trim's T ~ Omega^2 first guess and safeguarded secant), each iteration
+    one cycle_integrator_batch call over the cases still active.
+    Every case reports its own outcome instead of raising: infeasible
+    targets (above the thrust at the tip-Mach-limited upper RPM) get nan
+    and feasible=False, and cases not within tol after the iteration limit
+    (where the scalar trim raises) keep the last midpoint with
+    converged=False; requirements below the thrust at rpm_lo stop there
+    unconverged.
+    """
+    profile = get_profile(fidelity)
+    if tol is None:
+        tol = profile.trim_tol
+    rho, a, V, target = np.broadcast_arrays(*(np.asarray(x, dtype=float)
+                                              for x in (rho, a, V_forward, thrust_req_N)))
+    shape = target.shape
+    rho, a, V, target = rho.ravel(), a.ravel(), V.ravel(), target.ravel()
+    n = target.size
+    R = rotor.blade.R_tip
+    lo = np.full(n, float(rpm_lo))
+    hi = np.minimum(rpm_hi, (rotor.tip_mach_limit * a / max(1e-9, R)) * 60.0/(2*math.pi))
+
+    def evaluate(idx, rpm):
+        return cycle_integrator_batch(rotor, V[idx], 2*math.pi*rpm/60.0, rho[idx], fidelity=profile, a=a[idx])
+
+    # the upper (tip-Mach-limited) end of every case in one batched evaluation
+    T_max, Q_hi, P_hi = evaluate(np.arange(n), hi)
+    feasible = T_max >= target
+
+    rpm = np.full(n, np.nan)
+    T, Q, P = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    converged = feasible & (np.abs(T_max - target) <= tol*np.maximum(1.0, target))
+    rpm[converged], T[converged], Q[converged], P[converged] = (hi[converged], T_max[converged], Q_hi[converged],
+                                                                P_hi[converged])
+    active = np.flatnonzero(feasible & ~converged)
+    lo, hi = lo[active], hi[active]
+    # first guess from T ~ Omega^2 through the upper end
+    rpm_a, err_a = hi, T_max[active] - target[active]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.clip(hi*np.sqrt(np.maximum(0.0, target[active]) / T_max[active]), lo, hi)
+    x = np.where(np.isfinite(x), x, 0.5*(lo + hi))
+    widths = np.full((2, active.size), np.inf)   # bracket widths before the previous two steps
+    for _ in range(profile.trim_max_iter):
+        if active.size == 0:
+            break
+        T_x, Q_x, P_x = evaluate(active, x)
+        rpm[active], T[active], Q[active], P[active] = x, T_x, Q_x, P_x
+        err = T_x - target[active]
+        done = np.abs(err) <= tol*np.maximum(1.0, target[active])
+        converged[active[done]] = True
+        floor = (x <= rpm_lo) & (err > 0.0)
+        width, widths = widths[0], np.stack([widths[1], hi - lo])
+        lo, hi = np.where(err < 0.0, x, lo), np.where(err < 0.0, hi, x)
+        bisect = (np.abs(err) > 0.5*np.abs(err_a)) | ((hi - lo > 0.5*width) & (np.abs(err) > 0.1*np.abs(err_a)))
+        x, rpm_a, err_a = _rpm_step(lo, hi, rpm_a, err_a, x, err, bisect), x, err
+        keep = ~(done | floor)
+        active, lo, hi, x, rpm_a, err_a = active[keep], lo[keep], hi[keep], x[keep], rpm_a[keep], err_a[keep]
+        widths = widths[:, keep]
+    if active.size:
+        # iteration limit: the final midpoint, flagged unconverged
+        mid = 0.5*(lo + hi)
+        rpm[active] = mid
+        T[active], Q[active], P[active] = evaluate(active, mid)
+
+    omega = 2*math.pi*rpm/60.0
+    out = [v.reshape(shape) for v in (rpm, omega, T, Q, P, converged, feasible, T_max)]
+    return RpmTrim(*out)
+
+@dataclass
+class CollectiveTrim:
+    # result of solve_collective_for_thrust; arrays with the broadcast shape of the targets
+    collective: np.ndarray      # trimmed collective [rad] (nan where not trimmed)
+    T: np.ndarray               # thrust, torque and power at the trim [N, N·m, W]
+    Q: np.ndarray
+    P: np.ndarray
+    converged: np.ndarray       # True where the thrust is matched within tol
+    stall_limited: np.ndarray   # target above the thrust peak, which stall puts inside the collective range
+    T_max: np.ndarray           # highest thrust reachable in the collective range
+    collective_max: np.ndarray  # collective giving T_max
+
+def solve_collective_for_thrust(rotor, rho, omega, V_forward, thrust_req_N, collective_lo=math.radians(-2.0),
+                                collective_hi=math.radians(20.0), tol=None, fidelity=None, stall_slope=0.05, peak_tol=1e-4,
+                                a=None):
+    """
+    Collective pitch (added to the rotor's own rigging, rad) giving the
+    required thrust at a set rotor speed omega [rad/s]. rho, omega, V_forward
+    and thrust_req_N broadcast, and every target is trimmed at once: each
+    iteration is one batched rotor evaluation with dT/dcollective from
+    sensitivities.cycle_sensitivities, stepping by Newton inside a bracket
+    that bisection keeps.
+    Stall: the sections stall and thrust levels off (or falls) with more
+    collective. Where dT/dcollective at collective_hi is below stall_slope
+    times its value at collective_lo, the stall onset - the collective at
+    which the slope drops to that fraction, the thrust peak for
+    stall_slope=0 - is located to peak_tol rad by bisection on the slope,
+    and targets above the thrust there are stall-limited. Targets
+    outside [T(collective_lo), T_max] are not trimmed (collective nan,
+    converged False) instead of raising, so one infeasible target does not
+    stop the batch.
+    fidelity sets the rotor evaluation, tol (unless given) and the iteration
+    limit, as for solve_rpm_for_thrust. a: optional speed of sound [m/s],
+    broadcast like rho, for airfoils tabulated over Mach.
+    """
+    profile = get_profile(fidelity)
+    if tol is None:
+        tol = profile.trim_tol
+    rho, omega, V, target, sa = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in
+                                                      (rho, omega, V_forward, thrust_req_N,
+                                                       np.nan if a is None else a)))
+    shape = target.shape
+    rho, omega, V, target = rho.ravel(), omega.ravel(), V.ravel(), target.ravel()
+    a_s = None if a is None else sa.ravel()
+    n = target.size
+
+    def evaluate(idx, collective):
+        T, Q, P, jac = cycle_sensitivities(rotor, V[idx], omega[idx], rho[idx], wrt=("collective",),
+                                           fidelity=profile, collective=collective,
+                                           a=None if a_s is None else a_s[idx])
+        return T, Q, P, jac["T"]["collective"]
+
+    # both ends of the range in one evaluation
+    ends = np.concatenate([np.full(n, collective_lo), np.full(n, collective_hi)])
+    T_end, _, _, dT_end = evaluate(np.tile(np.arange(n), 2), ends)
+    T_lo, T_hi, dT_hi = T_end[:n], T_end[n:], dT_end[n:]
+
+    # stall: thrust levelled off at collective_hi, bisect for the onset
+    T_max, th_max = T_hi.copy(), np.full(n, collective_hi)
+    slope_min = stall_slope * np.maximum(dT_end[:n], 0.0)
+    stalled = dT_hi <= slope_min
+    idx = np.flatnonzero(stalled)
+    a, b, T_a = np.full(idx.size, collective_lo), np.full(idx.size, collective_hi), T_lo[idx]
+    while idx.size and np.max(b - a) > peak_tol:
+        mid = 0.5*(a + b)
+        T_mid, _, _, dT_mid = evaluate(idx, mid)
+        rising = dT_mid > slope_min[idx]
+        a, T_a = np.where(rising, mid, a), np.where(rising, T_mid, T_a)
+        b = np.where(rising, b, mid)
+    T_max[idx], th_max[idx] = T_a, a
+
+    collective = np.full(n, np.nan)
+    T, Q, P = np.full(n, np.nan), np.full(n, np.nan), np.full(n, np.nan)
+    converged = np.zeros(n, dtype=bool)
+    feasible = (target >= T_lo) & (target <= T_max)
+    # regula falsi first guess inside the bracket [collective_lo, th_max]
+    active = np.flatnonzero(feasible)
+    lo, hi = np.full(active.size, collective_lo), th_max[active]
+    span = np.maximum(T_max[active] - T_lo[active], 1e-12)
+    x = lo + (target[active] - T_lo[active]) / span * (hi - lo)
+    for _ in range(profile.trim_max_iter):
+        if active.size == 0:
+            break
+        T_x, Q_x, P_x, dT_x = evaluate(active, x)
+        collective[active], T[active], Q[active], P[active] = x, T_x, Q_x, P_x
+        err = T_x - target[active]
+        done = np.abs(err) <= tol*np.maximum(1.0, target[active])
+        converged[active[done]] = True
+        lo = np.where(err < 0.0, x, lo)
+        hi = np.where(err < 0.0, hi, x)
+        keep = ~done
+        active, x, err, dT_x, lo, hi = active[keep], x[keep], err[keep], dT_x[keep], lo[keep], hi[keep]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_new = x - err / dT_x
+        inside = (dT_x > 0.0) & (x_new > lo) & (x_new < hi)
+        x = np.where(inside, x_new, 0.5*(lo + hi))
 
-    rpm_mid = 0.5*(rpm_lo+rpm_hi)
-    omega_mid = 2*math.pi*rpm_mid/60.0
-    T_mid, Q_mid, P_mid = thrust_at_rpm(rpm_mid)
-    return rpm_mid, omega_mid, T_mid, Q_mid, P_mid
+    out = [v.reshape(shape) for v in (collective, T, Q, P, converged, stalled & (target > T_max), T_max, th_max)]
+    return CollectiveTrim(*out)
 
 def parasite_power(rho, V, S_ref_m2=6.0, CD0=0.04):
     q = 0.5*rho*V*V
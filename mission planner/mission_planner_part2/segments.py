@@ -1,11 +1,15 @@
 import math
 from dataclasses import dataclass
 
+import numpy as np
+
 from imports import add_flight_sim_path
 add_flight_sim_path()
 
-from atmosphere import isa_properties
+from atmosphere import isa
 from planner_utils import solve_rpm_for_thrust, parasite_power, tail_power_fraction
+from solver_state import InflowState
+from fidelity import get_profile
 
 @dataclass
 class SegmentResult:
@@ -13,15 +17,51 @@ class SegmentResult:
     reason: str
     log: list
 
-def run_hover(heli, engine, rotor, duration_s, alt_m, dt_s=1.0):
+def _profile(duration_s, dt_s, alt0_m, climb_rate_mps=0.0, isa_dev_K=0.0):
+    # step start times of a segment with the altitude and atmosphere (rho, a) at each, computed up front
+    times = []
     t = 0.0
-    log = []
     while t < duration_s - 1e-6:
-        rho, a = isa_properties(alt_m)
+        times.append(t)
+        t += dt_s
+    # accumulated like the per-step altitude update (alt += climb_rate*dt)
+    alts = np.cumsum(np.concatenate([[alt0_m], np.full(max(0, len(times) - 1), climb_rate_mps * dt_s)]))
+    rho, a, _, _ = isa(alts[:len(times)], isa_dev_K)
+    return times, alts.tolist(), rho.tolist(), a.tolist()
+
+def _trim(rotor, alt_m, rho, a, V_forward, W, state, profile, cache, perf_map, deck):
+    # trimmed (rpm, omega, T, Q, P_main) and its source ("deck" or the fidelity profile's name): from the
+    # performance deck when it covers the point, else the BEMT trim
+    if deck is not None:
+        trimmed = deck.trim(alt_m, V_forward, W)
+        if trimmed is not None:
+            rpm, omega, P_main, _ = trimmed
+            return rpm, omega, W, P_main/omega, P_main, "deck"
+    rpm, omega, T, Q, P_main = solve_rpm_for_thrust(rotor, rho, a, V_forward=V_forward, thrust_req_N=W, state=state,
+                                                    fidelity=profile, cache=cache, perf_map=perf_map)
+    return rpm, omega, T, Q, P_main, profile.name
+
+def _deck(deck, rotor, profile, isa_dev_K):
+    # the deck to use for a segment: none on a non-standard day (it is tabulated for the standard day);
+    # raises ValueError if it was built for another rotor or fidelity profile
+    if deck is None or isa_dev_K != 0.0:
+        return None
+    deck.check(rotor, profile)
+    return deck
+
+def run_hover(heli, engine, rotor, duration_s, alt_m, dt_s=1.0, fidelity=None, cache=None, perf_map=None, deck=None,
+              isa_dev_K=0.0):
+    log = []
+    state = InflowState()  # warm-starts each trim from the previous second's inflow
+    profile = get_profile(fidelity)
+    deck = _deck(deck, rotor, profile, isa_dev_K)
+    times, _, rho_s, a_s = _profile(duration_s, dt_s, alt_m, isa_dev_K=isa_dev_K)
+    for t, rho, a in zip(times, rho_s, a_s):
         W = heli.weight_N()
         # Solve RPM to match thrust = W
         try:
-            rpm, omega, T, Q, P_main = solve_rpm_for_thrust(rotor, rho, a, V_forward=0.0, thrust_req_N=W)
+            rpm, omega, T, Q, P_main, source = _trim(rotor, alt_m, rho, a, 0.0, W, state, profile, cache,
+                                                     perf_map, deck)
         except ValueError as e:
             return SegmentResult(False, f"Hover infeasible: {e}", log)
 
@@ -41,20 +81,24 @@ def run_hover(heli, engine, rotor, duration_s, alt_m, dt_s=1.0):
         log.append({
             "type":"hover","time_s":t,"altitude_m":alt_m,"rpm":rpm,
             "P_main_kW":P_main/1000.0,"P_tail_kW":P_tail/1000.0,"P_par_kW":P_par/1000.0,
-            "P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg,"mass_kg":heli.mass_total()
+            "P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg,"mass_kg":heli.mass_total(),
+            "fidelity":source
         })
-        t += dt_s
     return SegmentResult(True, "ok", log)
 
-def run_vertical_climb(heli, engine, rotor, duration_s, start_alt_m, climb_rate_mps, dt_s=1.0):
-    t = 0.0; alt = start_alt_m
+def run_vertical_climb(heli, engine, rotor, duration_s, start_alt_m, climb_rate_mps, dt_s=1.0, fidelity=None, cache=None, perf_map=None, deck=None,
+                       isa_dev_K=0.0):
     log = []
-    while t < duration_s - 1e-6:
-        rho, a = isa_properties(alt)
+    state = InflowState()  # warm-starts each trim from the previous second's inflow
+    profile = get_profile(fidelity)
+    deck = _deck(deck, rotor, profile, isa_dev_K)
+    times, alts, rho_s, a_s = _profile(duration_s, dt_s, start_alt_m, climb_rate_mps, isa_dev_K)
+    for t, alt, rho, a in zip(times, alts, rho_s, a_s):
         W = heli.weight_N()
         # Match thrust ~ weight, add rate-of-climb power T*Vc
         try:
-            rpm, omega, T, Q, P_main = solve_rpm_for_thrust(rotor, rho, a, V_forward=0.0, thrust_req_N=W)
+            rpm, omega, T, Q, P_main, source = _trim(rotor, alt, rho, a, 0.0, W, state, profile, cache,
+                                                     perf_map, deck)
         except ValueError as e:
             return SegmentResult(False, f"Vertical climb infeasible: {e}", log)
 
@@ -76,20 +120,23 @@ def run_vertical_climb(heli, engine, rotor, duration_s, start_alt_m, climb_rate_
         log.append({
             "type":"vclimb","time_s":t,"altitude_m":alt,"rpm":rpm,
             "P_main_kW":P_main/1000.0,"P_tail_kW":P_tail/1000.0,"P_par_kW":P_par/1000.0,
-            "P_climb_kW":P_climb/1000.0,"P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg
+            "P_climb_kW":P_climb/1000.0,"P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg,
+            "fidelity":source
         })
-        t += dt_s
     return SegmentResult(True, "ok", log)
 
-def run_forward_climb(heli, engine, rotor, duration_s, start_alt_m, climb_rate_mps, V_forward_mps, dt_s=1.0):
-    t = 0.0; alt = start_alt_m
+def run_forward_climb(heli, engine, rotor, duration_s, start_alt_m, climb_rate_mps, V_forward_mps, dt_s=1.0,
+                      fidelity=None, cache=None, perf_map=None, deck=None, isa_dev_K=0.0):
     log = []
-    while t < duration_s - 1e-6:
-        rho, a = isa_properties(alt)
+    state = InflowState()  # warm-starts each trim from the previous second's inflow
+    profile = get_profile(fidelity)
+    deck = _deck(deck, rotor, profile, isa_dev_K)
+    times, alts, rho_s, a_s = _profile(duration_s, dt_s, start_alt_m, climb_rate_mps, isa_dev_K)
+    for t, alt, rho, a in zip(times, alts, rho_s, a_s):
         W = heli.weight_N()
 
         try:
-            rpm, omega, T, Q, P_main = solve_rpm_for_thrust(rotor, rho, a, V_forward=V_forward_mps, thrust_req_N=W)
+            rpm, omega, T, Q, P_main, source = _trim(rotor, alt, rho, a, V_forward_mps, W, state, profile, cache, perf_map, deck)
         except ValueError as e:
             return SegmentResult(False, f"Forward climb infeasible: {e}", log)
 
@@ -111,20 +158,23 @@ def run_forward_climb(heli, engine, rotor, duration_s, start_alt_m, climb_rate_m
         log.append({
             "type":"fclimb","time_s":t,"altitude_m":alt,"rpm":rpm,
             "P_main_kW":P_main/1000.0,"P_tail_kW":P_tail/1000.0,"P_par_kW":P_par/1000.0,
-            "P_climb_kW":P_climb/1000.0,"P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg
+            "P_climb_kW":P_climb/1000.0,"P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg,
+            "fidelity":source
         })
-        t += dt_s
     return SegmentResult(True, "ok", log)
 
-def run_cruise(heli, engine, rotor, duration_s, alt_m, V_forward_mps, dt_s=1.0):
-    t = 0.0
+def run_cruise(heli, engine, rotor, duration_s, alt_m, V_forward_mps, dt_s=1.0, fidelity=None, cache=None, perf_map=None, deck=None,
+               isa_dev_K=0.0):
     log = []
-    while t < duration_s - 1e-6:
-        rho, a = isa_properties(alt_m)
+    state = InflowState()  # warm-starts each trim from the previous second's inflow
+    profile = get_profile(fidelity)
+    deck = _deck(deck, rotor, profile, isa_dev_K)
+    times, _, rho_s, a_s = _profile(duration_s, dt_s, alt_m, isa_dev_K=isa_dev_K)
+    for t, rho, a in zip(times, rho_s, a_s):
         W = heli.weight_N()
 
         try:
-            rpm, omega, T, Q, P_main = solve_rpm_for_thrust(rotor, rho, a, V_forward=V_forward_mps, thrust_req_N=W)
+            rpm, omega, T, Q, P_main, source = _trim(rotor, alt_m, rho, a, V_forward_mps, W, state, profile, cache, perf_map, deck)
         except ValueError as e:
             return SegmentResult(False, f"Cruise infeasible: {e}", log)
 
@@ -144,23 +194,26 @@ def run_cruise(heli, engine, rotor, duration_s, alt_m, V_forward_mps, dt_s=1.0):
         log.append({
             "type":"cruise","time_s":t,"altitude_m":alt_m,"rpm":rpm,
             "P_main_kW":P_main/1000.0,"P_tail_kW":P_tail/1000.0,"P_par_kW":P_par/1000.0,
-            "P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg
+            "P_avail_kW":P_avail_kW,"fuel_remaining_kg":heli.fuel_kg,
+            "fidelity":source
         })
-        t += dt_s
     return SegmentResult(True, "ok", log)
 
-def run_loiter(heli, engine, rotor, duration_s, alt_m, V_loiter_mps, dt_s=1.0):
+def run_loiter(heli, engine, rotor, duration_s, alt_m, V_loiter_mps, dt_s=1.0, fidelity=None, cache=None, perf_map=None, deck=None,
+               isa_dev_K=0.0):
     # identical to cruise but parameterized separately
-    return run_cruise(heli, engine, rotor, duration_s, alt_m, V_loiter_mps, dt_s)
+    return run_cruise(heli, engine, rotor, duration_s, alt_m, V_loiter_mps, dt_s, fidelity, cache, perf_map, deck,
+                      isa_dev_K)
 
-def run_payload_op(heli, kind: str, delta_mass_kg: float, duration_hover_s: float, alt_m: float, engine=None, rotor=None, dt_s=1.0):
+def run_payload_op(heli, kind: str, delta_mass_kg: float, duration_hover_s: float, alt_m: float, engine=None, rotor=None, dt_s=1.0,
+                   fidelity=None, cache=None, perf_map=None, deck=None, isa_dev_K=0.0):
     """
     kind: 'pickup' or 'drop' ; delta_mass_kg > 0
     If duration_hover_s > 0, holds hover for that time (with feasibility checks) before mass change.
     """
     logs = []
     if duration_hover_s > 0 and engine and rotor:
-        res = run_hover(heli, engine, rotor, duration_hover_s, alt_m, dt_s)
+        res = run_hover(heli, engine, rotor, duration_hover_s, alt_m, dt_s, fidelity, cache, perf_map, deck, isa_dev_K)
         logs += res.log
         if not res.success:
             return SegmentResult(False, f"Payload op hover failed: {res.reason}", logs)
@@ -30,6 +30,7 @@ class FlightParameters:
     tip_mach: float
     disk_loading: float
     efficiency: float
+    fidelity: str = "standard"  # solver fidelity profile the values were computed with ("deck" if interpolated)
 
 @dataclass
 class MissionCommand:
@@ -10,16 +10,26 @@ import os
 # Add paths for flight simulation
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'flight_sim_part1'))
 
-from atmosphere import isa_properties
-from integrators import cycle_integrator
+from atmosphere import isa_properties, isa
+import numpy as np
+
+from integrators import cycle_integrator_batch
+from fidelity import get_profile
+from rotor_cache import RotorCache
+from disk_cache import default_cache
 from .core import FlightParameters
 
 class FlightAnalyzer:
     """Handles flight performance analysis"""
     
-    def __init__(self, rotor, fs_inputs):
+    def __init__(self, rotor, fs_inputs, fidelity=None, cache=None, deck=None):
         self.rotor = rotor
         self.fs_inputs = fs_inputs
+        self.fidelity = get_profile(fidelity)  # solver profile used for every evaluation
+        self.cache = cache if cache is not None else RotorCache(backing=default_cache())  # memo of flight conditions
+        self.deck = deck  # optional PerformanceDeck answering conditions it covers
+        if deck is not None:
+            deck.check(rotor, self.fidelity)  # raises ValueError for another rotor or fidelity profile
     
     def get_flight_parameters(self, altitude: float = 0, velocity: float = 0) -> FlightParameters:
         """Get current flight parameters from simulation"""
@@ -28,7 +38,12 @@ class FlightAnalyzer:
             rpm = self.fs_inputs["condition"]["rpm"]
             omega = 2*3.14159*rpm/60.0
             
-            T, Q, P = cycle_integrator(self.rotor, velocity, omega, rho)
+            if self.deck is not None and self.deck.in_range(altitude, velocity, rpm):
+                T, Q, P = (float(x) for x in self.deck.evaluate(altitude, velocity, rpm))
+                source = "deck"
+            else:
+                T, Q, P = self.cache.cycle_integrator(self.rotor, velocity, omega, rho, fidelity=self.fidelity, a=a)
+                source = self.fidelity.name
             
             # Calculate additional parameters
             tip_speed = omega * self.rotor.blade.R_tip
@@ -44,7 +59,8 @@ class FlightAnalyzer:
                 rpm=rpm,
                 tip_mach=tip_mach,
                 disk_loading=disk_loading,
-                efficiency=efficiency
+                efficiency=efficiency,
+                fidelity=source
             )
             
         except Exception as e:
@@ -60,15 +76,27 @@ class FlightAnalyzer:
         
         envelope = {}
         
-        for alt in altitudes:
+        # One batched rotor evaluation over the whole altitude x velocity grid
+        try:
+            rho, a, _, _ = isa(np.asarray(altitudes, dtype=float)[:, None])
+            rpm = self.fs_inputs["condition"]["rpm"]
+            omega = 2*3.14159*rpm/60.0
+            T, Q, P = cycle_integrator_batch(self.rotor, np.asarray(velocities, dtype=float)[None, :], omega, rho,
+                                             fidelity=self.fidelity, a=a)
+        except Exception as e:
+            print(f"✗ Failed to evaluate performance envelope: {e}")
+            return {alt: {} for alt in altitudes}
+        
+        tip_mach = omega * self.rotor.blade.R_tip / a
+        efficiency = np.where(P > 0, T / np.where(P > 0, P/1000, 1.0), 0.0)  # N/kW
+        for i, alt in enumerate(altitudes):
             envelope[alt] = {}
-            for vel in velocities:
-                params = self.get_flight_parameters(alt, vel)
-                if params:
-                    envelope[alt][vel] = {
-                        'power_kW': params.power_kW,
-                        'efficiency': params.efficiency,
-                        'tip_mach': params.tip_mach
-                    }
+            for j, vel in enumerate(velocities):
+                envelope[alt][vel] = {
+                    'power_kW': float(P[i, j]/1000),
+                    'efficiency': float(efficiency[i, j]),
+                    'tip_mach': float(tip_mach[i, 0]),
+                    'fidelity': self.fidelity.name
+                }
         
-        return envelope
\ No newline at end of file
+        return envelope
@@ -16,16 +16,17 @@ from .report_generator import ReportGenerator
 class MissionController:
     """Main mission controller class"""
     
-    def __init__(self):
+    def __init__(self, fidelity=None):
+        # fidelity: solver fidelity profile name (None: process default)
         # Initialize components
-        self.system_init = SystemInitializer()
-        self.executor = MissionExecutor()
+        self.system_init = SystemInitializer(fidelity)
+        self.executor = MissionExecutor(fidelity)
         
         # Initialize systems
         self.initialize_systems()
         
         # Initialize other components after system init
-        self.flight_analyzer = FlightAnalyzer(self.system_init.rotor, self.system_init.fs_inputs)
+        self.flight_analyzer = FlightAnalyzer(self.system_init.rotor, self.system_init.fs_inputs, fidelity)
         self.report_gen = ReportGenerator(
             self.executor.mission_status,
             None,  # flight_params will be updated dynamically
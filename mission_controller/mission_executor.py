@@ -19,7 +19,8 @@ from .core import MissionStatus, MissionCommand
 class MissionExecutor:
     """Handles mission execution and monitoring"""
     
-    def __init__(self):
+    def __init__(self, fidelity=None):
+        self.fidelity = fidelity  # solver fidelity profile passed to the mission planner
         self.mission_status = None
         self.mission_log = []
         self.command_queue = []
@@ -60,7 +61,7 @@ class MissionExecutor:
         try:
             # Run the mission planner
             print("Starting mission planner execution...")
-            result = run_mission()
+            result = run_mission(fidelity=self.fidelity)
             
             # Update mission status
             self.mission_status.status = "completed"
@@ -15,6 +15,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'mission planner',
 from user_inputs import get_user_inputs, build_rotor
 from atmosphere import isa_properties
 from integrators import cycle_integrator
+from fidelity import get_profile
 
 # Mission planner imports
 from mp_inputs import get_helicopter_and_engine
@@ -22,7 +23,8 @@ from mp_inputs import get_helicopter_and_engine
 class SystemInitializer:
     """Handles system initialization and validation"""
     
-    def __init__(self):
+    def __init__(self, fidelity=None):
+        self.fidelity = get_profile(fidelity)  # solver profile of the flight simulation test
         self.fs_inputs = None
         self.rotor = None
         self.helicopter = None
@@ -72,7 +74,7 @@ class SystemInitializer:
         try:
             rho, a = isa_properties(0)
             omega = 2*3.14159*960/60.0
-            T, Q, P = cycle_integrator(self.rotor, 0, omega, rho)
+            T, Q, P = cycle_integrator(self.rotor, 0, omega, rho, fidelity=self.fidelity)
             print(f"✓ Flight simulation test: {T:.1f}N thrust, {P/1000:.1f}kW power")
         except Exception as e:
             print(f"✗ Flight simulation test failed: {e}")
@@ -18,16 +18,23 @@ sys.path.append('mission planner/mission_planner_part2')
 
 from user_inputs import get_user_inputs, build_rotor
 from atmosphere import isa_properties
-from integrators import cycle_integrator
+from rotor_cache import RotorCache
+from disk_cache import default_cache
+from fidelity import get_profile
 from blade import Blade
 from rotor import Rotor
 from airfoil import Airfoil
 from planner_main import run_mission
+from planner_utils import solve_collective_for_thrust
 from mp_inputs import get_helicopter_and_engine
 
 class ReportGenerator:
-    def __init__(self):
+    def __init__(self, fidelity=None):
         print("=== HELICOPTER ASSIGNMENT REPORT GENERATOR ===")
+        # solver fidelity profile for every rotor evaluation (None: process default, $ROTOR_FIDELITY)
+        self.fidelity = get_profile(fidelity)
+        # rotor evaluations are memoized, and persisted across runs unless $ROTOR_DISK_CACHE=off
+        self.cache = RotorCache(backing=default_cache())
         self.setup_system()
         self.create_output_directory()
         
@@ -48,6 +55,7 @@ class ReportGenerator:
         self.omega = 2 * np.pi * self.rpm / 60.0
         
         print(f"✓ Systems initialized")
+        print(f"  Solver fidelity: {self.fidelity.name}")
         print(f"  Rotor: {self.rotor.blade.R_tip:.2f}m radius, {self.rotor.B} blades")
         print(f"  Aircraft: {self.helicopter.mass_total():.0f}kg total mass")
         
@@ -89,7 +97,8 @@ class ReportGenerator:
                 "forward_flight": "Steady level flight",
                 "climb": "Constant climb rate",
                 "atmospheric_conditions": "Variable with altitude per ISA"
-            }
+            },
+            "solver_fidelity": self.fidelity.as_dict()
         }
         
         # Save assumptions to file
@@ -136,7 +145,7 @@ class ReportGenerator:
                              Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
                 rotor = Rotor(B, blade)
                 
-                T, Q, P = cycle_integrator(rotor, 0, self.omega, self.rho_sl)
+                T, Q, P = self.cache.cycle_integrator(rotor, 0, self.omega, self.rho_sl, fidelity=self.fidelity)
                 
                 # Performance coefficients
                 CT = 2 * T / (self.rho_sl * np.pi * self.omega**2 * 0.762**4)
@@ -172,7 +181,7 @@ class ReportGenerator:
                 blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_rad, theta_rad,
                              Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
                 rotor = Rotor(B, blade)
-                T, Q, P = cycle_integrator(rotor, 0, self.omega, self.rho_sl)
+                T, Q, P = self.cache.cycle_integrator(rotor, 0, self.omega, self.rho_sl, fidelity=self.fidelity)
                 CT = 2 * T / (self.rho_sl * np.pi * self.omega**2 * 0.762**4)
                 CT_calc.append(CT)
             
@@ -209,7 +218,7 @@ class ReportGenerator:
                 blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_rad, theta_rad,
                              Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
                 rotor = Rotor(B, blade)
-                T, Q, P = cycle_integrator(rotor, 0, self.omega, self.rho_sl)
+                T, Q, P = self.cache.cycle_integrator(rotor, 0, self.omega, self.rho_sl, fidelity=self.fidelity)
                 CQ = 2 * Q / (self.rho_sl * np.pi * self.omega**2 * 0.762**5)
                 CQ_calc.append(CQ)
             
@@ -247,7 +256,7 @@ class ReportGenerator:
                 blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_rad, theta_rad,
                              Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
                 rotor = Rotor(B, blade)
-                T, Q, P = cycle_integrator(rotor, 0, self.omega, self.rho_sl)
+                T, Q, P = self.cache.cycle_integrator(rotor, 0, self.omega, self.rho_sl, fidelity=self.fidelity)
                 T_calc.append(T)
                 P_calc.append(P/1000)  # Convert to kW
             
@@ -286,7 +295,7 @@ class ReportGenerator:
             blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_test, theta_test,
                          Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
             rotor = Rotor(B, blade)
-            T, Q, P = cycle_integrator(rotor, 0, self.omega, self.rho_sl)
+            T, Q, P = self.cache.cycle_integrator(rotor, 0, self.omega, self.rho_sl, fidelity=self.fidelity)
             thrust_values.append(T)
             power_values.append(P/1000)
         
@@ -322,7 +331,7 @@ class ReportGenerator:
             blade = Blade(0.125, 0.762, c_root, c_tip, theta_test, theta_test,
                          Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
             rotor = Rotor(4, blade)  # Fixed 4 blades
-            T, Q, P = cycle_integrator(rotor, 0, self.omega, self.rho_sl)
+            T, Q, P = self.cache.cycle_integrator(rotor, 0, self.omega, self.rho_sl, fidelity=self.fidelity)
             thrust_values.append(T)
             power_values.append(P/1000)
         
@@ -358,7 +367,7 @@ class ReportGenerator:
             blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_root, theta_tip,
                          Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
             rotor = Rotor(4, blade)  # Fixed 4 blades
-            T, Q, P = cycle_integrator(rotor, 0, self.omega, self.rho_sl)
+            T, Q, P = self.cache.cycle_integrator(rotor, 0, self.omega, self.rho_sl, fidelity=self.fidelity)
             thrust_values.append(T)
             power_values.append(P/1000)
         
@@ -386,8 +395,8 @@ class ReportGenerator:
         test_altitude = 2000
         rho_test, _ = isa_properties(test_altitude)
         
-        # Generate weight range for analysis
-        weights = np.linspace(2000, 4000, 20)  # kg
+        # Generate weight range for analysis: up to what the rotor can hover
+        weights = np.linspace(0.2, 0.95, 20) * self._max_hover_weight(rho_test)  # kg
         
         self.analyze_takeoff_weights(test_altitude)
         self.plot_fuel_burn_rate(test_altitude, weights)
@@ -401,37 +410,35 @@ class ReportGenerator:
         
         rho, _ = isa_properties(altitude)
         
-        # Test different weights to find limits
-        test_weights = np.linspace(2500, 4500, 20)
+        # Test different weights to find limits (bracketing the rotor's hover capability)
+        test_weights = np.linspace(0.5, 1.25, 20) * self._max_hover_weight(rho)
         
         stall_limit = None
         power_limit = None
         
-        for weight in test_weights:
-            # Calculate required thrust for hover
-            T_required = weight * 9.81  # N
-            
-            # Find pitch angle needed for this thrust
-            theta_test = np.deg2rad(12)  # Test pitch
-            blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_test, theta_test,
-                         Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
-            rotor = Rotor(4, blade)
-            T, Q, P = cycle_integrator(rotor, 0, self.omega, rho)
-            
-            # Check if we can generate enough thrust
-            if T < T_required and stall_limit is None:
+        # Hover collective trim at every weight, in one batch
+        trim = self._hover_trim(rho, test_weights)
+        
+        for weight, ok, P in zip(test_weights, trim.converged, trim.P):
+            # Check if the rotor reaches the hover thrust before stall / full collective
+            if not ok and stall_limit is None:
                 stall_limit = weight
             
             # Check power requirement (assume 1500kW available with 10% loss)
             P_available = 1500 * 0.9 * 1000  # W
-            if P > P_available and power_limit is None:
+            if ok and P > P_available and power_limit is None:
                 power_limit = weight
         
         results = {
             "altitude_m": altitude,
             "max_weight_stall_kg": stall_limit or max(test_weights),
-            "max_weight_power_kg": power_limit or max(test_weights),
-            "available_power_kW": 1350
+            # not power-limited: the heaviest weight the rotor hovers (there is no power data beyond it)
+            "max_weight_power_kg": power_limit or float(np.max(test_weights[trim.converged])),
+            "available_power_kW": 1350,
+            "max_thrust_N": float(trim.T_max[0]),
+            "collective_max_deg": float(np.rad2deg(trim.collective_max[0])),
+            "stall_limited": bool(np.any(trim.stall_limited)),
+            "fidelity": self.fidelity.name
         }
         
         with open(f"{self.output_dir}/takeoff_analysis.json", 'w') as f:
@@ -440,6 +447,26 @@ class ReportGenerator:
         print(f"  Max weight (stall): {results['max_weight_stall_kg']:.0f} kg")
         print(f"  Max weight (power): {results['max_weight_power_kg']:.0f} kg")
 
+    def _collective_trim(self, rho, thrust_N):
+        # hover collective trim of the mission planner's rotor at the report RPM (0-20 deg on its rigging)
+        return solve_collective_for_thrust(self.mp_rotor, rho, self.omega, 0.0, thrust_N, collective_lo=0.0,
+                                           collective_hi=np.deg2rad(20), fidelity=self.fidelity)
+
+    def _max_hover_weight(self, rho):
+        """Heaviest weight [kg] the mission planner's rotor can hover at rho (T_max does not depend on the target)"""
+        return float(self._collective_trim(rho, 0.0).T_max) / 9.81
+
+    def _hover_trim(self, rho, weights):
+        """Hover collective trim (planner_utils.CollectiveTrim) of the mission planner's rotor at each weight [kg]"""
+        trim = self._collective_trim(rho, np.asarray(weights) * 9.81)
+        if not np.any(trim.converged):
+            raise ValueError(f"No weight in {np.min(weights):.1f}-{np.max(weights):.1f} kg can hover: the rotor's "
+                             f"thrust limit is {trim.T_max.flat[0]:.0f} N; nothing to plot")
+        if not np.all(trim.converged):
+            print(f"  {np.count_nonzero(~trim.converged)} of {trim.converged.size} weights above the rotor's "
+                  f"thrust limit ({trim.T_max.flat[0]:.0f} N), left out")
+        return trim
+
     def plot_fuel_burn_rate(self, altitude, weights):
         """Plot fuel burn rate vs gross weight"""
         plt.figure(figsize=(10, 6))
@@ -447,23 +474,13 @@ class ReportGenerator:
         rho, _ = isa_properties(altitude)
         fuel_rates = []
         
-        for weight in weights:
-            # Calculate hover power required
-            T_required = weight * 9.81
-            
-            # Estimate power (simplified)
-            theta_est = np.deg2rad(8)  # Typical hover pitch
-            blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_est, theta_est,
-                         Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
-            rotor = Rotor(4, blade)
-            T, Q, P = cycle_integrator(rotor, 0, self.omega, rho)
-            
-            # Scale power based on weight ratio
-            P_scaled = P * (T_required / T) if T > 0 else P
-            
+        # Hover power required: collective trimmed to each weight (nan where it cannot hover)
+        trim = self._hover_trim(rho, weights)
+        
+        for P in trim.P:
             # Fuel consumption (assume 0.3 kg/kW/hr)
             sfc = 0.3  # kg/kW/hr
-            fuel_rate = (P_scaled / 1000) * sfc / 60  # kg/min
+            fuel_rate = (P / 1000) * sfc / 60  # kg/min
             fuel_rates.append(fuel_rate)
         
         plt.plot(weights, fuel_rates, 'b-', linewidth=2)
@@ -482,23 +499,17 @@ class ReportGenerator:
         fuel_capacity = 400  # kg (from mission planner)
         rho, _ = isa_properties(altitude)
         endurances = []
+        trim = self._hover_trim(rho, weights)
         
-        for weight in weights:
+        for P in trim.P:
             # Calculate fuel burn rate (same as above)
-            theta_est = np.deg2rad(8)
-            blade = Blade(0.125, 0.762, 0.0508, 0.0508, theta_est, theta_est,
-                         Airfoil(a0=5.75, Cd0=0.0113, e=1.25))
-            rotor = Rotor(4, blade)
-            T, Q, P = cycle_integrator(rotor, 0, self.omega, rho)
-            
-            T_required = weight * 9.81
-            P_scaled = P * (T_required / T) if T > 0 else P
-            
             sfc = 0.3  # kg/kW/hr
-            fuel_rate = (P_scaled / 1000) * sfc / 60  # kg/min
+            fuel_rate = (P / 1000) * sfc / 60  # kg/min
             
-            # Calculate endurance
-            if fuel_rate > 0:
+            # Calculate endurance (nan where the rotor cannot hover)
+            if np.isnan(fuel_rate):
+                endurance = np.nan
+            elif fuel_rate > 0:
                 endurance = fuel_capacity / fuel_rate  # minutes
             else:
                 endurance = 0
@@ -529,6 +540,7 @@ Rotor: {self.rotor.blade.R_tip:.2f}m radius, {self.rotor.B} blades
 Aircraft: {self.helicopter.mass_total():.0f}kg total mass
 Engine: {self.engine.P_sl_kW:.0f}kW power
 RPM: {self.rpm:.0f}
+Solver fidelity: {self.fidelity.name} ({self.fidelity.n_sections} radial x {self.fidelity.n_azimuth} azimuth, {self.fidelity.radial} quadrature, {self.fidelity.solver} inflow solver)
 
 GENERATED OUTPUTS
 ================
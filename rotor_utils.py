@@ -12,8 +12,9 @@ import os
 sys.path.append('flight_sim_part1')
 
 from user_inputs import get_user_inputs, build_rotor
-from atmosphere import isa_properties
-from integrators import cycle_integrator
+from atmosphere import isa_properties, isa
+from integrators import cycle_integrator, cycle_integrator_batch
+from fidelity import get_profile
 from blade import Blade
 from rotor import Rotor
 from airfoil import Airfoil
@@ -21,8 +22,9 @@ from airfoil import Airfoil
 class RotorCalculator:
     """Centralized rotor calculation utilities"""
     
-    def __init__(self):
-        """Initialize with standard configuration"""
+    def __init__(self, fidelity=None):
+        """Initialize with standard configuration and solver fidelity profile (None: process default)"""
+        self.fidelity = get_profile(fidelity)
         self.fs_inputs = get_user_inputs()
         self.standard_rotor = build_rotor(self.fs_inputs["rotor"])
         self.standard_rpm = self.fs_inputs["condition"]["rpm"]
@@ -38,15 +40,26 @@ class RotorCalculator:
             altitude: Altitude in meters
             rpm: RPM (uses standard if None)
             
+            forward_speed, altitude and rpm may be arrays; they broadcast
+            against each other and all conditions are evaluated in one
+            batched pass.
+            
         Returns:
-            Dict with thrust, torque, power
+            Dict with thrust, torque, power (arrays for array conditions)
         """
+        batched = any(np.ndim(x) > 0 for x in (forward_speed, altitude, rpm))
+        
         # Get atmospheric conditions
-        rho, _ = isa_properties(altitude)
+        if np.ndim(altitude) > 0:
+            rho = isa(altitude)[0]
+        else:
+            rho, _ = isa_properties(altitude)
         
         # Set RPM
         if rpm is None:
             rpm = self.standard_rpm
+        if batched:
+            rpm = np.asarray(rpm, dtype=float)
         omega = 2 * np.pi * rpm / 60.0
         
         # Create rotor if config dict provided
@@ -56,13 +69,17 @@ class RotorCalculator:
             rotor = rotor_config
             
         # Calculate performance
-        T, Q, P = cycle_integrator(rotor, forward_speed, omega, rho)
+        if batched:
+            T, Q, P = cycle_integrator_batch(rotor, forward_speed, omega, rho, fidelity=self.fidelity)
+        else:
+            T, Q, P = cycle_integrator(rotor, forward_speed, omega, rho, fidelity=self.fidelity)
         
         return {
             'thrust_N': T,
             'torque_Nm': Q, 
             'power_W': P,
-            'power_kW': P / 1000
+            'power_kW': P / 1000,
+            'fidelity': self.fidelity.name
         }
     
     def _create_rotor_from_config(self, config, theta_deg):
@@ -170,6 +170,356 @@ def test_integration():
     print(f"✓ Integrated stabilizers: {len(fm)} force/moment components")
 
 
+def test_fidelity_profiles_forward_flight():
+    """Test that converged profiles agree in forward flight (same model, different resolution)"""
+    sys.path.append('flight_sim_part1')
+    from user_inputs import get_user_inputs, build_rotor
+    from integrators import cycle_integrator
+    from fidelity import derive_profile
+    import math
+    
+    rotor = build_rotor(get_user_inputs()["rotor"])
+    omega = 2*math.pi*960/60.0
+    # relative agreement with "certification" expected from each profile's discretization;
+    # "standard" keeps the original Newton results, so its grid is checked with the fallback on
+    standard = derive_profile("standard", "standard+fallback", newton_fallback=True)
+    tolerance = {"preview": 0.05, standard: 0.01}
+    
+    for V in (5.0, 30.0):
+        T_ref, Q_ref, P_ref = cycle_integrator(rotor, V, omega, 1.225, fidelity="certification")
+        for profile, tol in tolerance.items():
+            T, Q, P = cycle_integrator(rotor, V, omega, 1.225, fidelity=profile)
+            name = getattr(profile, "name", profile)
+            for label, x, ref in (("T", T, T_ref), ("P", P, P_ref)):
+                if abs(x - ref) > tol * abs(ref):
+                    raise AssertionError(f"{name} {label}={x:.2f} vs certification {ref:.2f} at V={V} m/s")
+            print(f"✓ {name} at V={V:.0f} m/s: T={T:.2f}N (certification {T_ref:.2f}N)")
+
+
+def _lifting_rotor(alpha_stall_deg=15.0):
+    """Rotor large enough to trim to helicopter weights (the default inputs' rotor is not)"""
+    sys.path.append('flight_sim_part1')
+    sys.path.append('mission planner/mission_planner_part2')
+    from blade import Blade
+    from rotor import Rotor
+    from airfoil import Airfoil
+    import math
+
+    airfoil = Airfoil(a0=5.75, Cd0=0.0113, e=1.25, alpha_stall_deg=alpha_stall_deg)
+    return Rotor(4, Blade(0.5, 7.0, 0.45, 0.45, math.radians(10), math.radians(4), airfoil))
+
+
+def test_engine_equivalence():
+    """Test that the disk and vector engines reproduce the scalar per-section engine"""
+    rotor = _lifting_rotor()
+    from integrators import cycle_integrator
+    import math
+
+    omega = 2*math.pi*280/60.0
+    settings = dict(n_sections=24, n_azimuth=12, solver_options=dict(tol=1e-10, max_iter=200))
+    for V in (0.0, 20.0):
+        ref = cycle_integrator(rotor, V, omega, 1.2, engine="scalar", **settings)
+        for engine in ("disk", "vector"):
+            result = cycle_integrator(rotor, V, omega, 1.2, engine=engine, **settings)
+            for label, x, x_ref in zip("TQP", result, ref):
+                if abs(x - x_ref) > 1e-12 * abs(x_ref):
+                    raise AssertionError(f"{engine} engine {label}={x!r} vs scalar {x_ref!r} at V={V} m/s")
+            print(f"✓ {engine} engine at V={V:.0f} m/s: T={result[0]:.2f}N (scalar {ref[0]:.2f}N)")
+
+
+def test_blade_grid():
+    """Test the cached radial grids and that a two-station TabulatedBlade reproduces the linear Blade"""
+    rotor = _lifting_rotor()
+    from blade import TabulatedBlade
+    from integrators import cycle_integrator
+    import math
+
+    blade = rotor.blade
+    span = blade.R_tip - blade.R_root
+    grid = blade.grid(48, rotor.B)
+    if grid is not blade.grid(48, rotor.B) or grid.r.flags.writeable:
+        raise AssertionError("BladeGrid is not cached or its arrays are writeable")
+    gauss = blade.grid(16, rotor.B, "gauss")
+    if abs(gauss.dr.sum() - span) > 1e-12 * span:
+        raise AssertionError(f"Gauss weights sum to {gauss.dr.sum():.6f} m, span {span:.6f} m")
+    print(f"✓ Cached grids: {grid.r.size} cosine, {gauss.r.size} Gauss sections (read-only)")
+
+    omega = 2*math.pi*280/60.0
+    tabulated = rotor.replace(blade=TabulatedBlade.from_blade(blade))
+    T, Q, P = cycle_integrator(tabulated, 20.0, omega, 1.2, fidelity="preview")
+    T_ref, Q_ref, P_ref = cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview")
+    if abs(T - T_ref) > 1e-12 * abs(T_ref) or abs(Q - Q_ref) > 1e-12 * abs(Q_ref):
+        raise AssertionError(f"TabulatedBlade T={T:.4f}N Q={Q:.4f}N·m vs Blade {T_ref:.4f}N {Q_ref:.4f}N·m")
+    print(f"✓ TabulatedBlade matches Blade: T={T:.2f}N")
+
+
+def test_radial_quadrature():
+    """Test the Gauss and adaptive Gauss-Kronrod radial rules against a fine cosine grid"""
+    rotor = _lifting_rotor()
+    from integrators import cycle_integrator
+    import math
+
+    omega = 2*math.pi*280/60.0
+    common = dict(n_azimuth=12, solver="safeguarded")
+    T_ref, Q_ref, _ = cycle_integrator(rotor, 20.0, omega, 1.2, n_sections=800, **common)
+    for settings, tol in ((dict(radial="gauss", n_sections=24), 1e-3),
+                          (dict(radial="gauss_kronrod", radial_tol=1e-5, n_sections=400), 1e-4)):
+        T, Q, P, info = cycle_integrator(rotor, 20.0, omega, 1.2, return_info=True, **settings, **common)
+        if abs(T - T_ref) > tol * abs(T_ref) or abs(Q - Q_ref) > tol * abs(Q_ref):
+            raise AssertionError(f"{settings['radial']}: T={T:.3f}N Q={Q:.3f}N·m vs {T_ref:.3f}N {Q_ref:.3f}N·m")
+        print(f"✓ {settings['radial']} with {info['n_sections_evaluated']} sections: "
+              f"T={T:.2f}N (800 cosine sections {T_ref:.2f}N)")
+
+
+def test_warm_start():
+    """Test that warm-started evaluations agree with cold ones to the solver tolerance"""
+    rotor = _lifting_rotor()
+    from integrators import cycle_integrator
+    from solver_state import InflowState
+    import math
+
+    state = InflowState()
+    options = dict(tol=1e-10, max_iter=200)
+    for rpm in (280.0, 285.0, 290.0):
+        omega = 2*math.pi*rpm/60.0
+        warm = cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview", state=state, solver_options=options)
+        cold = cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview", solver_options=options)
+        for label, x, x_ref in zip("TQP", warm, cold):
+            if abs(x - x_ref) > 1e-9 * abs(x_ref):
+                raise AssertionError(f"warm {label}={x!r} vs cold {x_ref!r} at {rpm} rpm")
+    if state.warm_starts != 2 or state.cold_starts != 1:
+        raise AssertionError(f"{state.warm_starts} warm / {state.cold_starts} cold starts, expected 2 / 1")
+    print(f"✓ Warm starts agree with cold solves ({state.warm_starts} warm, {state.cold_starts} cold)")
+
+
+def test_frozen_geometry():
+    """Test content hashing, immutability, pickling and interning of the rotor geometry"""
+    rotor = _lifting_rotor()
+    from frozen import intern
+    from integrators import cycle_integrator
+    import math
+    import pickle
+
+    twin = _lifting_rotor()
+    if twin is rotor or twin != rotor or hash(twin) != hash(rotor) or twin.content_hash() != rotor.content_hash():
+        raise AssertionError("equal rotors do not compare and hash equal")
+    if rotor.replace(B=3) == rotor or rotor.replace(B=3).content_hash() == rotor.content_hash():
+        raise AssertionError("a modified rotor compares or hashes equal")
+    try:
+        rotor.B = 3
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("rotor attribute could be set")
+    print("✓ Equal content, equal hash; modified copies differ; attributes are read-only")
+
+    canonical = intern(rotor)
+    restored = pickle.loads(pickle.dumps(twin))
+    if restored is not canonical:
+        raise AssertionError("unpickled rotor is not the interned instance")
+    omega = 2*math.pi*280/60.0
+    if cycle_integrator(restored, 20.0, omega, 1.2, fidelity="preview") != \
+            cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview"):
+        raise AssertionError("unpickled rotor gives different loads")
+    print("✓ Pickled rotor restores to the interned instance with identical loads")
+
+
+def test_rotor_caches():
+    """Test hits, misses and invalidation of the in-process and on-disk rotor caches"""
+    rotor = _lifting_rotor()
+    from rotor_cache import RotorCache
+    from disk_cache import DiskCache
+    from integrators import cycle_integrator
+    import math
+    import tempfile
+
+    omega = 2*math.pi*280/60.0
+    ref = cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview")
+    cache = RotorCache()
+    first = cache.cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview")
+    again = cache.cycle_integrator(_lifting_rotor(), 20.0, omega, 1.2, fidelity="preview")
+    if first != ref or again != ref or (cache.hits, cache.misses) != (1, 1):
+        raise AssertionError(f"RotorCache {first} / {again} vs {ref}, {cache.hits} hits {cache.misses} misses")
+    cache.invalidate(rotor)
+    cache.cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview")
+    if cache.misses != 2:
+        raise AssertionError("invalidated entry was still served")
+    print(f"✓ RotorCache: equal rotors share entries, invalidate() drops them ({cache.stats()['hit_rate']:.2f} hit rate)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        disk = DiskCache(Path(directory) / "evaluations.sqlite")
+        RotorCache(backing=disk).cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview")
+        stored = RotorCache(backing=disk).cycle_integrator(_lifting_rotor(), 20.0, omega, 1.2, fidelity="preview")
+        if stored != ref or (disk.hits, disk.misses) != (1, 1):
+            raise AssertionError(f"DiskCache returned {stored} vs {ref} ({disk.hits} hits, {disk.misses} misses)")
+        RotorCache(backing=disk).cycle_integrator(rotor.replace(B=3), 20.0, omega, 1.2, fidelity="preview")
+        disk.clear()
+        RotorCache(backing=disk).cycle_integrator(rotor, 20.0, omega, 1.2, fidelity="preview")
+        if (disk.hits, disk.misses) != (1, 3):
+            raise AssertionError(f"DiskCache served another rotor or a cleared entry ({disk.hits} hits)")
+        disk.close()
+    print("✓ DiskCache: shared across caches, keyed on the rotor content, emptied by clear()")
+
+
+def test_performance_map():
+    """Test that the CT/CQ map reproduces the BEMT at its nodes for other rotor speeds and densities"""
+    rotor = _lifting_rotor()
+    from performance_map import PerformanceMap
+    from integrators import cycle_integrator
+    import math
+    import numpy as np
+
+    omega = 2*math.pi*280/60.0
+    perf_map = PerformanceMap(rotor, collective=(0.0, 0.05), mu=np.linspace(0.0, 0.2, 5), fidelity="preview")
+    R = rotor.blade.R_tip
+    for V, omega_x, rho, collective in ((0.0, omega, 1.0, 0.0), (0.0, 1.1*omega, 1.1, 0.05),
+                                        (0.15*omega*R, omega, 1.2, 0.0)):
+        pitched = rotor.replace(blade=rotor.blade.pitched(collective)) if collective else rotor
+        T_ref, Q_ref, _ = cycle_integrator(pitched, V, omega_x, rho, fidelity="preview")
+        T = perf_map.thrust(omega_x, rho, V, collective=collective)
+        Q = perf_map.torque(omega_x, rho, V, collective=collective)
+        if abs(T - T_ref) > 1e-9 * abs(T_ref) or abs(Q - Q_ref) > 1e-9 * abs(Q_ref):
+            raise AssertionError(f"map T={T:.3f}N Q={Q:.3f}N·m vs BEMT {T_ref:.3f}N {Q_ref:.3f}N·m")
+        print(f"✓ Map at V={V:.1f} m/s, rho={rho}, collective={collective}: T={T:.2f}N (BEMT {T_ref:.2f}N)")
+
+    omega_x = perf_map.omega_for_thrust(20000.0, 1.2)
+    T = cycle_integrator(rotor, 0.0, omega_x, 1.2, fidelity="preview")[0]
+    if abs(T - 20000.0) > 1e-9 * 20000.0:
+        raise AssertionError(f"hover omega_for_thrust gives T={T:.3f}N for 20000N")
+    print(f"✓ omega_for_thrust(20000N) = {omega_x:.3f} rad/s, BEMT T={T:.2f}N")
+
+
+def test_sensitivities():
+    """Test the implicit-differentiation sensitivities against central finite differences"""
+    rotor = _lifting_rotor()
+    from sensitivities import cycle_sensitivities
+    from integrators import cycle_integrator
+    import math
+
+    omega = 2*math.pi*280/60.0
+    options = dict(tol=1e-12, max_iter=100)
+    T, Q, P, jac = cycle_sensitivities(rotor, 20.0, omega, 1.2, wrt=("collective", "omega", "V_forward"),
+                                       fidelity="preview", solver_options=options)
+
+    def loads(collective=0.0, omega=omega, V=20.0):
+        pitched = rotor.replace(blade=rotor.blade.pitched(collective)) if collective else rotor
+        return cycle_integrator(pitched, V, omega, 1.2, fidelity="preview", solver_options=options)
+
+    if abs(T - loads()[0]) > 1e-12 * abs(T):
+        raise AssertionError(f"sensitivities T={T!r} vs cycle_integrator {loads()[0]!r}")
+    for name, h, at in (("collective", 1e-6, lambda s: dict(collective=s)),
+                        ("omega", 1e-4, lambda s: dict(omega=omega + s)),
+                        ("V_forward", 1e-4, lambda s: dict(V=20.0 + s))):
+        plus, minus = loads(**at(h)), loads(**at(-h))
+        for k, label in enumerate("TQP"):
+            fd = (plus[k] - minus[k]) / (2*h)
+            if abs(jac[label][name] - fd) > 1e-6 * abs(fd):
+                raise AssertionError(f"d{label}/d{name}={jac[label][name]:.6g}, finite difference {fd:.6g}")
+        print(f"✓ dT/d{name}={jac['T'][name]:.6g} matches finite differences")
+
+
+def test_single_precision_batch():
+    """Test the batched evaluation against scalar calls, in double and single precision"""
+    rotor = _lifting_rotor()
+    from integrators import cycle_integrator, cycle_integrator_batch
+    import math
+    import warnings
+    import numpy as np
+
+    omega = 2*math.pi*280/60.0
+    V = np.array([0.0, 10.0, 20.0, 30.0])
+    T, Q, P = cycle_integrator_batch(rotor, V, omega, 1.2, fidelity="preview")
+    for k, v in enumerate(V):
+        if (T[k], Q[k], P[k]) != cycle_integrator(rotor, v, omega, 1.2, fidelity="preview"):
+            raise AssertionError(f"batch differs from cycle_integrator at V={v} m/s")
+    print(f"✓ Batch equals cycle_integrator over {V.size} speeds")
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")  # the float64 spot check warns when float32 drifts
+        T32, Q32, P32 = cycle_integrator_batch(rotor, V, omega, 1.2, fidelity="preview", precision="single")
+    error = max(np.max(np.abs(T32 - T) / np.abs(T)), np.max(np.abs(Q32 - Q) / np.abs(Q)))
+    if error > 1e-4:
+        raise AssertionError(f"single precision relative error {error:.2e}")
+    print(f"✓ Single precision within {error:.1e} of double")
+
+
+def test_rpm_trim():
+    """Test that the RPM trim matches the thrust in a few rotor evaluations and rejects unreachable thrust"""
+    rotor = _lifting_rotor()
+    from planner_utils import solve_rpm_for_thrust
+    from integrators import cycle_integrator
+    from rotor_cache import RotorCache
+    from fidelity import get_profile
+
+    tol = get_profile("preview").trim_tol
+    for V in (0.0, 20.0):
+        for W in (20000.0, 30000.0):
+            cache = RotorCache()  # counts the rotor evaluations of one trim
+            rpm, omega, T, Q, P = solve_rpm_for_thrust(rotor, 1.2, 340.0, V, W, fidelity="preview", cache=cache)
+            T_ref = cycle_integrator(rotor, V, omega, 1.2, fidelity="preview")[0]
+            if abs(T - W) > tol * W or abs(T_ref - W) > tol * W:
+                raise AssertionError(f"trim at V={V} m/s: T={T:.1f}N (BEMT {T_ref:.1f}N) for W={W:.0f}N")
+            if cache.misses > 6:
+                raise AssertionError(f"trim at V={V} m/s, W={W:.0f}N took {cache.misses} rotor evaluations")
+            print(f"✓ V={V:.0f} m/s, W={W:.0f}N: {rpm:.1f} rpm, T={T:.1f}N in {cache.misses} evaluations")
+
+    try:
+        solve_rpm_for_thrust(rotor, 1.2, 340.0, 0.0, 1e6, fidelity="preview")
+    except ValueError as e:
+        print(f"✓ Unreachable thrust rejected: {e}")
+    else:
+        raise AssertionError("trim to 1 MN did not raise")
+
+
+def test_rpm_trim_batch():
+    """Test that the batched RPM trim reproduces the scalar trim case by case"""
+    rotor = _lifting_rotor()
+    from planner_utils import solve_rpm_for_thrust, solve_rpm_for_thrust_batch
+    import numpy as np
+
+    V = np.array([0.0, 20.0])[:, None]
+    W = np.array([20000.0, 30000.0, 1e6])[None, :]
+    trim = solve_rpm_for_thrust_batch(rotor, 1.2, 340.0, V, W, fidelity="preview")
+    for i in range(V.shape[0]):
+        for j in range(W.shape[1]):
+            if W[0, j] > 1e5:
+                # unreachable: flagged and nan instead of raising
+                if trim.feasible[i, j] or trim.converged[i, j] or not np.isnan(trim.rpm[i, j]):
+                    raise AssertionError(f"unreachable thrust at V={V[i, 0]} m/s not flagged")
+                continue
+            rpm, _, T, _, _ = solve_rpm_for_thrust(rotor, 1.2, 340.0, V[i, 0], W[0, j], fidelity="preview")
+            if not trim.converged[i, j] or abs(trim.rpm[i, j] - rpm) > 1e-9 * rpm or abs(trim.T[i, j] - T) > 1e-9 * T:
+                raise AssertionError(f"batch {trim.rpm[i, j]:.4f} rpm vs scalar {rpm:.4f} rpm "
+                                     f"at V={V[i, 0]} m/s, W={W[0, j]:.0f}N")
+    print(f"✓ Batched trim equals the scalar trim over {trim.rpm.size} cases (unreachable ones nan)")
+
+
+def test_collective_trim():
+    """Test the batched collective trim against the BEMT at the trimmed pitch, and its stall limit"""
+    rotor = _lifting_rotor(alpha_stall_deg=8.0)
+    from planner_utils import solve_collective_for_thrust
+    from integrators import cycle_integrator
+    from fidelity import get_profile
+    import math
+    import numpy as np
+
+    tol = get_profile("preview").trim_tol
+    omega = 2*math.pi*280/60.0
+    targets = np.array([15000.0, 25000.0, 1e6])
+    trim = solve_collective_for_thrust(rotor, 1.2, omega, 0.0, targets, fidelity="preview")
+    for k, W in enumerate(targets[:2]):
+        pitched = rotor.replace(blade=rotor.blade.pitched(trim.collective[k]))
+        T_ref = cycle_integrator(pitched, 0.0, omega, 1.2, fidelity="preview")[0]
+        if not trim.converged[k] or abs(trim.T[k] - W) > tol * W or abs(T_ref - W) > tol * W:
+            raise AssertionError(f"collective trim for {W:.0f}N: T={trim.T[k]:.1f}N (BEMT {T_ref:.1f}N)")
+        print(f"✓ W={W:.0f}N: collective {math.degrees(trim.collective[k]):.2f}°, T={trim.T[k]:.1f}N")
+
+    if trim.converged[2] or not np.isnan(trim.collective[2]) or not trim.stall_limited[2]:
+        raise AssertionError("thrust above the stall peak not flagged as stall-limited")
+    print(f"✓ Stall-limited above T_max={trim.T_max[2]:.0f}N "
+          f"at {math.degrees(trim.collective_max[2]):.1f}° collective")
+
+
 def main():
     """Run all tests"""
     print("HELICOPTER FLIGHT SIMULATOR - COMPREHENSIVE TEST SUITE")
@@ -185,7 +535,24 @@ def main():
     
     # Integration tests
     runner.test("Component Integration", test_integration)
-    
+    runner.test("Fidelity Profiles in Forward Flight", test_fidelity_profiles_forward_flight)
+
+    # Rotor model features
+    runner.test("Disk and Vector Engines", test_engine_equivalence)
+    runner.test("Blade Grids", test_blade_grid)
+    runner.test("Radial Quadrature", test_radial_quadrature)
+    runner.test("Warm Start", test_warm_start)
+    runner.test("Frozen Geometry", test_frozen_geometry)
+    runner.test("Rotor Caches", test_rotor_caches)
+    runner.test("Performance Map", test_performance_map)
+    runner.test("Sensitivities", test_sensitivities)
+    runner.test("Single-Precision Batch", test_single_precision_batch)
+
+    # Trim solvers
+    runner.test("RPM Trim", test_rpm_trim)
+    runner.test("Batched RPM Trim", test_rpm_trim_batch)
+    runner.test("Collective Trim", test_collective_trim)
+
     # Print summary
     success = runner.summary()
     